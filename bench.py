@@ -0,0 +1,520 @@
+"""Benchmark and load suite for server.py, runnable without radio hardware.
+
+Builds synthetic archives and schedule sets in a scratch directory, times feed
+generation, schedule checks and the scheduler, drives concurrent HTTP clients
+against a server in a child process, and records stub-tuner captures. The
+stand-ins for rtl_fm, ffmpeg and ffprobe live in scripts/stubs/.
+
+    python3 bench.py --quick
+    python3 bench.py --output before.json  # then, on another version:
+    python3 bench.py --output after.json && python3 bench.py --compare before.json after.json
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import platform
+import random
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import server
+
+STUBS_DIR = Path(__file__).resolve().parent / "scripts" / "stubs"
+ARCHIVE_SIZES = [100, 1000, 10_000, 50_000]
+SCHEDULE_COUNTS = [10, 100, 1000, 5000]
+PROGRAMS = ["News", "Jazz", "Morning-Show", "Classics", "Talk", "Sport", "Drive", "Late-Night"]
+ENCODED_BYTES_PER_SEC = 16_000
+CONFLICT_CANDIDATES = 200
+MEDIA_RANGE_BYTES = 256 * 1024
+REGRESSION_PCT = 10.0
+BENCH_CONFIG = {"base_url": "http://bench.invalid", "capture_mode": "single", "encode_mode": "live"}
+# Metrics where a larger number is an improvement; everything else is a cost.
+HIGHER_IS_BETTER = ("throughput_rps", "realtime_factor")
+
+
+@contextlib.contextmanager
+def sandbox(root: Path) -> Iterator[Path]:
+    """Point server.py's files and process-wide state at ``root`` for the duration."""
+    root.mkdir(parents=True, exist_ok=True)
+    index = server.WeeklyIntervalIndex()
+    replacements = {
+        "RECORDINGS_DIR": root / "recordings",
+        "SCHEDULES_PATH": root / "schedules.json",
+        "CONFIG_PATH": root / "config.json",
+        "RSS_PATH": root / "rss.xml",
+        "RENDITIONS_DIR": root / "renditions",
+        "CATALOG_PATH": root / "recordings.jsonl",
+        "TIMESHIFT_PATH": root / "timeshift.pcm",
+        "PENDING_DIR": root / "pending",
+        "ENCODE_JOURNAL_PATH": root / "encode_jobs.json",
+        "LIVE_DIR": root / "live",
+        "RECORDING_JOURNAL_PATH": root / "recording_journal.jsonl",
+        "schedule_index": index,
+        "schedule_store": server.JsonStore(root / "schedules.json", {"schedules": []}, on_load=index.rebuild),
+        "config_store": server.JsonStore(root / "config.json", BENCH_CONFIG),
+        "encode_queue": server.EncodeQueue(server.JsonStore(root / "encode_jobs.json", {"jobs": []})),
+        "renditions": server.Renditions(root / "renditions"),
+        "feed_cache": server.FeedCache(),
+        "rendition_feeds": {},
+        "program_feeds": {},
+        "scheduler": server.Scheduler(),
+        "retention": server.Retention(),
+        "live_recordings": server.LiveRecordings(),
+        "recording_journal": server.RecordingJournal(root / "recording_journal.jsonl"),
+        "tuner_pool": server.TunerPool(),
+        "_catalogs": {},
+        "capture_latencies": type(server.capture_latencies)(maxlen=server.capture_latencies.maxlen),
+    }
+    saved = {name: getattr(server, name) for name in replacements}
+    for name, value in replacements.items():
+        setattr(server, name, value)
+    try:
+        yield root
+    finally:
+        server.flush_stores()
+        for name, value in saved.items():
+            setattr(server, name, value)
+
+
+@contextlib.contextmanager
+def stub_tools(speed: float = 1.0) -> Iterator[None]:
+    """Put the stub rtl_fm/ffmpeg/ffprobe first on PATH, tuners paced at ``speed`` times real time."""
+    saved = {name: os.environ.get(name) for name in ("PATH", "SHIFTFM_STUB_SPEED")}
+    os.environ["PATH"] = os.pathsep.join([str(STUBS_DIR), saved["PATH"] or os.defpath])
+    os.environ["SHIFTFM_STUB_SPEED"] = str(speed)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def peak_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def process_peak_rss_kb(pid: int) -> Optional[int]:
+    """Peak RSS of a live process; unlike rusage it is not inherited from the parent across exec."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def make_archive(directory: Path, count: int, seed: int = 1) -> list[str]:
+    """``count`` hourly recordings as sparse files with analysis sidecars; returns their names."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    started = datetime(2020, 1, 1)
+    names = []
+    for index in range(count):
+        starts_at = started + timedelta(hours=index)
+        duration_sec = rng.choice([1800, 3600, 7200])
+        name = server.generate_filename(rng.choice(PROGRAMS), rng.choice([88.5, 96.1, 101.5]), starts_at)
+        path = directory / name
+        with path.open("wb") as handle:
+            handle.truncate(duration_sec * ENCODED_BYTES_PER_SEC)
+        mtime = (starts_at + timedelta(seconds=duration_sec)).timestamp()
+        os.utime(path, (mtime, mtime))
+        server.save_json(
+            server.analysis_path(name, directory),
+            {"duration_sec": duration_sec, "dead_air_pct": 0.0, "chapters": [0.0, duration_sec / 2]},
+        )
+        names.append(name)
+    return names
+
+
+def make_schedules(count: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        server.build_schedule(
+            {
+                "name": rng.choice(PROGRAMS),
+                "frequency_mhz": round(rng.uniform(88.0, 108.0), 1),
+                "duration_sec": rng.choice([1800, 3600, 7200]),
+                "days": rng.sample(server.DAYS, rng.randint(1, 7)),
+                "start_time": f"{rng.randrange(24):02d}:{rng.choice([0, 15, 30, 45]):02d}",
+            },
+            f"sch_{index}",
+        )
+        for index in range(count)
+    ]
+
+
+def timed(function, *args) -> tuple[float, Any]:
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def bench_feeds(root: Path, names: list[str]) -> dict:
+    """Catalog load and feed rebuild times for an archive already written under ``root``."""
+    config = dict(BENCH_CONFIG)
+    with sandbox(root):
+        cold_sec, _ = timed(server.generate_rss, config)
+        unchanged_sec, _ = timed(server.generate_rss, config)
+        extra = server.RECORDINGS_DIR / server.generate_filename("News", 96.1, datetime(2030, 1, 1))
+        extra.write_bytes(bytes(1024))
+        added_sec, _ = timed(server.generate_rss, config)
+        extra.unlink()
+        server._catalogs.clear()
+        reload_sec, _ = timed(server.generate_rss, config)
+        feed_bytes = server.RSS_PATH.stat().st_size
+    return {
+        "recordings": len(names),
+        "cold_build_sec": round(cold_sec, 4),
+        "unchanged_rebuild_sec": round(unchanged_sec, 4),
+        "one_added_rebuild_sec": round(added_sec, 4),
+        "catalog_reload_sec": round(reload_sec, 4),
+        "feed_bytes": feed_bytes,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def bench_schedules(root: Path, count: int) -> dict:
+    """Index rebuild, conflict checks and scheduler heap times for ``count`` schedules."""
+    schedules = make_schedules(count)
+    candidates = make_schedules(CONFLICT_CANDIDATES, seed=2)
+    config = dict(BENCH_CONFIG, devices=[{"index": 0}, {"index": 1}])
+    with sandbox(root):
+        server.save_json(server.SCHEDULES_PATH, {"schedules": schedules})
+        load_sec, _ = timed(server.load_schedules)
+        checks = sorted(timed(server.schedule_conflicts, candidate, config)[0] for candidate in candidates)
+        heap_sec, _ = timed(server.scheduler._refresh)
+        reschedule = []
+        for schedule in schedules[:100]:
+            started = time.perf_counter()
+            server.scheduler.reschedule(schedule["id"])
+            with server.scheduler.condition:
+                server.scheduler._refresh()
+            reschedule.append(time.perf_counter() - started)
+        reschedule.sort()
+    return {
+        "schedules": count,
+        "load_and_index_sec": round(load_sec, 4),
+        "conflict_check_p50_ms": round(percentile(checks, 0.5) * 1000, 3),
+        "conflict_check_p99_ms": round(percentile(checks, 0.99) * 1000, 3),
+        "scheduler_heap_build_sec": round(heap_sec, 4),
+        "reschedule_p50_ms": round(percentile(reschedule, 0.5) * 1000, 3),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def serve(root: Path, http_server: str) -> None:
+    """Child process of ``bench_http``: serve ``root`` on an ephemeral port and print the port."""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    server.ShiftHandler.log_message = lambda self, *args: None
+    with sandbox(root):
+        server.load_schedules()
+        server.generate_rss(server.load_config())
+        if http_server == "asyncio":
+            import asyncio
+
+            async def run() -> None:
+                listener = await server.AsyncHttpServer().start("127.0.0.1", 0)
+                print(listener.sockets[0].getsockname()[1], flush=True)
+                async with listener:
+                    await listener.serve_forever()
+
+            asyncio.run(run())
+            return
+        httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.ShiftHandler)
+        print(httpd.server_address[1], flush=True)
+        httpd.serve_forever()
+
+
+def http_routes(names: list[str], etag: str) -> list[tuple[str, str, dict]]:
+    program = server.parse_recording_name(names[0])["program"]
+    name = random.choice(names)
+    offset = random.randrange(0, 1800 * ENCODED_BYTES_PER_SEC - MEDIA_RANGE_BYTES, 4096)
+    media_range = {"Range": f"bytes={offset}-{offset + MEDIA_RANGE_BYTES - 1}"}
+    return [
+        ("/rss.xml", "/rss.xml", {"Accept-Encoding": "gzip"}),
+        ("/rss.xml (304)", "/rss.xml", {"Accept-Encoding": "gzip", "If-None-Match": etag}),
+        ("/rss/<program>.xml", f"/rss/{program}.xml", {"Accept-Encoding": "gzip"}),
+        ("/recordings/* (range)", f"/recordings/{name}", media_range),
+        ("/api/recordings", "/api/recordings?limit=50", {}),
+        ("/api/recordings?program", f"/api/recordings?limit=50&program={program}", {}),
+        ("/api/schedules", "/api/schedules", {}),
+        ("/", "/", {"Accept-Encoding": "gzip"}),
+    ]
+
+
+def http_client(port: int, names: list[str], etag: str, deadline: float, samples: dict) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while time.perf_counter() < deadline:
+        for label, path, headers in http_routes(names, etag):
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                size = len(response.read())
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                size, ok = 0, False
+            samples.setdefault(label, []).append((time.perf_counter() - started, size, ok))
+    conn.close()
+
+
+def bench_http(root: Path, names: list[str], clients: int, seconds: float, http_server: str) -> dict:
+    """Throughput and latency per route for ``clients`` keep-alive clients over ``seconds``."""
+    with sandbox(root):
+        server.save_json(server.SCHEDULES_PATH, {"schedules": make_schedules(100)})
+    child = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "--serve", str(root), "--http-server", http_server],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        port = int(child.stdout.readline())
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        conn.request("GET", "/rss.xml", headers={"Accept-Encoding": "gzip"})
+        response = conn.getresponse()
+        response.read()
+        etag = response.getheader("ETag", "")
+        conn.close()
+        per_client = [{} for _ in range(clients)]
+        deadline = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(target=http_client, args=(port, names, etag, deadline, samples))
+            for samples in per_client
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        server_rss_kb = process_peak_rss_kb(child.pid)
+    finally:
+        child.terminate()
+        child.wait()
+        child.stdout.close()
+    routes = {}
+    merged: dict[str, list] = {}
+    for samples in per_client:
+        for label, values in samples.items():
+            merged.setdefault(label, []).extend(values)
+    for label, values in merged.items():
+        latencies = sorted(value[0] for value in values)
+        routes[label] = {
+            "requests": len(values),
+            "errors": sum(1 for value in values if not value[2]),
+            "throughput_rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "bytes": sum(value[1] for value in values),
+        }
+    latencies = sorted(value[0] for values in merged.values() for value in values)
+    return {
+        "recordings": len(names),
+        "server": http_server,
+        "clients": clients,
+        "seconds": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "errors": sum(route["errors"] for route in routes.values()),
+        "routes": routes,
+        "server_peak_rss_kb": server_rss_kb,
+    }
+
+
+def bench_capture(root: Path, captures: int, duration_sec: int, speed: float) -> dict:
+    """``captures`` simultaneous rtl_fm recordings through stub tools paced at ``speed``."""
+    config = dict(BENCH_CONFIG, devices=[{"index": index} for index in range(captures)])
+    with sandbox(root), stub_tools(speed):
+        server.tuner_pool.configure(config)
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        before_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(
+                target=server.record_station,
+                args=(f"Bench-{index}", 88.5 + index, duration_sec, config),
+                kwargs={"starts_at": datetime.now()},
+            )
+            for index in range(captures)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        latencies = sorted(entry["latency_sec"] for entry in server.capture_latencies)
+        outputs = sorted(server.RECORDINGS_DIR.glob("Bench-*.mp3"))
+        report = server.load_analysis(outputs[0].name) if outputs else None
+    return {
+        "captures": captures,
+        "duration_sec": duration_sec,
+        "speed": speed,
+        "wall_sec": round(elapsed, 3),
+        "realtime_factor": round(captures * duration_sec / elapsed, 2),
+        "start_latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "recordings": len(outputs),
+        "recorded_sec": report.get("duration_sec") if report else None,
+        "server_cpu_sec": round(after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime, 3),
+        "stub_cpu_sec": round(
+            after_children.ru_utime
+            + after_children.ru_stime
+            - before_children.ru_utime
+            - before_children.ru_stime,
+            3,
+        ),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def source_version() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run(args: argparse.Namespace) -> dict:
+    results = {
+        "version": source_version(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "feeds": [],
+        "schedules": [],
+        "http": [],
+        "capture": None,
+    }
+    with tempfile.TemporaryDirectory(prefix="shiftfm-bench-") as scratch:
+        scratch_dir = Path(scratch)
+        for count in args.archive_sizes:
+            root = scratch_dir / f"archive-{count}"
+            names = make_archive(root / "recordings", count)
+            results["feeds"].append(bench_feeds(root, names))
+            print(f"feeds     {count:>6} recordings: {results['feeds'][-1]}", file=sys.stderr)
+            if args.http_seconds > 0:
+                results["http"].append(
+                    bench_http(root, names, args.clients, args.http_seconds, args.http_server)
+                )
+                summary = {key: value for key, value in results["http"][-1].items() if key != "routes"}
+                print(f"http      {count:>6} recordings: {summary}", file=sys.stderr)
+        for count in args.schedule_counts:
+            results["schedules"].append(bench_schedules(scratch_dir / f"schedules-{count}", count))
+            print(f"schedules {count:>6}: {results['schedules'][-1]}", file=sys.stderr)
+        if args.captures > 0:
+            results["capture"] = bench_capture(
+                scratch_dir / "capture", args.captures, args.capture_sec, args.stub_speed
+            )
+            print(f"capture: {results['capture']}", file=sys.stderr)
+    return results
+
+
+def flatten(results: dict) -> dict[str, float]:
+    """Numeric results keyed by a stable path, e.g. ``http[recordings=1000]./rss.xml.p99_ms``."""
+    flat = {}
+    keys = {"feeds": "recordings", "schedules": "schedules", "http": "recordings"}
+
+    def walk(prefix: str, value: Any) -> None:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(f"{prefix}.{key}" if prefix else key, item)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix] = value
+
+    for section, key in keys.items():
+        for entry in results.get(section) or []:
+            walk(f"{section}[{key}={entry.get(key)}]", entry)
+    if results.get("capture"):
+        walk("capture", results["capture"])
+    return flat
+
+
+def compare(
+    before: dict, after: dict, threshold_pct: float = REGRESSION_PCT
+) -> list[tuple[str, float, float, float, bool]]:
+    """``(metric, before, after, change %, regressed)`` for every metric in both runs."""
+    old, new = flatten(before), flatten(after)
+    rows = []
+    for metric in sorted(old.keys() & new.keys()):
+        if old[metric] == 0:
+            continue
+        change = 100 * (new[metric] - old[metric]) / abs(old[metric])
+        worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+        rows.append((metric, old[metric], new[metric], round(change, 1), worse > threshold_pct))
+    return rows
+
+
+def parse_counts(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark shiftFM's feeds, schedules, HTTP routes and captures."
+    )
+    parser.add_argument("--archive-sizes", type=parse_counts, default=ARCHIVE_SIZES)
+    parser.add_argument("--schedule-counts", type=parse_counts, default=SCHEDULE_COUNTS)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent HTTP clients")
+    parser.add_argument("--http-seconds", type=float, default=10, help="Load per archive size (0 skips)")
+    parser.add_argument("--http-server", choices=["threaded", "asyncio"], default="threaded")
+    parser.add_argument("--captures", type=int, default=2, help="Simultaneous stub captures (0 skips)")
+    parser.add_argument("--capture-sec", type=int, default=120, help="Audio length of each capture")
+    parser.add_argument("--stub-speed", type=float, default=20, help="Stub tuner pace, times real time")
+    parser.add_argument("--quick", action="store_true", help="Small sizes and short runs")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--serve", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.http_server)
+        return
+    if args.compare:
+        before, after = (json.loads(path.read_text(encoding="utf-8")) for path in args.compare)
+        rows = compare(before, after)
+        for metric, old, new, change, regressed in rows:
+            print(f"{'REGRESSED ' if regressed else '          '}{metric}: {old} -> {new} ({change:+.1f}%)")
+        sys.exit(1 if any(row[4] for row in rows) else 0)
+    if args.quick:
+        args.archive_sizes, args.schedule_counts = [100, 1000], [10, 100]
+        args.http_seconds, args.capture_sec = min(args.http_seconds, 2), min(args.capture_sec, 30)
+    results = run(args)
+    args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
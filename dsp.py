@@ -0,0 +1,343 @@
+"""Vectorized FM channelizer for raw RTL-SDR IQ captures.
+
+Everything here works on whole blocks of samples with NumPy; per-channel state
+is carried between blocks so a stream can be processed in arbitrary runs of
+block-sized reads. Block lengths must be a multiple of ``Channelizer.block_multiple``.
+"""
+
+import argparse
+import time
+from typing import Optional
+
+import numpy as np
+
+CHANNEL_RATE = 240_000
+CHANNEL_CUTOFF_HZ = 100_000
+AUDIO_CUTOFF_HZ = 15_000
+MAX_DEVIATION_HZ = 75_000
+DEEMPHASIS_TAU = 75e-6
+OUTPUT_GAIN = 0.9
+
+
+def iq_from_u8(raw: bytes, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert interleaved unsigned 8-bit I/Q (rtl_sdr output) to complex64.
+
+    Pass a float32 ``out`` buffer of ``len(raw)`` samples to avoid allocating.
+    """
+    samples = np.frombuffer(raw, dtype=np.uint8)
+    if out is None or len(out) != len(samples):
+        out = np.empty(len(samples), dtype=np.float32)
+    np.subtract(samples, np.float32(127.5), out=out)
+    out *= np.float32(1 / 127.5)
+    return out.view(np.complex64)
+
+
+def lowpass_taps(num_taps: int, cutoff_hz: float, sample_rate: float) -> np.ndarray:
+    """Hamming-windowed sinc low-pass filter with unity DC gain."""
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = np.sinc(2 * cutoff_hz / sample_rate * n) * np.hamming(num_taps)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def deemphasis_taps(tau: float, sample_rate: float) -> np.ndarray:
+    """FIR approximation of the single-pole FM de-emphasis filter."""
+    decay = np.exp(-1.0 / (tau * sample_rate))
+    length = max(2, int(np.ceil(np.log(1e-3) / np.log(decay))))
+    taps = decay ** np.arange(length)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+class FirDecimator:
+    """Stateful polyphase FIR decimator over a (channels, samples) array.
+
+    Taps are split into ``decimation``-wide phases so each output is a sum of
+    contiguous matrix-vector products. The history, work buffer and output are
+    allocated once per block shape and reused; the returned array is
+    overwritten by the next call.
+    """
+
+    def __init__(self, taps: np.ndarray, decimation: int, dtype: type) -> None:
+        phases = -(-len(taps) // decimation)
+        reversed_taps = np.zeros(phases * decimation, dtype=dtype)
+        reversed_taps[phases * decimation - len(taps):] = taps[::-1]
+        self.phases = reversed_taps.reshape(phases, decimation)
+        self.decimation = decimation
+        self.dtype = dtype
+        self.history_len = (phases - 1) * decimation
+        self.history = np.zeros((0, self.history_len), dtype=dtype)
+        self._buffer = np.zeros((0, 0), dtype=dtype)
+        self._output = np.zeros((0, 0), dtype=dtype)
+        self._scratch = np.zeros((0, 0), dtype=dtype)
+
+    def resize(self, keep: list[int], added: int) -> None:
+        """Keep the history rows in ``keep`` and append ``added`` zeroed rows."""
+        fresh = np.zeros((added, self.history_len), dtype=self.dtype)
+        self.history = np.concatenate([self.history[keep], fresh])
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        channels, length = block.shape
+        outputs = length // self.decimation
+        if self._buffer.shape != (channels, self.history_len + length):
+            self._buffer = np.empty((channels, self.history_len + length), dtype=self.dtype)
+            self._output = np.empty((channels, outputs), dtype=self.dtype)
+            self._scratch = np.empty((channels, outputs), dtype=self.dtype)
+        self._buffer[:, : self.history_len] = self.history
+        self._buffer[:, self.history_len:] = block
+        rows = self._buffer.reshape(channels, -1, self.decimation)
+        np.matmul(rows[:, :outputs], self.phases[0], out=self._output)
+        for phase in range(1, len(self.phases)):
+            np.matmul(rows[:, phase : phase + outputs], self.phases[phase], out=self._scratch)
+            self._output += self._scratch
+        self.history[...] = self._buffer[:, length:]
+        return self._output
+
+
+class FmDiscriminator:
+    """Polar discriminator with carried-over last sample and reused buffers."""
+
+    def __init__(self, scale: float) -> None:
+        self.scale = np.float32(scale)
+        self.last_sample = np.zeros(0, dtype=np.complex64)
+        self._chained = np.zeros((0, 0), dtype=np.complex64)
+        self._product = np.zeros((0, 0), dtype=np.complex64)
+        self._output = np.zeros((0, 0), dtype=np.float32)
+
+    def resize(self, keep: list[int], added: int) -> None:
+        self.last_sample = np.concatenate(
+            [self.last_sample[keep], np.zeros(added, dtype=np.complex64)]
+        )
+
+    def process(self, baseband: np.ndarray) -> np.ndarray:
+        channels, length = baseband.shape
+        if self._chained.shape != (channels, length + 1):
+            self._chained = np.empty((channels, length + 1), dtype=np.complex64)
+            self._product = np.empty((channels, length), dtype=np.complex64)
+            self._output = np.empty((channels, length), dtype=np.float32)
+        self._chained[:, 0] = self.last_sample
+        self._chained[:, 1:] = baseband
+        np.conjugate(self._chained[:, :-1], out=self._product)
+        self._product *= self._chained[:, 1:]
+        np.arctan2(self._product.imag, self._product.real, out=self._output)
+        self._output *= self.scale
+        self.last_sample = self._chained[:, -1].copy()
+        return self._output
+
+
+class Channelizer:
+    """Split one wideband IQ stream into several demodulated FM channels.
+
+    Channels are shifted to baseband together by multiplying the block with a
+    cached per-channel oscillator table, filtered and decimated to the channel
+    rate, FM-discriminated, then de-emphasised and decimated to audio rate.
+    ``process`` returns mono int16 PCM per channel id at ``audio_rate``; the
+    arrays are views into buffers reused by the next call.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        center_hz: float,
+        iq_decimation: Optional[int] = None,
+        audio_decimation: int = 5,
+        deemphasis_tau: float = DEEMPHASIS_TAU,
+    ) -> None:
+        iq_decimation = iq_decimation or max(1, sample_rate // CHANNEL_RATE)
+        self.sample_rate = sample_rate
+        self.center_hz = center_hz
+        self.channel_rate = sample_rate / iq_decimation
+        self.audio_rate = int(self.channel_rate / audio_decimation)
+        self.block_multiple = iq_decimation * audio_decimation
+        self.iq_filter = FirDecimator(
+            lowpass_taps(8 * iq_decimation + 1, CHANNEL_CUTOFF_HZ, sample_rate), iq_decimation, np.complex64
+        )
+        audio_taps = np.convolve(
+            lowpass_taps(8 * audio_decimation + 1, AUDIO_CUTOFF_HZ, self.channel_rate),
+            deemphasis_taps(deemphasis_tau, self.channel_rate),
+        )
+        self.audio_filter = FirDecimator(audio_taps, audio_decimation, np.float32)
+        self.discriminator = FmDiscriminator(self.channel_rate / (2 * np.pi * MAX_DEVIATION_HZ))
+        self.channel_ids: list[int] = []
+        self.omega = np.zeros(0, dtype=np.float64)
+        self.phase = np.zeros(0, dtype=np.float64)
+        self._oscillator = np.zeros((0, 0), dtype=np.complex64)
+        self._mixed = np.zeros((0, 0), dtype=np.complex64)
+        self._scaled = np.zeros((0, 0), dtype=np.float32)
+        self._pcm = np.zeros((0, 0), dtype=np.int16)
+        self._next_id = 0
+
+    def fits(self, frequency_hz: float, channel_width_hz: float = 2 * CHANNEL_CUTOFF_HZ) -> bool:
+        usable = 0.8 * self.sample_rate / 2
+        return abs(frequency_hz - self.center_hz) + channel_width_hz / 2 <= usable
+
+    def _rebuild(self, keep: list[int], added_omega: list[float]) -> None:
+        self.omega = np.concatenate([self.omega[keep], added_omega])
+        self.phase = np.concatenate([self.phase[keep], np.zeros(len(added_omega))])
+        self.discriminator.resize(keep, len(added_omega))
+        self.iq_filter.resize(keep, len(added_omega))
+        self.audio_filter.resize(keep, len(added_omega))
+        self._oscillator = np.zeros((0, 0), dtype=np.complex64)
+
+    def add_channel(self, frequency_hz: float) -> int:
+        if not self.fits(frequency_hz):
+            raise ValueError("Frequency is outside the capture bandwidth")
+        channel_id = self._next_id
+        self._next_id += 1
+        omega = 2 * np.pi * (frequency_hz - self.center_hz) / self.sample_rate
+        self._rebuild(list(range(len(self.channel_ids))), [omega])
+        self.channel_ids.append(channel_id)
+        return channel_id
+
+    def remove_channel(self, channel_id: int) -> None:
+        if channel_id not in self.channel_ids:
+            return
+        keep = [index for index, other in enumerate(self.channel_ids) if other != channel_id]
+        self._rebuild(keep, [])
+        self.channel_ids = [self.channel_ids[index] for index in keep]
+
+    def _oscillator_table(self, length: int) -> np.ndarray:
+        if self._oscillator.shape != (len(self.channel_ids), length):
+            steps = np.arange(length)
+            self._oscillator = np.exp(-1j * self.omega[:, None] * steps[None, :]).astype(np.complex64)
+        return self._oscillator
+
+    def process(self, iq: np.ndarray) -> dict[int, np.ndarray]:
+        """Demodulate one block; ``iq`` is DC-corrected in place."""
+        if not self.channel_ids:
+            return {}
+        length = len(iq) - len(iq) % self.block_multiple
+        iq = iq[:length]
+        iq -= iq.mean()
+        oscillator = self._oscillator_table(length)
+        if self._mixed.shape != oscillator.shape:
+            self._mixed = np.empty(oscillator.shape, dtype=np.complex64)
+        np.multiply(iq[None, :], oscillator, out=self._mixed)
+        self._mixed *= np.exp(-1j * self.phase).astype(np.complex64)[:, None]
+        self.phase = (self.phase + self.omega * length) % (2 * np.pi)
+
+        baseband = self.iq_filter.process(self._mixed)
+        demodulated = self.discriminator.process(baseband)
+        audio = self.audio_filter.process(demodulated)
+
+        if self._pcm.shape != audio.shape:
+            self._scaled = np.empty(audio.shape, dtype=np.float32)
+            self._pcm = np.empty(audio.shape, dtype=np.int16)
+        np.multiply(audio, np.float32(OUTPUT_GAIN * 32767), out=self._scaled)
+        np.clip(self._scaled, -32768, 32767, out=self._scaled)
+        np.copyto(self._pcm, self._scaled, casting="unsafe")
+        return {channel_id: self._pcm[index] for index, channel_id in enumerate(self.channel_ids)}
+
+
+class WbfmDemodulator:
+    """Streaming single-station demodulator: raw u8 IQ bytes in, PCM bytes out.
+
+    The tuner is set ``tuning_offset_hz`` away from the station so the
+    RTL-SDR DC spike falls outside the channel; the channelizer shifts the
+    station back to baseband.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 1_200_000,
+        tuning_offset_hz: float = 250_000,
+        deemphasis_tau: float = DEEMPHASIS_TAU,
+    ) -> None:
+        self.tuning_offset_hz = tuning_offset_hz
+        self.channelizer = Channelizer(sample_rate, tuning_offset_hz, deemphasis_tau=deemphasis_tau)
+        self.channel_id = self.channelizer.add_channel(0.0)
+        self.audio_rate = self.channelizer.audio_rate
+        self.block_multiple = self.channelizer.block_multiple
+        self._samples = np.zeros(0, dtype=np.float32)
+
+    def process(self, raw: bytes) -> np.ndarray:
+        iq = iq_from_u8(raw, out=self._samples)
+        self._samples = iq.view(np.float32)
+        return self.channelizer.process(iq)[self.channel_id]
+
+
+def pcm_window_levels(pcm: bytes, channels: int, window_frames: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """RMS, peak (fractions of full scale) and zero-crossing rate per window of s16le PCM.
+
+    Channels are averaged to mono first; a trailing partial window is ignored.
+    Broadband FM static has a zero-crossing rate near 0.5, programme audio far less.
+    """
+    samples = np.frombuffer(pcm, dtype="<i2")
+    frames = len(samples) // channels
+    windows = frames // window_frames
+    mono = samples[: windows * window_frames * channels].reshape(windows, window_frames, channels)
+    mono = mono.mean(axis=2, dtype=np.float32) / np.float32(32768)
+    rms = np.sqrt(np.mean(mono * mono, axis=1))
+    peak = np.max(np.abs(mono), axis=1)
+    signs = np.signbit(mono)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return rms, peak, zcr
+
+
+def synthetic_iq(sample_rate: int, seconds: float, offsets_hz: list[float]) -> bytes:
+    """Unsigned 8-bit IQ with one tone-modulated FM carrier per offset."""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    signal = np.zeros(len(t), dtype=np.complex128)
+    for index, offset_hz in enumerate(offsets_hz):
+        tone_hz = 1000 * (index + 1)
+        phase = 2 * np.pi * offset_hz * t + (MAX_DEVIATION_HZ / 2 / tone_hz) * np.sin(2 * np.pi * tone_hz * t)
+        signal += np.exp(1j * phase) / max(1, len(offsets_hz))
+    interleaved = np.empty(2 * len(t), dtype=np.float64)
+    interleaved[0::2] = signal.real
+    interleaved[1::2] = signal.imag
+    return np.clip(interleaved * 100 + 127.5, 0, 255).astype(np.uint8).tobytes()
+
+
+def benchmark(sample_rate: int, seconds: float, channels: int, block_sec: float = 0.1) -> dict:
+    """Demodulate synthetic IQ and report realtime factor per core (CPU time)."""
+    offsets = [(index - (channels - 1) / 2) * 300_000 for index in range(channels)]
+    if channels == 1:
+        demodulator = WbfmDemodulator(sample_rate)
+        raw = synthetic_iq(sample_rate, seconds, [-demodulator.tuning_offset_hz])
+        process = demodulator.process
+        block_multiple = demodulator.block_multiple
+    else:
+        channelizer = Channelizer(sample_rate, 0.0)
+        for offset in offsets:
+            channelizer.add_channel(offset)
+        raw = synthetic_iq(sample_rate, seconds, offsets)
+        buffer = np.zeros(0, dtype=np.float32)
+
+        def process(chunk: bytes) -> dict:
+            nonlocal buffer
+            iq = iq_from_u8(chunk, out=buffer)
+            buffer = iq.view(np.float32)
+            return channelizer.process(iq)
+
+        block_multiple = channelizer.block_multiple
+    block_samples = int(sample_rate * block_sec)
+    block_bytes = 2 * (block_samples - block_samples % block_multiple)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for offset in range(0, len(raw) - block_bytes + 1, block_bytes):
+        process(raw[offset : offset + block_bytes])
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return {
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "seconds": seconds,
+        "cpu_sec": round(cpu, 4),
+        "wall_sec": round(wall, 4),
+        "realtime_factor_per_core": round(seconds / cpu, 2) if cpu else None,
+        "realtime_factor_wall": round(seconds / wall, 2) if wall else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy FM demodulator on synthetic IQ.")
+    parser.add_argument("--sample-rate", type=int, default=None, help="IQ sample rate (default depends on channels)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Seconds of synthetic IQ")
+    parser.add_argument("--channels", type=int, default=1, help="Stations to demodulate at once")
+    args = parser.parse_args()
+    sample_rate = args.sample_rate or (1_200_000 if args.channels == 1 else 2_400_000)
+    result = benchmark(sample_rate, args.seconds, args.channels)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ else
 fi
 
 echo "Deploying to ${PI_USER}@${PI_HOST}:${PI_PATH}"
-${SCP_CMD[@]} "${ROOT_DIR}/server.py" "${ROOT_DIR}/config.json" "${PI_USER}@${PI_HOST}:${PI_PATH}/"
+${SCP_CMD[@]} "${ROOT_DIR}/server.py" "${ROOT_DIR}/dsp.py" "${ROOT_DIR}/config.json" "${PI_USER}@${PI_HOST}:${PI_PATH}/"
 ${SCP_CMD[@]} "${ROOT_DIR}/static/index.html" "${ROOT_DIR}/static/app.css" "${ROOT_DIR}/static/app.js" "${PI_USER}@${PI_HOST}:${PI_PATH}/static/"
 
 ${SSH_CMD[@]} "${PI_USER}@${PI_HOST}" "pkill -f '^python3 ${PI_PATH}/server.py' || true; nohup python3 ${PI_PATH}/server.py > ${PI_PATH}/server.log 2>&1 &"
@@ -19,7 +19,7 @@ fi
 
 echo "Installing dependencies..."
 apt-get update -y
-apt-get install -y rtl-sdr ffmpeg lighttpd
+apt-get install -y rtl-sdr ffmpeg lighttpd python3-numpy
 
 echo "Preparing directories..."
 mkdir -p "${INSTALL_DIR}/recordings" "${INSTALL_DIR}/static" "/var/log/shiftfm-lighttpd"
@@ -28,7 +28,7 @@ chown -R www-data:www-data "/var/log/shiftfm-lighttpd"
 
 echo "Copying application files..."
 if [[ "${ROOT_DIR}" != "${INSTALL_DIR}" ]]; then
-  cp "${ROOT_DIR}/server.py" "${INSTALL_DIR}/"
+  cp "${ROOT_DIR}/server.py" "${ROOT_DIR}/dsp.py" "${INSTALL_DIR}/"
   cp "${ROOT_DIR}/static/index.html" "${ROOT_DIR}/static/app.css" "${ROOT_DIR}/static/app.js" "${INSTALL_DIR}/static/"
 fi
 
@@ -1,14 +1,35 @@
+import asyncio
+import atexit
+import base64
+import bisect
+import contextlib
+import copy
+import gzip
+import hashlib
+import heapq
+import http.client
+import io
 import json
+import math
+import mmap
+import os
 import re
+import select
+import shutil
+import signal
 import subprocess
+import sys
+import tempfile
 import threading
 import time
-from datetime import datetime
-from email.utils import formatdate
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dt_time, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
 from html import escape
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 from urllib.parse import parse_qs, urlparse
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -17,12 +38,21 @@ RECORDINGS_DIR = BASE_DIR / "recordings"
 SCHEDULES_PATH = BASE_DIR / "schedules.json"
 CONFIG_PATH = BASE_DIR / "config.json"
 RSS_PATH = BASE_DIR / "rss.xml"
+RENDITIONS_DIR = BASE_DIR / "renditions"
+CATALOG_PATH = BASE_DIR / "recordings.jsonl"
+TIMESHIFT_PATH = BASE_DIR / "timeshift.pcm"
+PENDING_DIR = BASE_DIR / "pending"
+ENCODE_JOURNAL_PATH = BASE_DIR / "encode_jobs.json"
+LIVE_DIR = BASE_DIR / "live"
+RECORDING_JOURNAL_PATH = BASE_DIR / "recording_journal.jsonl"
 
 DEFAULT_CONFIG = {
     "base_url": "http://localhost:8088",
     "rss_title": "shiftFM",
     "rss_description": "Time-shifted FM recordings",
     "rss_itunes_category": "News",
+    "capture_mode": "single",
+    "encode_mode": "live",
 }
 
 SAMPLE_SCHEDULES = {
@@ -31,7 +61,91 @@ SAMPLE_SCHEDULES = {
 
 active_recordings = set()
 active_lock = threading.Lock()
+MISSED_START_GRACE_SEC = 60
+SCHEDULER_MAX_SLEEP_SEC = 300
+WRITE_BEHIND_DELAY_SEC = 0.5
+ENCODE_NICE = 19
+ENCODE_RETRIES = 3
+ENCODE_RETRY_DELAY_SEC = 30.0
+PREROLL_SEC = 5
+ASYNC_MAX_CONNECTIONS = 256
+ASYNC_HANDLER_THREADS = 4
+ASYNC_KEEPALIVE_SEC = 30
+ASYNC_MAX_HEADER_BYTES = 64 * 1024
+ASYNC_MAX_BODY_BYTES = 1024 * 1024
+CAPTURE_CHANNEL_WIDTH_MHZ = 0.2
+WIDEBAND_SAMPLE_RATE = 2_400_000
+WIDEBAND_USABLE_FRACTION = 0.8
+INPROCESS_SAMPLE_RATE = 1_200_000
+DEEMPHASIS_US = 75
+INPROCESS_TUNING_OFFSET_MHZ = 0.25
+IQ_BLOCK_SEC = 0.1
+IQ_AUDIO_RATE = 48_000
+RTL_FM_PCM_RATE = 16_000
+RTL_FM_PCM_CHANNELS = 2
+RING_READ_CHUNK = 64 * 1024
+CAPTURE_STALL_SEC = 3.0
+CAPTURE_MIN_RATE = 0.5
+CAPTURE_START_GRACE_SEC = 5.0
+CAPTURE_RESTART_DELAY_SEC = 1.0
+CAPTURE_RESTART_MAX_DELAY_SEC = 60.0
+RTL_FM_DROP_RE = re.compile(rb"lost at least|dropped|overflow|underrun", re.IGNORECASE)
+WEEK_SEC = 7 * 86400
+ANALYSIS_WINDOW_SEC = 1.0
+SILENCE_THRESHOLD_DBFS = -50.0
+SILENCE_MIN_SEC = 2.0
+STATIC_ZCR = 0.35
+DEAD_AIR_ABORT_SEC = 120
+DEAD_AIR_MIN_ABORT_SEC = 60
+DEAD_AIR_RETRIES = 2
+DEAD_AIR_MIN_RETRY_SEC = 60
+RETENTION_INTERVAL_SEC = 3600
+RECORDING_PROGRESS_SEC = 30
+RESUME_MIN_SEC = 60
+LIVE_SEGMENT_SEC = 10
+LIVE_PLAYLIST_NAME = "index.m3u8"
+LIVE_MIME_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".ts": "video/mp2t"}
+LIVE_FILE_RE = re.compile(r"/live/([A-Za-z0-9._-]+)/(index\.m3u8|seg\d+\.ts)")
+MP3_BYTES_PER_SEC = 128_000 // 8  # ffmpeg's default libmp3lame bitrate
+RENDITION_CODECS = {
+    "opus": (".opus", "audio/ogg", ["-c:a", "libopus", "-application", "voip", "-f", "ogg"]),
+    "aac": (".m4a", "audio/mp4", ["-c:a", "aac", "-f", "mp4"]),
+    "mp3": (".mp3", "audio/mpeg", ["-c:a", "libmp3lame", "-f", "mp3"]),
+}
+RENDITION_ID_RE = re.compile(r"[A-Za-z0-9_-]+")
+RENDITION_FEED_RE = re.compile(r"/rss-([A-Za-z0-9_-]+)\.xml")
+PROGRAM_FEED_RE = re.compile(r"/rss/([A-Za-z0-9_-]+)\.xml")
+PROGRAM_FEED_ITEMS = 50
+STATIC_RECHECK_SEC = 2.0
+STATIC_MIME_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+}
+STATIC_LINK_RE = re.compile(rb'"/static/([A-Za-z0-9._-]+)"')
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+KNOWN_ROUTES = {
+    "/",
+    "/index.html",
+    "/rss.xml",
+    "/metrics",
+    "/api/schedules",
+    "/api/config",
+    "/api/record-now",
+    "/api/recordings",
+    "/api/timeshift",
+    "/api/timeshift/save",
+    "/api/capture-latency",
+    "/api/devices",
+    "/api/retention",
+    "/api/encode-jobs",
+}
+RECORDINGS_PAGE_LIMIT = 50
+RECORDINGS_MAX_PAGE_LIMIT = 500
 DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+RECORDING_NAME_RE = re.compile(
+    r"^(?P<name>.+)_(?P<freq>\d+(?:\.\d+)?)_(?P<stamp>\d{4}-\d{2}-\d{2}_\d{4})$"
+)
 
 
 def load_json(path: Path, default_payload: dict) -> dict:
@@ -43,11 +157,199 @@ def load_json(path: Path, default_payload: dict) -> dict:
 
 
 def save_json(path: Path, payload: dict) -> None:
-    tmp_path = path.with_suffix(".tmp")
-    with tmp_path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, indent=2, sort_keys=True)
-        handle.write("\n")
-    tmp_path.replace(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+
+class JsonStore:
+    """Process-wide copy of a JSON document with write-behind persistence.
+
+    Reads are served from memory and only re-parse the file when its mtime
+    changes outside this process. ``update`` applies a mutator under the lock,
+    so concurrent read-modify-write cycles cannot lose each other's changes;
+    rapid updates are coalesced into one atomic write.
+    """
+
+    def __init__(
+        self, path: Path, default_payload: dict, on_load: Optional[Callable[[dict], None]] = None
+    ) -> None:
+        self.path = path
+        self.default_payload = default_payload
+        self.on_load = on_load
+        self.lock = threading.RLock()
+        self.data: Optional[dict] = None
+        self.file_mtime_ns: Optional[int] = None
+        self.dirty = False
+        self._timer: Optional[threading.Timer] = None
+
+    def _stat_mtime(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _ensure_loaded(self) -> dict:
+        if self.data is not None and (self.dirty or self._stat_mtime() == self.file_mtime_ns):
+            return self.data
+        self.data = load_json(self.path, self.default_payload)
+        self.file_mtime_ns = self._stat_mtime()
+        if self.on_load:
+            self.on_load(self.data)
+        return self.data
+
+    def read(self) -> dict:
+        with self.lock:
+            return copy.deepcopy(self._ensure_loaded())
+
+    def update(self, mutator: Callable[[dict], Any]) -> Any:
+        with self.lock:
+            data = copy.deepcopy(self._ensure_loaded())
+            result = mutator(data)
+            if data != self.data:
+                self.data = data
+                self.dirty = True
+                if self._timer is None:
+                    self._timer = threading.Timer(WRITE_BEHIND_DELAY_SEC, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+            return result
+
+    def flush(self) -> None:
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.dirty or self.data is None:
+                return
+            save_json(self.path, self.data)
+            self.file_mtime_ns = self._stat_mtime()
+            self.dirty = False
+
+
+class Metrics:
+    """Counters, gauges and histograms exposed in the Prometheus text format.
+
+    Each update is a dict change under one short lock; output is only
+    formatted when ``/metrics`` is scraped. Metrics must be described first.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.described: dict[str, tuple[str, str, tuple[float, ...]]] = {}
+        self.values: dict[tuple[str, tuple], Any] = {}
+
+    def describe(self, name: str, kind: str, help_text: str, buckets: tuple[float, ...] = ()) -> None:
+        self.described[name] = (kind, help_text, buckets)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        buckets = self.described[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * len(buckets) + [0, 0.0]
+            counts[bisect.bisect_left(buckets, value)] += 1
+            counts[-1] += value
+
+    def render(self) -> str:
+        with self.lock:
+            values = {
+                key: list(value) if isinstance(value, list) else value for key, value in self.values.items()
+            }
+        lines = []
+        for name, (kind, help_text, buckets) in sorted(self.described.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for (key_name, labels), value in sorted(values.items()):
+                if key_name != name:
+                    continue
+                if kind != "histogram":
+                    lines.append(f"{name}{format_labels(labels)} {value:g}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else f"{bound:g}"
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {value[-1]:g}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+metrics = Metrics()
+metrics.describe("shiftfm_http_requests_total", "counter", "HTTP requests by route, method and status.")
+metrics.describe(
+    "shiftfm_http_request_seconds", "histogram", "Time to handle an HTTP request by route.", LATENCY_BUCKETS
+)
+metrics.describe("shiftfm_http_response_bytes_total", "counter", "Response body bytes sent by route.")
+metrics.describe(
+    "shiftfm_scheduler_lag_seconds",
+    "histogram",
+    "How late the scheduler released a recording.",
+    (0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0),
+)
+metrics.describe(
+    "shiftfm_capture_start_late_seconds",
+    "histogram",
+    "Audio missed at the start of a recording because the first samples arrived late.",
+    (0.0, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0),
+)
+metrics.describe("shiftfm_capture_bytes_total", "counter", "PCM bytes read from capture pipes.")
+metrics.describe(
+    "shiftfm_capture_bytes_per_second",
+    "histogram",
+    "PCM rate each recording received from its capture pipe.",
+    (8_000, 16_000, 32_000, 48_000, 64_000, 96_000, 128_000, 192_000),
+)
+metrics.describe("shiftfm_capture_restarts_total", "counter", "rtl_fm restarts after a stall or early exit.")
+metrics.describe(
+    "shiftfm_capture_lost_seconds_total", "counter", "Audio bridged with silence while rtl_fm restarted."
+)
+metrics.describe("shiftfm_process_exits_total", "counter", "rtl_fm and ffmpeg exits by exit status.")
+metrics.describe("shiftfm_rtl_fm_drop_warnings_total", "counter", "Dropped-sample warnings from rtl_fm.")
+metrics.describe(
+    "shiftfm_encoder_cpu_seconds",
+    "histogram",
+    "CPU time each ffmpeg encoder used.",
+    (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+metrics.describe(
+    "shiftfm_feed_build_seconds", "histogram", "Time generate_rss took to rebuild the feeds.", LATENCY_BUCKETS
+)
+metrics.describe("shiftfm_recordings_missed_total", "counter", "Scheduled recordings that could not start.")
+metrics.describe("shiftfm_active_recordings", "gauge", "Recordings in progress.")
+metrics.describe("shiftfm_encode_queue_pending", "gauge", "Deferred encodes waiting or running.")
+metrics.describe("shiftfm_encode_failures_total", "counter", "Deferred encodes whose ffmpeg run failed.")
+metrics.describe("shiftfm_archive_bytes", "gauge", "Size of the recordings archive.")
 
 
 def sanitize_name(value: str) -> str:
@@ -77,177 +379,2693 @@ def parse_time(value: str) -> tuple[int, int]:
     return hour, minute
 
 
-def generate_filename(name: str, frequency_mhz: float) -> str:
-    stamp = datetime.now().strftime("%Y-%m-%d_%H%M")
+def generate_filename(name: str, frequency_mhz: float, started_at: Optional[datetime] = None) -> str:
+    stamp = (started_at or datetime.now()).strftime("%Y-%m-%d_%H%M")
     safe_name = sanitize_name(name)
     freq = f"{frequency_mhz:.1f}"
     return f"{safe_name}_{freq}_{stamp}.mp3"
 
 
-def record_station(name: str, frequency_mhz: float, duration_sec: int, config: dict) -> str:
-    RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
-    filename = generate_filename(name, frequency_mhz)
-    output_path = RECORDINGS_DIR / filename
-
-    rtl_cmd = [
-        "rtl_fm",
+def encoder_command(
+    output_path: Path, sample_rate: int, channels: int, duration_sec: Optional[int] = None
+) -> list[str]:
+    command = [
+        "ffmpeg",
+        "-loglevel",
+        "error",
         "-f",
-        f"{frequency_mhz}e6",
-        "-M",
-        "wbfm",
-        "-s",
-        "200k",
+        "s16le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        str(channels),
+        "-i",
+        "-",
     ]
-    ffmpeg_cmd = [
+    if duration_sec is not None:
+        command += ["-t", str(duration_sec)]
+    if output_path.suffix == ".flac":
+        # Deferred captures only need to be cheap to write; encode_queue makes the MP3.
+        command += ["-c:a", "flac", "-compression_level", "0"]
+    return command + [str(output_path)]
+
+
+def live_encoder_command(live_dir: Path, sample_rate: int, channels: int, segment_sec: int) -> list[str]:
+    """MP3-in-MPEG-TS segments plus an EVENT playlist, so listeners can start from the beginning."""
+    return [
         "ffmpeg",
         "-loglevel",
         "error",
         "-f",
         "s16le",
         "-ar",
-        "16000",
+        str(sample_rate),
         "-ac",
-        "2",
+        str(channels),
         "-i",
         "-",
-        "-t",
-        str(duration_sec),
-        str(output_path),
+        "-c:a",
+        "libmp3lame",
+        "-f",
+        "hls",
+        "-hls_time",
+        str(segment_sec),
+        "-hls_list_size",
+        "0",
+        "-hls_playlist_type",
+        "event",
+        "-hls_segment_filename",
+        str(live_dir / "seg%05d.ts"),
+        str(live_dir / LIVE_PLAYLIST_NAME),
     ]
 
-    rtl = subprocess.Popen(rtl_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
-    ffmpeg = subprocess.Popen(ffmpeg_cmd, stdin=rtl.stdout, stderr=subprocess.DEVNULL)
-    if rtl.stdout:
-        rtl.stdout.close()
-    ffmpeg.wait()
-    rtl.terminate()
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
     try:
-        rtl.wait(timeout=5)
+        process.wait(timeout=5)
     except subprocess.TimeoutExpired:
-        rtl.kill()
-    generate_rss(config)
-    return filename
+        process.kill()
+        process.wait()
 
 
-def generate_rss(config: dict) -> None:
-    base_url = config.get("base_url", DEFAULT_CONFIG["base_url"]).rstrip("/")
-    title = escape(config.get("rss_title", DEFAULT_CONFIG["rss_title"]))
-    description = escape(config.get("rss_description", DEFAULT_CONFIG["rss_description"]))
-    itunes_category = escape(
-        config.get("rss_itunes_category", DEFAULT_CONFIG["rss_itunes_category"])
+def load_brotli():
+    """The optional ``brotli`` module, or None when it is not installed."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def load_dsp():
+    try:
+        import dsp
+    except ImportError as exc:
+        raise RuntimeError(
+            "capture_mode 'wideband' and 'inprocess' require numpy (apt install python3-numpy)"
+        ) from exc
+    return dsp
+
+
+def capture_band_fits(frequencies: list[float], config: dict) -> bool:
+    if len(frequencies) < 2:
+        return True
+    sample_rate = int(config.get("wideband_sample_rate", WIDEBAND_SAMPLE_RATE))
+    span = max(frequencies) - min(frequencies) + CAPTURE_CHANNEL_WIDTH_MHZ
+    return span <= sample_rate * WIDEBAND_USABLE_FRACTION / 1e6
+
+
+def wideband_center(
+    frequency_mhz: float, duration_sec: int, config: dict, starts_at: Optional[float] = None
+) -> float:
+    """Centre a new capture on every schedule chained to the show starting at ``starts_at`` (default now)."""
+    start = datetime.fromtimestamp(starts_at) if starts_at is not None else datetime.now()
+    occurrence = {
+        "start_time": start.strftime("%H:%M"),
+        "days": [DAYS[start.weekday()]],
+        "duration_sec": duration_sec,
+    }
+    with schedule_store.lock:
+        frequencies = [frequency_mhz] + [
+            schedule_index.frequencies[schedule_id]
+            for schedule_id in schedule_index.component(occurrence)
+        ]
+    if not capture_band_fits(frequencies, config):
+        return frequency_mhz
+    return (max(frequencies) + min(frequencies)) / 2
+
+
+class NoFreeTuner(RuntimeError):
+    pass
+
+
+def configured_devices(config: dict) -> list[dict]:
+    """Tuners from ``devices`` in config; one implicit dongle at index 0 by default."""
+    devices = []
+    for position, device in enumerate(config.get("devices") or [{"index": 0}]):
+        selector = str(device.get("serial") or device.get("index", position))
+        devices.append(
+            {
+                "id": str(device.get("id", selector)),
+                "selector": selector,
+                "ppm": int(device.get("ppm", 0)),
+                "gain": device.get("gain"),
+            }
+        )
+    return devices
+
+
+def device_args(device: Optional[dict]) -> list[str]:
+    """rtl_fm / rtl_sdr options selecting and calibrating ``device``."""
+    if device is None:
+        return []
+    args = ["-d", device["selector"]]
+    if device["ppm"]:
+        args += ["-p", str(device["ppm"])]
+    if device.get("gain") not in (None, "", "auto"):
+        args += ["-g", str(device["gain"])]
+    return args
+
+
+class TunerPool:
+    """Registered RTL-SDR dongles and the capture currently holding each."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.devices = configured_devices({})
+        self.holders: dict[str, str] = {}
+
+    def configure(self, config: dict) -> None:
+        with self.lock:
+            self.devices = configured_devices(config)
+
+    def capacity(self) -> int:
+        with self.lock:
+            return len(self.devices)
+
+    def free_count(self) -> int:
+        with self.lock:
+            return sum(1 for device in self.devices if device["id"] not in self.holders)
+
+    def acquire(self, label: str) -> Optional[dict]:
+        with self.lock:
+            for device in self.devices:
+                if device["id"] not in self.holders:
+                    self.holders[device["id"]] = label
+                    return dict(device)
+            return None
+
+    def release(self, device: dict) -> None:
+        with self.lock:
+            self.holders.pop(device["id"], None)
+
+    def status(self) -> list[dict]:
+        with self.lock:
+            return [
+                {**device, "busy": device["id"] in self.holders, "holder": self.holders.get(device["id"])}
+                for device in self.devices
+            ]
+
+
+tuner_pool = TunerPool()
+
+
+@contextlib.contextmanager
+def claim_tuner(label: str, preempt: bool = True):
+    """Hold a free tuner for the block, pausing the timeshift buffer for its dongle if needed."""
+    device = tuner_pool.acquire(label)
+    if device is not None:
+        try:
+            yield device
+        finally:
+            tuner_pool.release(device)
+            if preempt:
+                timeshift_buffer.retry()
+        return
+    if not preempt or not timeshift_buffer.holds_tuner():
+        raise NoFreeTuner(f"No free tuner for {label}")
+    with timeshift_buffer.suspended():
+        device = tuner_pool.acquire(label)
+        if device is None:
+            raise NoFreeTuner(f"No free tuner for {label}")
+        try:
+            yield device
+        finally:
+            tuner_pool.release(device)
+
+
+def tuner_available() -> bool:
+    return tuner_pool.free_count() > 0 or timeshift_buffer.holds_tuner()
+
+
+capture_latencies: deque[dict] = deque(maxlen=100)
+
+
+def note_start_latency(label: str, latency_sec: float) -> None:
+    capture_latencies.append(
+        {"label": label, "latency_sec": round(latency_sec, 3), "at": datetime.now().isoformat(timespec="seconds")}
     )
 
-    items = []
-    for path in sorted(RECORDINGS_DIR.glob("*.mp3"), key=lambda p: p.stat().st_mtime, reverse=True):
-        stat = path.stat()
-        item_title = escape(path.stem.replace("_", " "))
-        url = f"{base_url}/recordings/{path.name}"
-        pub_date = formatdate(stat.st_mtime, usegmt=True)
-        duration_sec = get_duration_seconds(path)
-        duration_tag = ""
-        if duration_sec is not None:
-            duration_tag = f"        <itunes:duration>{format_duration(duration_sec)}</itunes:duration>"
-        items.append(
-            "\n".join(
-                [
-                    "      <item>",
-                    f"        <title>{item_title}</title>",
-                    f"        <enclosure url=\"{escape(url)}\" length=\"{stat.st_size}\" type=\"audio/mpeg\" />",
-                    f"        <guid>{escape(url)}</guid>",
-                    f"        <pubDate>{pub_date}</pubDate>",
-                    duration_tag,
-                    "      </item>",
-                ]
-            )
+
+def leading_skip(starts_at: float, arrived_at: float, chunk_size: int, byte_rate: int, frame: int) -> int:
+    """Bytes to drop from a stream whose first chunk arrived at ``arrived_at`` to begin at ``starts_at``."""
+    first_byte_at = arrived_at - chunk_size / byte_rate
+    skip = max(0, round((starts_at - first_byte_at) * byte_rate))
+    return skip - skip % frame
+
+
+class TrimmedSink:
+    """Passes on exactly ``duration_sec`` of PCM beginning at the instant ``starts_at``.
+
+    Audio captured before ``starts_at`` (pre-roll) is dropped and ``done`` is
+    set once the full duration has been written. The delay from creating the
+    sink to the first audio arriving is logged as the capture's start latency.
+    """
+
+    def __init__(
+        self, sink: Any, sample_rate: int, channels: int, starts_at: float, duration_sec: int, label: str
+    ) -> None:
+        self.sink = sink
+        self.frame = 2 * channels
+        self.byte_rate = sample_rate * self.frame
+        self.starts_at = starts_at
+        self.remaining = duration_sec * self.byte_rate
+        self.label = label
+        self.created_at = time.time()
+        self.first_at = 0.0
+        self.origin = starts_at
+        self.received = 0
+        self.total = self.remaining
+        self.skip: Optional[int] = None
+        self.done = threading.Event()
+
+    def write(self, data: bytes) -> None:
+        if self.done.is_set():
+            return
+        view = memoryview(data)
+        self.received += len(view)
+        metrics.inc("shiftfm_capture_bytes_total", len(view))
+        if self.skip is None:
+            arrived_at = time.time()
+            note_start_latency(self.label, arrived_at - self.created_at)
+            self.first_at = arrived_at - len(view) / self.byte_rate
+            metrics.observe("shiftfm_capture_start_late_seconds", max(0.0, self.first_at - self.starts_at))
+            self.skip = leading_skip(self.starts_at, arrived_at, len(view), self.byte_rate, self.frame)
+            self.origin = max(self.starts_at, self.first_at)
+        if self.skip:
+            dropped = min(self.skip, len(view))
+            self.skip -= dropped
+            view = view[dropped:]
+        view = view[: self.remaining]
+        if view:
+            self.sink.write(view)
+            self.remaining -= len(view)
+        self._check_done()
+
+    def fill_silence(self, until: float) -> int:
+        """Write silence so the output reaches wall time ``until``; returns the bytes written.
+
+        Bridges a capture restart so the rest of the recording stays aligned
+        with the clock. A restart during pre-roll re-aligns on the next chunk.
+        """
+        if self.done.is_set():
+            return 0
+        if self.skip is None or self.skip > 0:
+            if until <= self.starts_at:
+                self.skip = None
+                return 0
+            self.skip = 0
+            self.origin = self.starts_at
+            self.first_at = self.first_at or self.starts_at
+        gap = round((until - self.origin) * self.byte_rate) - (self.total - self.remaining)
+        gap = min(gap - gap % self.frame, self.remaining)
+        if gap <= 0:
+            return 0
+        silence = bytes(min(gap, RING_READ_CHUNK))
+        left = gap
+        while left > 0:
+            self.sink.write(silence[: min(left, len(silence))])
+            left -= len(silence)
+        self.remaining -= gap
+        self._check_done()
+        return gap
+
+    def _check_done(self) -> None:
+        if self.remaining <= 0 or getattr(self.sink, "aborted", False):
+            self.done.set()
+            elapsed = time.time() - self.first_at
+            if elapsed > 0:
+                metrics.observe("shiftfm_capture_bytes_per_second", self.received / elapsed)
+
+
+class EncoderSink:
+    """ffmpeg encoder fed PCM through its stdin."""
+
+    aborted = False
+
+    def __init__(self, output_path: Path, sample_rate: int, channels: int) -> None:
+        self.process = subprocess.Popen(
+            encoder_command(output_path, sample_rate, channels),
+            stdin=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
         )
 
-    payload = "\n".join(
-        [
-            "<?xml version=\"1.0\" encoding=\"UTF-8\"?>",
-            "<rss version=\"2.0\" xmlns:itunes=\"http://www.itunes.com/dtds/podcast-1.0.dtd\">",
-            "  <channel>",
-            f"    <title>{title}</title>",
-            f"    <link>{escape(base_url)}/rss.xml</link>",
-            f"    <description>{description}</description>",
-            f"    <itunes:category text=\"{itunes_category}\" />",
-            "\n".join(items),
-            "  </channel>",
-            "</rss>",
-            "",
+    def write(self, data: bytes) -> None:
+        self.process.stdin.write(data)
+
+    def close(self) -> int:
+        with contextlib.suppress(BrokenPipeError):
+            self.process.stdin.close()
+        try:
+            _, status, usage = os.wait4(self.process.pid, 0)
+        except ChildProcessError:
+            return self.process.wait()
+        self.process.returncode = os.waitstatus_to_exitcode(status)
+        metrics.observe("shiftfm_encoder_cpu_seconds", usage.ru_utime + usage.ru_stime)
+        note_process_exit("ffmpeg", self.process.returncode)
+        return self.process.returncode
+
+
+class LiveEncoderSink(EncoderSink):
+    """Encoder writing HLS segments of an in-progress recording; joined into the MP3 on close."""
+
+    def __init__(self, output_path: Path, sample_rate: int, channels: int, config: dict) -> None:
+        self.output_path = output_path
+        self.live_dir = live_dir(output_path.name)
+        shutil.rmtree(self.live_dir, ignore_errors=True)
+        self.live_dir.mkdir(parents=True)
+        segment_sec = max(int(config.get("live_segment_sec", LIVE_SEGMENT_SEC)), 1)
+        self.process = subprocess.Popen(
+            live_encoder_command(self.live_dir, sample_rate, channels, segment_sec),
+            stdin=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        live_recordings.start(output_path.name, config)
+
+    def close(self) -> int:
+        returncode = super().close()
+        try:
+            joined = join_segments(self.live_dir, self.output_path)
+        finally:
+            live_recordings.finish(self.output_path.name)
+        if joined == 0:
+            shutil.rmtree(self.live_dir, ignore_errors=True)
+        return returncode or joined
+
+
+def live_dir(recording_name: str) -> Path:
+    return LIVE_DIR / Path(recording_name).stem
+
+
+def live_segments(directory: Path) -> list[str]:
+    """Segment names listed by a live playlist, in order."""
+    try:
+        lines = (directory / LIVE_PLAYLIST_NAME).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def join_segments(directory: Path, output_path: Path) -> int:
+    """Concatenate a live recording's segments into ``output_path`` by stream copy."""
+    segments = live_segments(directory)
+    if not segments:
+        return 1
+    list_path = directory / "segments.txt"
+    list_path.write_text("".join(f"file '{name}'\n" for name in segments), encoding="utf-8")
+    partial = output_path.with_name(f".{output_path.name}.part")
+    command = ["ffmpeg", "-loglevel", "error", "-y", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+    command += ["-map", "0:a", "-c", "copy", "-f", "mp3", str(partial)]
+    result = subprocess.run(command, stdin=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    note_process_exit("ffmpeg", result.returncode)
+    if result.returncode != 0 or not partial.exists():
+        partial.unlink(missing_ok=True)
+        return result.returncode or 1
+    os.replace(partial, output_path)
+    return 0
+
+
+class LiveRecordings:
+    """Recordings being encoded as live segments, listed at the top of the feeds until they finish."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.started: dict[str, float] = {}
+
+    def start(self, recording_name: str, config: dict) -> None:
+        with self.lock:
+            self.started[recording_name] = time.time()
+        threading.Thread(target=generate_rss, args=(config,), daemon=True).start()
+
+    def finish(self, recording_name: str) -> None:
+        with self.lock:
+            self.started.pop(recording_name, None)
+
+    def active(self, recording_name: str) -> bool:
+        with self.lock:
+            return recording_name in self.started
+
+    def entries(self) -> list[dict]:
+        """Feed entries for the live playlists, newest first."""
+        with self.lock:
+            started = sorted(self.started.items(), key=lambda item: item[1], reverse=True)
+        return [
+            {
+                "name": f"{Path(name).stem}/{LIVE_PLAYLIST_NAME}",
+                "title": f"{Path(name).stem.replace('_', ' ')} (live)",
+                "url_path": "live",
+                "mime_type": LIVE_MIME_TYPES[".m3u8"],
+                "program": parse_recording_name(name)["program"],
+                "size": 0,
+                "mtime": started_at,
+            }
+            for name, started_at in started
         ]
-    )
-    RSS_PATH.write_text(payload, encoding="utf-8")
 
 
-def load_schedules() -> dict:
-    return load_json(SCHEDULES_PATH, SAMPLE_SCHEDULES)
+live_recordings = LiveRecordings()
 
 
-def load_config() -> dict:
-    payload = load_json(CONFIG_PATH, DEFAULT_CONFIG)
-    merged = DEFAULT_CONFIG.copy()
-    merged.update(payload)
-    return merged
+def note_process_exit(name: str, returncode: Optional[int]) -> None:
+    metrics.inc("shiftfm_process_exits_total", process=name, status=str(returncode))
 
 
-def get_duration_seconds(path: Path) -> Optional[int]:
+def analysis_path(recording_name: str, directory: Optional[Path] = None) -> Path:
+    """Sidecar report of a recording; deferred captures write it under their final name."""
+    return (directory or RECORDINGS_DIR) / f"{Path(recording_name).stem}.analysis.json"
+
+
+def load_analysis(recording_name: str, directory: Optional[Path] = None) -> Optional[dict]:
     try:
-        result = subprocess.run(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                str(path),
-            ],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
+        with analysis_path(recording_name, directory).open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
         return None
+
+
+def level_dbfs(level: float) -> Optional[float]:
+    return round(20 * math.log10(level), 1) if level > 0 else None
+
+
+class AnalysisSink:
+    """Measures PCM on its way to ``sink`` and writes a sidecar report on close.
+
+    Levels come from ``dsp.pcm_window_levels`` over ANALYSIS_WINDOW_SEC windows.
+    A window is dead air when it is below the silence threshold or looks like
+    static. With ``abort_sec`` set, ``aborted`` turns true after that much dead
+    air in a row so the capture can stop early and be retried.
+    """
+
+    def __init__(
+        self, sink: Any, sample_rate: int, channels: int, report_path: Path, config: dict, abort_sec: float = 0
+    ) -> None:
+        self.dsp = load_dsp()
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.report_path = report_path
+        self.window_frames = int(sample_rate * ANALYSIS_WINDOW_SEC)
+        self.window_bytes = self.window_frames * 2 * channels
+        self.silence_level = 10 ** (float(config.get("silence_threshold_dbfs", SILENCE_THRESHOLD_DBFS)) / 20)
+        self.abort_sec = abort_sec
+        self.pending = bytearray()
+        self.total_bytes = 0
+        self.windows = 0
+        self.energy = 0.0
+        self.peak = 0.0
+        self.dead_windows = 0
+        self.dead_run_sec = 0.0
+        self.silence_start: Optional[float] = None
+        self.silences: list[list[float]] = []
+        self.aborted = False
+
+    def write(self, data: bytes) -> None:
+        self.sink.write(data)
+        self.total_bytes += len(data)
+        self.pending += data
+        whole = len(self.pending) - len(self.pending) % self.window_bytes
+        if whole:
+            self._measure(bytes(self.pending[:whole]), self.window_frames)
+            del self.pending[:whole]
+
+    def _measure(self, pcm: bytes, window_frames: int) -> None:
+        rms, peak, zcr = self.dsp.pcm_window_levels(pcm, self.channels, window_frames)
+        silent = rms < self.silence_level
+        dead = silent | (zcr > STATIC_ZCR)
+        self.energy += float((rms * rms).sum()) * window_frames
+        self.peak = max(self.peak, float(peak.max()))
+        window_sec = window_frames / self.sample_rate
+        for is_silent, is_dead in zip(silent.tolist(), dead.tolist()):
+            at = self.windows * ANALYSIS_WINDOW_SEC
+            self.windows += 1
+            if is_silent and self.silence_start is None:
+                self.silence_start = at
+            elif not is_silent:
+                self._end_silence(at)
+            self.dead_windows += is_dead
+            self.dead_run_sec = self.dead_run_sec + window_sec if is_dead else 0.0
+            if self.abort_sec and self.dead_run_sec >= self.abort_sec:
+                self.aborted = True
+
+    def _end_silence(self, at: float) -> None:
+        if self.silence_start is not None and at - self.silence_start >= SILENCE_MIN_SEC:
+            self.silences.append([round(self.silence_start, 1), round(at, 1)])
+        self.silence_start = None
+
+    def report(self) -> dict:
+        frames = self.total_bytes // (2 * self.channels)
+        duration = frames / self.sample_rate
+        chapters = [0.0] + [end for _, end in self.silences if end < duration]
+        return {
+            "duration_sec": round(duration, 3),
+            "rms_dbfs": level_dbfs(math.sqrt(self.energy / frames)) if frames else None,
+            "peak_dbfs": level_dbfs(self.peak),
+            "dead_air_pct": round(100 * self.dead_windows / self.windows, 1) if self.windows else 0.0,
+            "silences": self.silences,
+            "chapters": chapters,
+            "aborted_dead_air": self.aborted,
+        }
+
+    def close(self) -> int:
+        result = self.sink.close()
+        tail_frames = len(self.pending) // (2 * self.channels)
+        if tail_frames:
+            self._measure(bytes(self.pending[: tail_frames * 2 * self.channels]), tail_frames)
+        self.pending.clear()
+        self._end_silence(self.total_bytes / (2 * self.channels * self.sample_rate))
+        with contextlib.suppress(OSError):
+            save_json(self.report_path, self.report())
+        return result
+
+
+def open_encoder(
+    output_path: Path, sample_rate: int, channels: int, config: dict, abortable: bool = False
+) -> Any:
+    """Encoder for a recording, behind an AnalysisSink unless analysis is off or NumPy is missing.
+
+    ``abortable`` captures stop after ``dead_air_abort_sec`` of dead air (0 disables).
+    With ``live_playback`` on, MP3 recordings are encoded as live HLS segments first.
+    """
+    if config.get("live_playback") and output_path.suffix == ".mp3":
+        encoder = LiveEncoderSink(output_path, sample_rate, channels, config)
+    else:
+        encoder = EncoderSink(output_path, sample_rate, channels)
+    if not config.get("analysis", True):
+        return encoder
+    abort_sec = float(config.get("dead_air_abort_sec", DEAD_AIR_ABORT_SEC)) if abortable else 0
+    if abort_sec:
+        abort_sec = max(abort_sec, DEAD_AIR_MIN_ABORT_SEC)
     try:
-        return int(float(result.stdout.strip()))
-    except ValueError:
-        return None
+        return AnalysisSink(encoder, sample_rate, channels, analysis_path(output_path.name), config, abort_sec)
+    except RuntimeError:
+        return encoder
 
 
-def format_duration(seconds: int) -> str:
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    secs = seconds % 60
-    if hours:
-        return f"{hours:d}:{minutes:02d}:{secs:02d}"
-    return f"{minutes:d}:{secs:02d}"
+class CaptureChannel:
+    def __init__(self, channel_id: int, sink: Any, total_samples: Optional[int]) -> None:
+        self.channel_id = channel_id
+        self.sink = sink
+        self.remaining = total_samples
+        self.done = threading.Event()
 
 
-def schedule_due(schedule: dict, now: datetime) -> bool:
-    if not schedule.get("enabled", True):
-        return False
-    days = schedule.get("days", [])
-    today = now.strftime("%a").lower()[:3]
-    if today not in [day.lower()[:3] for day in days]:
-        return False
+class IqCaptureSession:
+    """One rtl_sdr IQ capture demodulated in-process by the NumPy channelizer.
+
+    Each attached channel writes mono PCM at ``audio_rate`` into its own sink
+    and is finished after exactly ``duration_sec`` of audio (or runs until the
+    session stops when no duration is given). The capture stops by itself
+    when no channels remain; callers close their sinks once ``done`` is set.
+    """
+
+    def __init__(
+        self,
+        center_mhz: float,
+        sample_rate: int,
+        config: dict,
+        device: Optional[dict] = None,
+        on_close: Optional[Callable[[], None]] = None,
+    ) -> None:
+        dsp = load_dsp()
+        self.iq_from_u8 = dsp.iq_from_u8
+        self.sample_rate = sample_rate
+        self.channelizer = dsp.Channelizer(
+            sample_rate,
+            center_mhz * 1e6,
+            deemphasis_tau=float(config.get("deemphasis_us", DEEMPHASIS_US)) * 1e-6,
+        )
+        self.audio_rate = self.channelizer.audio_rate
+        self.lock = threading.Lock()
+        self.channels: dict[int, CaptureChannel] = {}
+        self.closed = False
+        self.stopping = False
+        self.process: Optional[subprocess.Popen] = None
+        self.on_close = on_close
+        self._samples = None
+        iq_path = config.get("iq_path")
+        if iq_path:
+            self.stream = open(iq_path, "rb")
+        else:
+            self.process = subprocess.Popen(
+                [
+                    "rtl_sdr",
+                    *device_args(device),
+                    "-f",
+                    str(int(center_mhz * 1e6)),
+                    "-s",
+                    str(self.sample_rate),
+                    "-",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self.stream = self.process.stdout
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def fits(self, frequency_mhz: float) -> bool:
+        return self.channelizer.fits(frequency_mhz * 1e6)
+
+    def attach(
+        self, frequency_mhz: float, duration_sec: Optional[int], open_sink: Callable[[int], Any]
+    ) -> Optional[CaptureChannel]:
+        """Add a channel; ``open_sink`` is called with the audio rate only if the session is live."""
+        with self.lock:
+            if self.closed:
+                return None
+            channel_id = self.channelizer.add_channel(frequency_mhz * 1e6)
+            total_samples = None if duration_sec is None else duration_sec * self.audio_rate
+            channel = CaptureChannel(channel_id, open_sink(self.audio_rate), total_samples)
+            self.channels[channel_id] = channel
+            return channel
+
+    def stop(self) -> None:
+        self.stopping = True
+
+    def detach(self, channel: CaptureChannel) -> None:
+        with self.lock:
+            if channel.channel_id in self.channels:
+                self._finish(channel)
+
+    def _finish(self, channel: CaptureChannel) -> None:
+        self.channelizer.remove_channel(channel.channel_id)
+        self.channels.pop(channel.channel_id, None)
+        channel.done.set()
+
+    def _run(self) -> None:
+        block_samples = int(self.sample_rate * IQ_BLOCK_SEC)
+        block_samples -= block_samples % self.channelizer.block_multiple
+        try:
+            while not self.stopping:
+                raw = self.stream.read(2 * block_samples)
+                if len(raw) < 2 * self.channelizer.block_multiple:
+                    break
+                with self.lock:
+                    iq = self.iq_from_u8(raw[: len(raw) - len(raw) % 2], out=self._samples)
+                    self._samples = iq.view("float32")
+                    outputs = self.channelizer.process(iq)
+                    for channel_id, pcm in outputs.items():
+                        channel = self.channels[channel_id]
+                        if channel.remaining is not None:
+                            pcm = pcm[: channel.remaining]
+                        try:
+                            channel.sink.write(pcm.tobytes())
+                        except (BrokenPipeError, OSError):
+                            channel.remaining = 0
+                        else:
+                            if channel.remaining is not None:
+                                channel.remaining -= len(pcm)
+                        if channel.remaining is not None and channel.remaining <= 0:
+                            self._finish(channel)
+                    if not self.channels:
+                        self.closed = True
+                        break
+        finally:
+            with self.lock:
+                self.closed = True
+                for channel in list(self.channels.values()):
+                    self._finish(channel)
+            if self.process:
+                stop_process(self.process)
+            self.stream.close()
+            if self.on_close is not None:
+                self.on_close()
+
+
+class WidebandCaptures:
+    """Routes recordings onto the running wideband session or starts a new one."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.session: Optional[IqCaptureSession] = None
+
+    def can_record(self, frequency_mhz: float) -> bool:
+        with self.lock:
+            session = self.session
+            return session is None or session.closed or session.fits(frequency_mhz)
+
+    def open(
+        self,
+        frequency_mhz: float,
+        duration_sec: Optional[int],
+        open_sink: Callable[[int], Any],
+        config: dict,
+        starts_at: Optional[float] = None,
+    ) -> tuple[IqCaptureSession, CaptureChannel]:
+        """Attach a channel for ``frequency_mhz``, starting a session if none is running.
+
+        ``duration_sec`` and ``starts_at`` describe the show and only centre a
+        new session on the schedules chained to it; channels run until their
+        sink trims them.
+        """
+        with self.lock:
+            channel = None
+            if self.session is not None and not self.session.closed:
+                if not self.session.fits(frequency_mhz):
+                    raise RuntimeError(f"{frequency_mhz} MHz does not fit the running wideband capture")
+                channel = self.session.attach(frequency_mhz, None, open_sink)
+            if channel is None:
+                center = wideband_center(frequency_mhz, duration_sec or 0, config, starts_at)
+                sample_rate = int(config.get("wideband_sample_rate", WIDEBAND_SAMPLE_RATE))
+                claim = contextlib.ExitStack()
+                device = claim.enter_context(claim_tuner("wideband"))
+                try:
+                    self.session = IqCaptureSession(center, sample_rate, config, device, claim.close)
+                except BaseException:
+                    claim.close()
+                    raise
+                channel = self.session.attach(frequency_mhz, None, open_sink)
+                self.session.thread.start()
+            return self.session, channel
+
+    def record(
+        self, frequency_mhz: float, duration_sec: int, output_path: Path, config: dict, starts_at: float
+    ) -> None:
+        def open_sink(audio_rate: int) -> TrimmedSink:
+            # Not abortable: a retry would re-attach to this same session and could not recover anything.
+            encoder = open_encoder(output_path, audio_rate, 1, config)
+            return TrimmedSink(encoder, audio_rate, 1, starts_at, duration_sec, output_path.stem)
+
+        session, channel = self.open(frequency_mhz, duration_sec, open_sink, config, starts_at)
+        wait_trimmed(channel)
+        session.detach(channel)
+        channel.sink.sink.close()
+
+
+wideband_captures = WidebandCaptures()
+
+
+def wait_trimmed(channel: CaptureChannel) -> None:
+    """Wait for a channel's TrimmedSink to fill, or for its session to end first."""
+    while not channel.sink.done.wait(1.0):
+        if channel.done.is_set():
+            break
+
+
+def record_inprocess(
+    frequency_mhz: float,
+    duration_sec: int,
+    output_path: Path,
+    config: dict,
+    device: Optional[dict] = None,
+    starts_at: Optional[float] = None,
+) -> None:
+    starts_at = starts_at or time.time()
+    sample_rate = int(config.get("inprocess_sample_rate", INPROCESS_SAMPLE_RATE))
+    session = IqCaptureSession(frequency_mhz + INPROCESS_TUNING_OFFSET_MHZ, sample_rate, config, device)
+
+    def open_sink(audio_rate: int) -> TrimmedSink:
+        encoder = open_encoder(output_path, audio_rate, 1, config, abortable=True)
+        return TrimmedSink(encoder, audio_rate, 1, starts_at, duration_sec, output_path.stem)
+
+    channel = session.attach(frequency_mhz, None, open_sink)
+    session.thread.start()
+    wait_trimmed(channel)
+    session.stop()
+    session.thread.join(timeout=5)
+    channel.sink.sink.close()
+
+
+def rtl_fm_command(frequency_mhz: float, device: Optional[dict] = None) -> list[str]:
+    return [
+        "rtl_fm",
+        *device_args(device),
+        "-f",
+        f"{frequency_mhz}e6",
+        "-M",
+        "wbfm",
+        "-s",
+        "200k",
+    ]
+
+
+def start_rtl_fm(frequency_mhz: float, device: Optional[dict] = None) -> subprocess.Popen:
+    """Start rtl_fm with its stderr watched for dropped-sample warnings."""
+    process = subprocess.Popen(
+        rtl_fm_command(frequency_mhz, device), stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    threading.Thread(target=watch_rtl_fm_stderr, args=(process.stderr,), daemon=True).start()
+    return process
+
+
+def watch_rtl_fm_stderr(stream: Any) -> None:
+    with stream:
+        for line in stream:
+            if RTL_FM_DROP_RE.search(line):
+                metrics.inc("shiftfm_rtl_fm_drop_warnings_total")
+
+
+def record_rtl_fm(
+    frequency_mhz: float,
+    duration_sec: int,
+    output_path: Path,
+    device: Optional[dict] = None,
+    starts_at: Optional[float] = None,
+    config: Optional[dict] = None,
+) -> None:
+    encoder = open_encoder(output_path, RTL_FM_PCM_RATE, RTL_FM_PCM_CHANNELS, config or {}, abortable=True)
+    sink = TrimmedSink(
+        encoder, RTL_FM_PCM_RATE, RTL_FM_PCM_CHANNELS, starts_at or time.time(), duration_sec, output_path.stem
+    )
+    try:
+        restarts, lost_sec = supervise_rtl_fm(frequency_mhz, device, sink, config or {})
+    finally:
+        encoder.close()
+    if restarts:
+        note_capture_faults(output_path, restarts, lost_sec)
+
+
+def supervise_rtl_fm(
+    frequency_mhz: float, device: Optional[dict], sink: TrimmedSink, config: dict
+) -> tuple[int, float]:
+    """Feed rtl_fm's PCM into ``sink`` until it is done, restarting rtl_fm on the same tuner.
+
+    rtl_fm counts as stalled when it delivers less than CAPTURE_MIN_RATE of
+    the expected byte rate over ``capture_stall_sec``; a restart also follows
+    an early exit. The audio missed meanwhile is written as silence, so the
+    recording keeps its full length and its timing. Restarts that deliver
+    nothing back off exponentially from CAPTURE_RESTART_DELAY_SEC up to
+    CAPTURE_RESTART_MAX_DELAY_SEC. Returns the number of restarts and the
+    seconds of audio lost.
+    """
+    stall_sec = max(float(config.get("capture_stall_sec", CAPTURE_STALL_SEC)), 0.1)
+    min_bytes = CAPTURE_MIN_RATE * sink.byte_rate * stall_sec
+    restarts = 0
+    lost_bytes = 0
+    delay = CAPTURE_RESTART_DELAY_SEC
+    while not sink.done.is_set():
+        rtl = start_rtl_fm(frequency_mhz, device)
+        fd = rtl.stdout.fileno()
+        window_start = time.monotonic()
+        window_sec = stall_sec + CAPTURE_START_GRACE_SEC
+        window_bytes = 0
+        delivered = False
+        try:
+            while not sink.done.is_set():
+                if select.select([fd], [], [], min(stall_sec, 0.5))[0]:
+                    data = os.read(fd, RING_READ_CHUNK)
+                    if not data:
+                        break
+                    if restarts and not delivered:
+                        lost_bytes += sink.fill_silence(time.time() - len(data) / sink.byte_rate)
+                    delivered = True
+                    sink.write(data)
+                    window_bytes += len(data)
+                now = time.monotonic()
+                if now - window_start >= window_sec:
+                    if window_bytes < min_bytes:
+                        break
+                    window_start, window_sec, window_bytes = now, stall_sec, 0
+        finally:
+            stop_process(rtl)
+            note_process_exit("rtl_fm", rtl.returncode)
+            rtl.stdout.close()
+        if sink.done.is_set():
+            break
+        restarts += 1
+        metrics.inc("shiftfm_capture_restarts_total")
+        if delivered:
+            delay = CAPTURE_RESTART_DELAY_SEC
+        else:
+            sink.done.wait(delay)
+            delay = min(delay * 2, CAPTURE_RESTART_MAX_DELAY_SEC)
+        lost_bytes += sink.fill_silence(time.time())
+    lost_sec = lost_bytes / sink.byte_rate
+    metrics.inc("shiftfm_capture_lost_seconds_total", lost_sec)
+    return restarts, lost_sec
+
+
+def note_capture_faults(output_path: Path, restarts: int, lost_sec: float) -> None:
+    """Record a capture's rtl_fm restarts and the seconds bridged with silence in its sidecar."""
+    report = load_analysis(output_path.name) or {}
+    report.update(capture_restarts=restarts, lost_sec=round(lost_sec, 1))
+    with contextlib.suppress(OSError):
+        save_json(analysis_path(output_path.name), report)
+
+
+def pcm_format(config: dict) -> tuple[int, int]:
+    """Sample rate and channel count of the PCM each capture mode produces."""
+    if config.get("capture_mode") in ("inprocess", "wideband"):
+        return IQ_AUDIO_RATE, 1
+    return RTL_FM_PCM_RATE, RTL_FM_PCM_CHANNELS
+
+
+class PcmCapture:
+    """Open-ended capture of one station writing PCM into ``sink`` until stopped.
+
+    ``ended`` is set if the source stops on its own (device unplugged, end of
+    an ``iq_path`` file). Outside wideband mode the capture holds a tuner
+    from ``tuner_pool`` until stopped; ``preempt`` lets it take the timeshift
+    buffer's dongle when every tuner is busy.
+    """
+
+    def __init__(self, frequency_mhz: float, config: dict, sink: Any, preempt: bool = True) -> None:
+        self.process: Optional[subprocess.Popen] = None
+        self.session: Optional[IqCaptureSession] = None
+        self.owns_session = False
+        self._claim = contextlib.ExitStack()
+        mode = config.get("capture_mode")
+        if mode == "wideband":
+            self.session, self.channel = wideband_captures.open(
+                frequency_mhz, None, lambda audio_rate: sink, config
+            )
+            self.ended = self.channel.done
+            return
+        device = self._claim.enter_context(claim_tuner(f"{frequency_mhz} MHz", preempt))
+        try:
+            if mode == "inprocess":
+                sample_rate = int(config.get("inprocess_sample_rate", INPROCESS_SAMPLE_RATE))
+                self.session = IqCaptureSession(
+                    frequency_mhz + INPROCESS_TUNING_OFFSET_MHZ, sample_rate, config, device
+                )
+                self.channel = self.session.attach(frequency_mhz, None, lambda audio_rate: sink)
+                self.owns_session = True
+                self.ended = self.channel.done
+                self.session.thread.start()
+            else:
+                self.ended = threading.Event()
+                self.process = start_rtl_fm(frequency_mhz, device)
+                threading.Thread(target=self._pump, args=(self.process, sink), daemon=True).start()
+        except BaseException:
+            self._claim.close()
+            raise
+
+    def _pump(self, process: subprocess.Popen, sink: Any) -> None:
+        try:
+            while True:
+                data = os.read(process.stdout.fileno(), RING_READ_CHUNK)
+                if not data:
+                    break
+                sink.write(data)
+        finally:
+            self.ended.set()
+
+    def stop(self) -> None:
+        if self.session is not None:
+            self.session.detach(self.channel)
+            if self.owns_session:
+                self.session.stop()
+                self.session.thread.join(timeout=5)
+        if self.process is not None:
+            stop_process(self.process)
+            note_process_exit("rtl_fm", self.process.returncode)
+        self._claim.close()
+
+
+class PcmRing:
+    """Fixed-size memory-mapped ring of PCM addressed by absolute stream offset.
+
+    Writers append continuously; readers ask for bytes from an absolute
+    position and wait for the live edge. Positions that have already been
+    overwritten are moved forward to the oldest frame still held.
+    """
+
+    def __init__(self, path: Path, capacity: int, frame_size: int) -> None:
+        self.capacity = max(frame_size, capacity - capacity % frame_size)
+        self.frame_size = frame_size
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.handle = path.open("w+b")
+        self.handle.truncate(self.capacity)
+        self.map = mmap.mmap(self.handle.fileno(), self.capacity)
+        self.condition = threading.Condition()
+        self.written = 0
+        self.closed = False
+
+    def _copy_in(self, data: bytes) -> None:
+        skipped = max(0, len(data) - self.capacity)
+        data = data[skipped:]
+        offset = (self.written + skipped) % self.capacity
+        first = min(len(data), self.capacity - offset)
+        self.map[offset : offset + first] = data[:first]
+        if first < len(data):
+            self.map[: len(data) - first] = data[first:]
+
+    def write(self, data: bytes) -> None:
+        with self.condition:
+            if self.closed:
+                return
+            self._copy_in(data)
+            self.written += len(data)
+            self.condition.notify_all()
+
+    def pad_silence(self, size: int) -> None:
+        """Append zeroed frames, first completing any partial frame."""
+        with self.condition:
+            size += -(self.written + size) % self.frame_size
+            remaining = min(size, self.capacity)
+            self.written += size - remaining
+            while remaining > 0:
+                chunk = min(remaining, RING_READ_CHUNK)
+                self._copy_in(bytes(chunk))
+                self.written += chunk
+                remaining -= chunk
+            self.condition.notify_all()
+
+    def span(self) -> tuple[int, int]:
+        with self.condition:
+            return max(0, self.written - self.capacity), self.written
+
+    def read(self, position: int, size: int, timeout: float) -> tuple[int, bytes]:
+        with self.condition:
+            if position >= self.written and not self.closed:
+                self.condition.wait(timeout)
+            if self.closed:
+                return position, b""
+            oldest = max(0, self.written - self.capacity)
+            if position < oldest:
+                position += -(-(oldest - position) // self.frame_size) * self.frame_size
+            size = min(size, self.written - position)
+            if size <= 0:
+                return position, b""
+            offset = position % self.capacity
+            first = min(size, self.capacity - offset)
+            data = self.map[offset : offset + first]
+            if first < size:
+                data += self.map[: size - first]
+            return position, data
+
+    def close(self) -> None:
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+            self.map.close()
+            self.handle.close()
+
+
+class TimeshiftBuffer:
+    """Always-on capture of one station into a PcmRing.
+
+    Recordings of the buffered station copy the ring (optionally starting in
+    the past) instead of opening the tuner again. Recordings of any other
+    station suspend the capture; the gap is filled with silence on resume so
+    ring positions stay aligned with wall-clock time.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.settings: Optional[dict] = None
+        self.config: dict = {}
+        self.ring: Optional[PcmRing] = None
+        self.sample_rate = 0
+        self.channels = 0
+        self.suspend_count = 0
+        self.paused_at: Optional[float] = None
+        self._capture: Optional[PcmCapture] = None
+
+    @property
+    def frequency_mhz(self) -> Optional[float]:
+        return float(self.settings["frequency_mhz"]) if self.settings else None
+
+    def configure(self, config: dict) -> None:
+        settings = config.get("timeshift") or None
+        with self.lock:
+            if settings == self.settings and config.get("capture_mode") == self.config.get("capture_mode"):
+                return
+            self._stop_capture()
+            if self.ring:
+                self.ring.close()
+                self.ring = None
+            self.settings = settings
+            self.config = dict(config)
+            if not settings:
+                return
+            self.sample_rate, self.channels = pcm_format(config)
+            capacity = int(float(settings.get("minutes", 30)) * 60) * self.byte_rate
+            self.ring = PcmRing(TIMESHIFT_PATH, capacity, 2 * self.channels)
+            self.paused_at = None
+            if not self.suspend_count:
+                self._start_capture()
+
+    @property
+    def byte_rate(self) -> int:
+        return self.sample_rate * self.channels * 2
+
+    def covers(self, frequency_mhz: float) -> bool:
+        with self.lock:
+            return self.ring is not None and abs(self.frequency_mhz - frequency_mhz) < 0.05
+
+    def buffered_sec(self) -> int:
+        with self.lock:
+            if self.ring is None:
+                return 0
+            oldest, written = self.ring.span()
+            return (written - oldest) // self.byte_rate
+
+    def status(self) -> dict:
+        with self.lock:
+            if self.ring is None:
+                return {"enabled": False}
+            return {
+                "enabled": True,
+                "frequency_mhz": self.frequency_mhz,
+                "buffered_sec": self.buffered_sec(),
+                "capacity_sec": self.ring.capacity // self.byte_rate,
+                "suspended": bool(self.suspend_count),
+            }
+
+    def _start_capture(self) -> None:
+        config = dict(self.config)
+        if config.get("capture_mode") == "wideband":
+            # The buffer must not pin the wideband session's centre frequency.
+            config["capture_mode"] = "inprocess"
+        if self.paused_at is not None:
+            self.ring.pad_silence(int((time.time() - self.paused_at) * self.byte_rate))
+            self.paused_at = None
+        try:
+            self._capture = PcmCapture(self.frequency_mhz, config, self.ring, preempt=False)
+        except NoFreeTuner:
+            # Started again by retry() once a recording hands back a tuner.
+            self._capture = None
+            self.paused_at = time.time()
+
+    def retry(self) -> None:
+        with self.lock:
+            if self.ring is not None and not self.suspend_count and self._capture is None:
+                self._start_capture()
+
+    def holds_tuner(self) -> bool:
+        with self.lock:
+            return self._capture is not None
+
+    def _stop_capture(self) -> None:
+        if self._capture is not None:
+            self._capture.stop()
+            self._capture = None
+
+    @contextlib.contextmanager
+    def suspended(self):
+        with self.lock:
+            self.suspend_count += 1
+            if self.suspend_count == 1 and self._capture is not None:
+                self._stop_capture()
+                self.paused_at = time.time()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.suspend_count -= 1
+                if self.suspend_count == 0 and self.ring is not None and self._capture is None:
+                    self._start_capture()
+
+    def record(self, output_path: Path, starts_at: float, duration_sec: int) -> None:
+        """Encode ``duration_sec`` of audio from ``starts_at``, which may be in the past."""
+        with self.lock:
+            ring = self.ring
+            if ring is None:
+                raise RuntimeError("Timeshift buffer is not running")
+            frame = ring.frame_size
+            byte_rate = self.byte_rate
+            sink = open_encoder(output_path, self.sample_rate, self.channels, self.config)
+        oldest, written = ring.span()
+        start = written - int((time.time() - starts_at) * byte_rate)
+        start -= start % frame
+        end = start + duration_sec * byte_rate
+        start = max(start, oldest + -oldest % frame)
+        position = start
+        try:
+            while position < end:
+                position, data = ring.read(position, min(RING_READ_CHUNK, end - position), timeout=1.0)
+                if not data:
+                    if ring.closed:
+                        break
+                    continue
+                sink.write(data)
+                position += len(data)
+        finally:
+            sink.close()
+
+
+timeshift_buffer = TimeshiftBuffer()
+
+
+class ChainedCapture:
+    """One continuous capture of a frequency cut into back-to-back recordings.
+
+    Each recording takes exactly ``duration_sec`` of audio from the stream in
+    order, so consecutive shows neither share nor lose samples. Audio arriving
+    after one show ends and before the next one attaches is held in memory for
+    up to MISSED_START_GRACE_SEC. Pre-roll audio before ``starts_at`` is dropped.
+    """
+
+    def __init__(self, frequency_mhz: float, config: dict, starts_at: float) -> None:
+        self.frequency_mhz = frequency_mhz
+        self.starts_at = starts_at
+        self.created_at = time.time()
+        self.skip: Optional[int] = None
+        self.condition = threading.Condition()
+        self.segments: deque[CaptureChannel] = deque()
+        self.backlog = bytearray()
+        self.expect_more = True
+        self.closed = False
+        self.timer: Optional[threading.Timer] = None
+        self.config = config
+        self.sample_rate, self.channels = pcm_format(config)
+        self.capture = PcmCapture(frequency_mhz, config, self)
+
+    def attach(self, output_path: Path, duration_sec: int, expect_more: bool) -> Optional[CaptureChannel]:
+        with self.condition:
+            if self.closed or self.capture.ended.is_set():
+                return None
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            total_bytes = duration_sec * self.sample_rate * self.channels * 2
+            encoder = open_encoder(output_path, self.sample_rate, self.channels, self.config)
+            segment = CaptureChannel(0, encoder, total_bytes)
+            self.segments.append(segment)
+            self.expect_more = expect_more
+            backlog = bytes(self.backlog)
+            self.backlog.clear()
+            if backlog:
+                self.write(backlog)
+            return segment
+
+    def write(self, data: bytes) -> None:
+        with self.condition:
+            view = memoryview(data)
+            if self.skip is None:
+                arrived_at = time.time()
+                note_start_latency(f"{self.frequency_mhz} MHz", arrived_at - self.created_at)
+                frame = 2 * self.channels
+                self.skip = leading_skip(self.starts_at, arrived_at, len(view), self.sample_rate * frame, frame)
+            if self.skip:
+                dropped = min(self.skip, len(view))
+                self.skip -= dropped
+                view = view[dropped:]
+            while view and self.segments:
+                segment = self.segments[0]
+                take = min(len(view), segment.remaining)
+                try:
+                    segment.sink.write(view[:take])
+                except (BrokenPipeError, OSError):
+                    take = segment.remaining
+                segment.remaining -= take
+                view = view[take:]
+                if segment.remaining <= 0:
+                    self.segments.popleft()
+                    segment.done.set()
+            if view and self.expect_more and not self.closed:
+                self.backlog += view
+
+    def wait(self, segment: CaptureChannel) -> None:
+        while not segment.done.wait(1.0):
+            if self.capture.ended.is_set():
+                break
+        segment.sink.close()
+        with self.condition:
+            if self.segments or self.closed:
+                return
+            if self.expect_more and not self.capture.ended.is_set():
+                self.timer = threading.Timer(MISSED_START_GRACE_SEC, self.close)
+                self.timer.daemon = True
+                self.timer.start()
+                return
+        self.close()
+
+    def close(self) -> None:
+        with self.condition:
+            if self.closed or self.segments:
+                return
+            self.closed = True
+            self.backlog.clear()
+        shared_captures.discard(self)
+        self.capture.stop()
+
+
+class SharedCaptures:
+    """Chained captures by frequency, so back-to-back shows share one tuner session."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.captures: dict[float, ChainedCapture] = {}
+
+    def record(
+        self,
+        frequency_mhz: float,
+        duration_sec: int,
+        output_path: Path,
+        config: dict,
+        follow_on: bool,
+        starts_at: float,
+    ) -> bool:
+        """Record through a chained capture; False when there is none to join and no follow-on."""
+        key = round(frequency_mhz, 3)
+        with self.lock:
+            capture = self.captures.get(key)
+            segment = capture.attach(output_path, duration_sec, follow_on) if capture else None
+            if segment is None:
+                if not follow_on:
+                    return False
+                capture = ChainedCapture(frequency_mhz, config, starts_at)
+                self.captures[key] = capture
+                segment = capture.attach(output_path, duration_sec, follow_on)
+        capture.wait(segment)
+        return True
+
+    def discard(self, capture: ChainedCapture) -> None:
+        key = round(capture.frequency_mhz, 3)
+        with self.lock:
+            if self.captures.get(key) is capture:
+                del self.captures[key]
+
+
+shared_captures = SharedCaptures()
+
+
+def low_priority_command(command: list[str], niceness: int) -> list[str]:
+    prefix = ["nice", "-n", str(niceness)]
+    if shutil.which("ionice"):
+        prefix += ["ionice", "-c", "3"]
+    return prefix + command
+
+
+class EncodeQueue:
+    """Bounded pool that encodes deferred FLAC captures to MP3 at idle priority.
+
+    Jobs are journaled so a restart resumes them. Workers wait while a live
+    capture runs, and encoders already running are paused with SIGSTOP, so
+    encoding never competes with demodulation for the CPU.
+    """
+
+    def __init__(self, journal: JsonStore) -> None:
+        self.journal = journal
+        self.condition = threading.Condition()
+        self.queue: deque[dict] = deque()
+        self.running: dict[str, subprocess.Popen] = {}
+        self.workers: list[threading.Thread] = []
+        self.max_workers = 1
+        self.niceness = ENCODE_NICE
+        self.live = 0
+        self.attempts: dict[str, int] = {}
+
+    def configure(self, config: dict) -> None:
+        with self.condition:
+            self.max_workers = max(1, int(config.get("encode_workers", 1)))
+            self.niceness = int(config.get("encode_nice", ENCODE_NICE))
+
+    def resume(self, config: dict) -> None:
+        """Requeue journaled jobs whose capture survived the restart."""
+        self.configure(config)
+        jobs = self.journal.read().get("jobs", [])
+        lost = [job for job in jobs if not Path(job["source"]).exists()]
+        if lost:
+            self.journal.update(
+                lambda payload: payload.__setitem__(
+                    "jobs", [job for job in payload.get("jobs", []) if job not in lost]
+                )
+            )
+        for job in jobs:
+            if job not in lost:
+                self._enqueue(job)
+
+    def submit(self, source: Path, output_path: Path) -> None:
+        job = {"source": str(source), "output": str(output_path)}
+        self.journal.update(lambda payload: payload.setdefault("jobs", []).append(job))
+        self.journal.flush()
+        self._enqueue(job)
+
+    def pending(self) -> int:
+        with self.condition:
+            return len(self.queue) + len(self.running)
+
+    def _enqueue(self, job: dict) -> None:
+        with self.condition:
+            self.queue.append(job)
+            self.workers = [worker for worker in self.workers if worker.is_alive()]
+            if len(self.workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                self.workers.append(worker)
+                worker.start()
+            self.condition.notify()
+
+    @contextlib.contextmanager
+    def live_capture(self):
+        with self.condition:
+            self.live += 1
+            if self.live == 1:
+                for process in self.running.values():
+                    process.send_signal(signal.SIGSTOP)
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.live -= 1
+                if self.live == 0:
+                    for process in self.running.values():
+                        process.send_signal(signal.SIGCONT)
+                    self.condition.notify_all()
+
+    def _work(self) -> None:
+        while True:
+            with self.condition:
+                while self.live or not self.queue:
+                    self.condition.wait()
+                job = self.queue.popleft()
+            self._encode(job)
+
+    def _encode(self, job: dict) -> None:
+        source, output_path = Path(job["source"]), Path(job["output"])
+        partial = output_path.with_name(output_path.name + ".part")
+        command = ["ffmpeg", "-loglevel", "error", "-y", "-i", str(source), "-f", "mp3", str(partial)]
+        with self.condition:
+            process = subprocess.Popen(
+                low_priority_command(command, self.niceness),
+                stdin=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            self.running[job["source"]] = process
+            if self.live:
+                process.send_signal(signal.SIGSTOP)
+        returncode = process.wait()
+        with self.condition:
+            self.running.pop(job["source"], None)
+        if returncode != 0:
+            partial.unlink(missing_ok=True)
+            self._failed(job, returncode)
+            return
+        with self.condition:
+            self.attempts.pop(job["source"], None)
+        os.replace(partial, output_path)
+        source.unlink(missing_ok=True)
+        self.journal.update(
+            lambda payload: payload.__setitem__(
+                "jobs", [other for other in payload.get("jobs", []) if other != job]
+            )
+        )
+        get_catalog().add(output_path)
+        generate_rss(load_config())
+
+    def _failed(self, job: dict, returncode: int) -> None:
+        """Retry a failed encode after a doubling delay; past ENCODE_RETRIES, park it under ``failed``."""
+        metrics.inc("shiftfm_encode_failures_total")
+        with self.condition:
+            attempts = self.attempts.get(job["source"], 0) + 1
+            self.attempts[job["source"]] = attempts
+        if attempts <= ENCODE_RETRIES:
+            timer = threading.Timer(ENCODE_RETRY_DELAY_SEC * 2 ** (attempts - 1), self._enqueue, args=(job,))
+            timer.daemon = True
+            timer.start()
+            return
+        with self.condition:
+            self.attempts.pop(job["source"], None)
+
+        def park(payload: dict) -> None:
+            payload["jobs"] = [other for other in payload.get("jobs", []) if other != job]
+            payload.setdefault("failed", []).append(dict(job, returncode=returncode))
+
+        self.journal.update(park)
+
+    def failed(self) -> list[dict]:
+        """Jobs that failed every attempt; their captures are kept in PENDING_DIR."""
+        return self.journal.read().get("failed", [])
+
+
+encode_queue = EncodeQueue(JsonStore(ENCODE_JOURNAL_PATH, {"jobs": []}))
+
+
+class RecordingJournal:
+    """Append-only log of recording lifecycle events, replayed after a restart.
+
+    Each JSON line is one event (``scheduled``, ``started`` (with the paths
+    being written), ``progress`` (bytes on disk every RECORDING_PROGRESS_SEC),
+    ``finished`` or ``failed``) for one recording id. Lifecycle events are
+    fsynced; a recording whose last event is neither finished nor failed was
+    cut short. The file is emptied whenever no recording is open, so it never
+    grows past the shows in progress.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.open: dict[str, dict] = {}
+        self.tracked: set[str] = set()
+        self.ticker: Optional[threading.Thread] = None
+
+    def _append(self, event: dict, sync: bool = True) -> None:
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(event) + "\n")
+            handle.flush()
+            if sync:
+                os.fsync(handle.fileno())
+
+    def _record(self, kind: str, recording_id: str, **fields) -> None:
+        event = {"event": kind, "id": recording_id, "at": round(time.time(), 3), **fields}
+        with self.lock:
+            if kind in ("finished", "failed"):
+                self.open.pop(recording_id, None)
+                if not self.open:
+                    self.path.write_bytes(b"")
+                    return
+            else:
+                self.open.setdefault(recording_id, {"id": recording_id}).update(fields)
+                if self.ticker is None:
+                    self.ticker = threading.Thread(target=self._tick, daemon=True)
+                    self.ticker.start()
+            self._append(event)
+
+    def scheduled(
+        self, recording_id: str, name: str, frequency_mhz: float, start_ts: float, duration_sec: int
+    ) -> None:
+        self._record(
+            "scheduled", recording_id, name=name, frequency_mhz=frequency_mhz,
+            start_ts=start_ts, duration_sec=duration_sec,
+        )
+
+    def started(
+        self,
+        recording_id: str,
+        name: str,
+        frequency_mhz: float,
+        start_ts: float,
+        duration_sec: int,
+        output_path: Path,
+        capture_path: Path,
+    ) -> None:
+        self._record(
+            "started", recording_id, name=name, frequency_mhz=frequency_mhz, start_ts=start_ts,
+            duration_sec=duration_sec, output_path=str(output_path), capture_path=str(capture_path),
+        )
+
+    def finished(self, recording_id: str) -> None:
+        self._record("finished", recording_id)
+
+    def failed(self, recording_id: str, error: str) -> None:
+        self._record("failed", recording_id, error=error)
+
+    @contextlib.contextmanager
+    def tracking(self, recording_id: str):
+        """Journal ``finished`` when the block completes and ``failed`` if it raises.
+
+        Blocks nested inside one already tracking ``recording_id`` leave that to the outermost.
+        """
+        with self.lock:
+            nested = recording_id in self.tracked
+            self.tracked.add(recording_id)
+        if nested:
+            yield
+            return
+        try:
+            yield
+        except BaseException as exc:
+            self.failed(recording_id, repr(exc))
+            raise
+        finally:
+            with self.lock:
+                self.tracked.discard(recording_id)
+        self.finished(recording_id)
+
+    def _tick(self) -> None:
+        while True:
+            time.sleep(RECORDING_PROGRESS_SEC)
+            with self.lock:
+                if not self.open:
+                    self.ticker = None
+                    return
+                now = round(time.time(), 3)
+                for recording_id, entry in self.open.items():
+                    if "capture_path" in entry:
+                        event = {"event": "progress", "id": recording_id, "at": now}
+                        event["bytes"] = written_bytes(entry)
+                        self._append(event, sync=False)
+
+    def replay(self) -> list[dict]:
+        """Recordings left open by the previous run, each merged from its events.
+
+        ``at`` is the time of the last event seen; a torn last line is ignored.
+        """
+        entries: dict[str, dict] = {}
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        for line in lines:
+            try:
+                event = json.loads(line)
+                kind = event.pop("event")
+                recording_id = event["id"]
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue
+            if kind in ("finished", "failed"):
+                entries.pop(recording_id, None)
+            else:
+                entries.setdefault(recording_id, {}).update(event)
+        return [entry for entry in entries.values() if "name" in entry]
+
+    def recover(self) -> list[dict]:
+        """Replay the journal and start it afresh."""
+        with self.lock:
+            interrupted = self.replay()
+            if not self.open:
+                self.path.write_bytes(b"")
+        return interrupted
+
+
+def written_bytes(entry: dict) -> int:
+    """Bytes a journaled recording has on disk, counting live segments."""
+    path = Path(entry["capture_path"])
+    with contextlib.suppress(OSError):
+        return path.stat().st_size
+    segments = live_dir(path.name)
+    with contextlib.suppress(OSError):
+        return sum(item.stat().st_size for item in segments.iterdir())
+    return 0
+
+
+recording_journal = RecordingJournal(RECORDING_JOURNAL_PATH)
+
+
+def record_station(
+    name: str,
+    frequency_mhz: float,
+    duration_sec: int,
+    config: dict,
+    lookback_sec: int = 0,
+    follow_on: bool = False,
+    starts_at: Optional[datetime] = None,
+    journal_id: Optional[str] = None,
+) -> str:
+    RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
+    covered = timeshift_buffer.covers(frequency_mhz)
+    lookback_sec = min(lookback_sec, timeshift_buffer.buffered_sec()) if covered else 0
+    if starts_at is None:
+        starts_at = datetime.now() - timedelta(seconds=lookback_sec)
+    start_ts = starts_at.timestamp()
+    filename = generate_filename(name, frequency_mhz, starts_at)
+    journal_id = journal_id or f"{Path(filename).stem}@{int(time.time() * 1000)}"
+    with recording_journal.tracking(journal_id):
+        output_path, capture_path = recording_paths(filename, config)
+        recording_journal.started(
+            journal_id, name, frequency_mhz, start_ts, lookback_sec + duration_sec, output_path, capture_path
+        )
+        retention.make_room(lookback_sec + duration_sec)
+
+        retries = int(config.get("dead_air_retries", DEAD_AIR_RETRIES))
+        with encode_queue.live_capture():
+            if covered:
+                timeshift_buffer.record(capture_path, start_ts, lookback_sec + duration_sec)
+            elif not shared_captures.record(
+                frequency_mhz, duration_sec, capture_path, config, follow_on, start_ts
+            ):
+                while True:
+                    capture_station(name, frequency_mhz, duration_sec, capture_path, config, start_ts)
+                    remaining = int(start_ts + duration_sec - time.time())
+                    report = load_analysis(output_path.name) or {}
+                    if (
+                        not report.get("aborted_dead_air")
+                        or retries <= 0
+                        or remaining < DEAD_AIR_MIN_RETRY_SEC
+                    ):
+                        break
+                    retries -= 1
+                    publish_recording(output_path, capture_path, config)
+                    start_ts = time.time()
+                    duration_sec = remaining
+                    output_path, capture_path = recording_paths(
+                        generate_filename(name, frequency_mhz, datetime.fromtimestamp(start_ts)), config
+                    )
+                    recording_journal.started(
+                        journal_id, name, frequency_mhz, start_ts, duration_sec, output_path, capture_path
+                    )
+        publish_recording(output_path, capture_path, config)
+    return filename
+
+
+def recording_paths(filename: str, config: dict) -> tuple[Path, Path]:
+    """Final path of a recording and the path its capture is written to."""
+    output_path = RECORDINGS_DIR / filename
+    if config.get("encode_mode") != "deferred":
+        return output_path, output_path
+    PENDING_DIR.mkdir(parents=True, exist_ok=True)
+    return output_path, PENDING_DIR / f"{output_path.stem}.flac"
+
+
+def capture_station(
+    name: str, frequency_mhz: float, duration_sec: int, capture_path: Path, config: dict, starts_at: float
+) -> None:
+    """Record straight from a tuner (or the wideband session) in the configured capture mode."""
+    capture_mode = config.get("capture_mode")
+    if capture_mode == "wideband":
+        wideband_captures.record(frequency_mhz, duration_sec, capture_path, config, starts_at)
+        return
+    with claim_tuner(f"{name} ({frequency_mhz} MHz)") as device:
+        if capture_mode == "inprocess":
+            record_inprocess(frequency_mhz, duration_sec, capture_path, config, device, starts_at)
+        else:
+            record_rtl_fm(frequency_mhz, duration_sec, capture_path, device, starts_at, config)
+
+
+def publish_recording(output_path: Path, capture_path: Path, config: dict) -> None:
+    if capture_path != output_path:
+        if capture_path.exists():
+            encode_queue.submit(capture_path, output_path)
+        return
+    if output_path.exists():
+        get_catalog().add(output_path)
+    generate_rss(config)
+
+
+def render_rss_item(
+    entry: dict, base_url: str, url_path: str = "recordings", mime_type: str = "audio/mpeg"
+) -> str:
+    item_title = escape(entry.get("title") or Path(entry["name"]).stem.replace("_", " "))
+    url = f"{base_url}/{entry.get('url_path', url_path)}/{entry['name']}"
+    mime_type = entry.get("mime_type", mime_type)
+    pub_date = formatdate(entry["mtime"], usegmt=True)
+    duration_sec = entry.get("duration_sec")
+    duration_tag = ""
+    if duration_sec is not None:
+        duration_tag = f"        <itunes:duration>{format_duration(duration_sec)}</itunes:duration>"
+    chapters = entry.get("chapters") or []
+    chapters_tag = ""
+    if len(chapters) > 1:
+        chapters_tag = "\n".join(
+            ["        <psc:chapters version=\"1.2\">"]
+            + [
+                f"          <psc:chapter start=\"{format_chapter_start(start)}\" title=\"Part {index}\" />"
+                for index, start in enumerate(chapters, 1)
+            ]
+            + ["        </psc:chapters>"]
+        )
+    return "\n".join(
+        [
+            "      <item>",
+            f"        <title>{item_title}</title>",
+            f"        <enclosure url=\"{escape(url)}\" length=\"{entry['size']}\" type=\"{mime_type}\" />",
+            f"        <guid>{escape(url)}</guid>",
+            f"        <pubDate>{pub_date}</pubDate>",
+            duration_tag,
+            chapters_tag,
+            "      </item>",
+        ]
+    )
+
+
+class FeedCache:
+    """Rendered feed held in memory, plus a gzip copy and validators.
+
+    Item fragments are cached per recording so a rebuild only renders items
+    that were added or changed; deleted recordings are simply dropped.
+    """
+
+    def __init__(self, url_path: str = "recordings", mime_type: str = "audio/mpeg") -> None:
+        self.url_path = url_path
+        self.mime_type = mime_type
+        self.lock = threading.Lock()
+        self.channel_key: Optional[tuple] = None
+        self.fragments: dict[str, tuple[tuple, str]] = {}
+        self.body = b""
+        self.gzip_body = b""
+        self.etag = ""
+        self.last_modified = 0.0
+        self.written_path: Optional[Path] = None
+        self.loaded = False
+
+    def _publish(self, body: bytes, modified: float) -> None:
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        self.etag = f"\"{hashlib.sha1(body).hexdigest()}\""
+        self.last_modified = modified
+        self.loaded = True
+
+    def update(
+        self,
+        channel_key: tuple,
+        header: str,
+        footer: str,
+        entries: list[dict],
+        shared: Optional["FeedCache"] = None,
+    ) -> bool:
+        """Rebuild the feed; item fragments may be borrowed from ``shared``, a feed of the same items."""
+        base_url = channel_key[0]
+        if shared is not None and (shared.channel_key, shared.url_path) != (channel_key, self.url_path):
+            shared = None
+        with self.lock:
+            if channel_key != self.channel_key:
+                self.fragments = {}
+                self.channel_key = channel_key
+            fragments = {}
+            items = []
+            for entry in entries:
+                signature = (entry["size"], entry["mtime"], entry.get("duration_sec"))
+                cached = self.fragments.get(entry["name"])
+                if (cached is None or cached[0] != signature) and shared is not None:
+                    cached = shared.fragments.get(entry["name"])
+                if cached is None or cached[0] != signature:
+                    cached = (
+                        signature,
+                        render_rss_item(entry, base_url, self.url_path, self.mime_type),
+                    )
+                fragments[entry["name"]] = cached
+                items.append(cached[1])
+            self.fragments = fragments
+            body = "\n".join([header, "\n".join(items), footer]).encode("utf-8")
+            if self.loaded and body == self.body:
+                return False
+            self._publish(body, time.time())
+            return True
+
+    def load_file(self, path: Path) -> None:
+        with self.lock:
+            if self.loaded:
+                return
+            if path.exists():
+                self._publish(path.read_bytes(), path.stat().st_mtime)
+            else:
+                self._publish(b"", time.time())
+
+    def snapshot(self) -> tuple[bytes, bytes, str, float]:
+        with self.lock:
+            return self.body, self.gzip_body, self.etag, self.last_modified
+
+
+feed_cache = FeedCache()
+rendition_feeds: dict[str, FeedCache] = {}
+program_feeds: dict[str, FeedCache] = {}
+feed_write_lock = threading.Lock()
+
+
+def configured_renditions(config: dict) -> list[dict]:
+    return [
+        rendition
+        for rendition in config.get("renditions") or []
+        if RENDITION_ID_RE.fullmatch(str(rendition.get("id", "")))
+        and rendition.get("codec") in RENDITION_CODECS
+    ]
+
+
+def rendition_feed_path(rendition_id: str) -> Path:
+    return RSS_PATH.with_name(f"rss-{rendition_id}.xml")
+
+
+def program_feed_path(program: str) -> Path:
+    return RSS_PATH.with_name("rss") / f"{program}.xml"
+
+
+def encode_cursor(key: tuple[float, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(value: str) -> tuple[float, str]:
+    """Inverse of ``encode_cursor``; raises ValueError for anything it did not produce."""
+    try:
+        mtime, name = json.loads(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(name, str):
+        raise ValueError("Invalid cursor")
+    return float(mtime), name
+
+
+class Renditions:
+    """Transcodes every master recording once per configured rendition.
+
+    Each rendition directory records the settings its files were made with;
+    when the config changes them the directory is cleared and rebuilt.
+    Transcodes run as low-priority ffmpeg processes, one per core.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight: set[tuple[str, str]] = set()
+        self.failed: set[tuple[str, str]] = set()
+        self.prepared: dict[str, dict] = {}
+
+    def _prepare(self, rendition: dict) -> Path:
+        settings = {"codec": rendition["codec"], "bitrate": str(rendition.get("bitrate", ""))}
+        directory = self.root / rendition["id"]
+        if self.prepared.get(rendition["id"]) == settings:
+            return directory
+        settings_path = directory / ".settings.json"
+        try:
+            current = json.loads(settings_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            current = None
+        if current != settings:
+            shutil.rmtree(directory, ignore_errors=True)
+            directory.mkdir(parents=True, exist_ok=True)
+            save_json(settings_path, settings)
+            self.failed = {key for key in self.failed if key[0] != rendition["id"]}
+        self.prepared[rendition["id"]] = settings
+        return directory
+
+    def sync(self, renditions: list[dict], entries: list[dict]) -> dict[str, list[dict]]:
+        """Queue missing transcodes and return the feed entries ready for each rendition."""
+        ready: dict[str, list[dict]] = {}
+        with self.lock:
+            for rendition in renditions:
+                directory = self._prepare(rendition)
+                suffix = RENDITION_CODECS[rendition["codec"]][0]
+                with os.scandir(directory) as listing:
+                    existing = {
+                        dir_entry.name: dir_entry.stat()
+                        for dir_entry in listing
+                        if dir_entry.name.endswith(suffix) and dir_entry.is_file()
+                    }
+                items = []
+                for entry in entries:
+                    target_name = Path(entry["name"]).stem + suffix
+                    stat = existing.pop(target_name, None)
+                    if stat is None:
+                        self._submit(rendition, entry["name"], directory / target_name)
+                        continue
+                    items.append({**entry, "name": target_name, "size": stat.st_size})
+                for orphan in existing:
+                    (directory / orphan).unlink(missing_ok=True)
+                ready[rendition["id"]] = items
+            if self.root.exists():
+                configured = {rendition["id"] for rendition in renditions}
+                for directory in self.root.iterdir():
+                    if directory.is_dir() and directory.name not in configured:
+                        shutil.rmtree(directory, ignore_errors=True)
+                        self.prepared.pop(directory.name, None)
+        return ready
+
+    def _submit(self, rendition: dict, master_name: str, target: Path) -> None:
+        key = (rendition["id"], master_name)
+        if key in self.in_flight or key in self.failed:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        self.in_flight.add(key)
+        self.executor.submit(self._transcode, key, dict(rendition), RECORDINGS_DIR / master_name, target)
+
+    def _transcode(self, key: tuple[str, str], rendition: dict, source: Path, target: Path) -> None:
+        settings = self.prepared.get(rendition["id"])
+        partial = target.with_name(f".{target.name}.part")
+        command = ["ffmpeg", "-loglevel", "error", "-y", "-i", str(source), "-vn"]
+        command += RENDITION_CODECS[rendition["codec"]][2]
+        if rendition.get("bitrate"):
+            command += ["-b:a", str(rendition["bitrate"])]
+        command.append(str(partial))
+        result = subprocess.run(
+            low_priority_command(command, ENCODE_NICE),
+            stdin=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        with self.lock:
+            self.in_flight.discard(key)
+            if result.returncode != 0 or not partial.exists():
+                partial.unlink(missing_ok=True)
+                self.failed.add(key)
+                return
+            if self.prepared.get(rendition["id"]) != settings:
+                # The rendition was reconfigured while this transcode ran.
+                partial.unlink(missing_ok=True)
+                return
+            os.replace(partial, target)
+        generate_rss(load_config())
+
+
+renditions = Renditions(RENDITIONS_DIR)
+
+
+def write_feed(
+    cache: FeedCache,
+    path: Path,
+    channel_key: tuple,
+    header: str,
+    footer: str,
+    entries: list[dict],
+    shared: Optional[FeedCache] = None,
+) -> None:
+    changed = cache.update(channel_key, header, footer, entries, shared)
+    if changed or cache.written_path != path or not path.exists():
+        body = cache.snapshot()[0]
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(body)
+        tmp_path.replace(path)
+        cache.written_path = path
+
+
+def feed_header(title: str, link: str, description: str, itunes_category: str) -> str:
+    return "\n".join(
+        [
+            "<?xml version=\"1.0\" encoding=\"UTF-8\"?>",
+            "<rss version=\"2.0\" xmlns:itunes=\"http://www.itunes.com/dtds/podcast-1.0.dtd\""
+            " xmlns:psc=\"http://podlove.org/simple-chapters\">",
+            "  <channel>",
+            f"    <title>{title}</title>",
+            f"    <link>{escape(link)}</link>",
+            f"    <description>{description}</description>",
+            f"    <itunes:category text=\"{itunes_category}\" />",
+        ]
+    )
+
+
+def generate_rss(config: dict) -> None:
+    started = time.perf_counter()
+    try:
+        build_feeds(config)
+    finally:
+        metrics.observe("shiftfm_feed_build_seconds", time.perf_counter() - started)
+
+
+def build_feeds(config: dict) -> None:
+    base_url = config.get("base_url", DEFAULT_CONFIG["base_url"]).rstrip("/")
+    title = escape(config.get("rss_title", DEFAULT_CONFIG["rss_title"]))
+    description = escape(config.get("rss_description", DEFAULT_CONFIG["rss_description"]))
+    itunes_category = escape(
+        config.get("rss_itunes_category", DEFAULT_CONFIG["rss_itunes_category"])
+    )
+
+    catalog = get_catalog()
+    catalog.sync()
+    entries = catalog.recordings()
+    live = live_recordings.entries()
+    footer = "\n".join(["  </channel>", "</rss>", ""])
+    channel_key = (base_url, title, description, itunes_category)
+    with feed_write_lock:
+        header = feed_header(title, f"{base_url}/rss.xml", description, itunes_category)
+        write_feed(feed_cache, RSS_PATH, channel_key, header, footer, live + entries)
+
+        configured = configured_renditions(config)
+        ready = renditions.sync(configured, entries)
+        for rendition in configured:
+            rendition_id = rendition["id"]
+            _, mime_type, _ = RENDITION_CODECS[rendition["codec"]]
+            cache = rendition_feeds.get(rendition_id)
+            if cache is None or cache.mime_type != mime_type:
+                cache = rendition_feeds[rendition_id] = FeedCache(f"renditions/{rendition_id}", mime_type)
+            header = feed_header(
+                f"{title} ({escape(rendition_id)})",
+                f"{base_url}/rss-{rendition_id}.xml",
+                description,
+                itunes_category,
+            )
+            write_feed(
+                cache, rendition_feed_path(rendition_id), channel_key, header, footer, ready[rendition_id]
+            )
+        for rendition_id in set(rendition_feeds) - set(ready):
+            del rendition_feeds[rendition_id]
+            rendition_feed_path(rendition_id).unlink(missing_ok=True)
+
+        programs = sorted(set(catalog.programs()) | {entry["program"] for entry in live})
+        if programs:
+            program_feed_path(programs[0]).parent.mkdir(parents=True, exist_ok=True)
+        limit = int(config.get("program_feed_items", PROGRAM_FEED_ITEMS))
+        for program in programs:
+            cache = program_feeds.setdefault(program, FeedCache())
+            header = feed_header(
+                f"{title}: {escape(program)}", f"{base_url}/rss/{program}.xml", description, itunes_category
+            )
+            latest = [entry for entry in live if entry["program"] == program]
+            latest += catalog.page(limit, program=program)[0]
+            write_feed(cache, program_feed_path(program), channel_key, header, footer, latest, feed_cache)
+        for program in set(program_feeds) - set(programs):
+            del program_feeds[program]
+            program_feed_path(program).unlink(missing_ok=True)
+
+
+class WeeklyIntervalIndex:
+    """Sorted busy intervals in seconds since Monday 00:00, keyed by schedule id.
+
+    Overlap queries bisect to the first interval that could reach the
+    candidate, so a check costs O(log n) plus the number of nearby intervals.
+    """
+
+    def __init__(self) -> None:
+        self.intervals: list[tuple[int, int, str]] = []
+        self.by_id: dict[str, list[tuple[int, int, str]]] = {}
+        self.frequencies: dict[str, float] = {}
+        self.max_length = 0
+
+    @staticmethod
+    def week_intervals(schedule: dict) -> list[tuple[int, int]]:
+        return [
+            (day * 86400 + start, day * 86400 + end)
+            for day, start, end in schedule_intervals(schedule)
+        ]
+
+    def copy(self) -> "WeeklyIntervalIndex":
+        clone = WeeklyIntervalIndex()
+        clone.intervals = list(self.intervals)
+        clone.by_id = dict(self.by_id)
+        clone.frequencies = dict(self.frequencies)
+        clone.max_length = self.max_length
+        return clone
+
+    def rebuild(self, schedules_payload: dict) -> None:
+        self.intervals = []
+        self.by_id = {}
+        self.frequencies = {}
+        self.max_length = 0
+        for schedule in schedules_payload.get("schedules", []):
+            self.add(schedule)
+
+    def add(self, schedule: dict) -> None:
+        schedule_id = schedule.get("id", "")
+        self.remove(schedule_id)
+        entries = [(start, end, schedule_id) for start, end in self.week_intervals(schedule)]
+        for entry in entries:
+            bisect.insort(self.intervals, entry)
+            self.max_length = max(self.max_length, entry[1] - entry[0])
+        self.by_id[schedule_id] = entries
+        self.frequencies[schedule_id] = float(schedule.get("frequency_mhz", 0))
+
+    def remove(self, schedule_id: str) -> None:
+        self.frequencies.pop(schedule_id, None)
+        for entry in self.by_id.pop(schedule_id, []):
+            position = bisect.bisect_left(self.intervals, entry)
+            if position < len(self.intervals) and self.intervals[position] == entry:
+                del self.intervals[position]
+
+    def _overlapping(self, start: int, end: int) -> list[tuple[int, int, str]]:
+        found = []
+        position = bisect.bisect_left(self.intervals, (start - self.max_length,))
+        while position < len(self.intervals) and self.intervals[position][0] < end:
+            if self.intervals[position][1] > start:
+                found.append(self.intervals[position])
+            position += 1
+        return found
+
+    def conflicts(self, schedule: dict, skip_id: Optional[str] = None) -> list[str]:
+        found: list[str] = []
+        for start, end in self.week_intervals(schedule):
+            for _, _, other_id in self._overlapping(start, end):
+                if other_id != skip_id and other_id not in found:
+                    found.append(other_id)
+        return found
+
+    def followers(self, week_sec: int, frequency_mhz: float, skip_id: Optional[str] = None) -> list[str]:
+        """Ids of schedules on ``frequency_mhz`` with an occurrence starting at ``week_sec``."""
+        week_sec %= WEEK_SEC
+        found = []
+        position = bisect.bisect_left(self.intervals, (week_sec,))
+        while position < len(self.intervals) and self.intervals[position][0] == week_sec:
+            other_id = self.intervals[position][2]
+            if other_id != skip_id and abs(self.frequencies[other_id] - frequency_mhz) < 0.001:
+                found.append(other_id)
+            position += 1
+        return found
+
+    def peak_overlap(self, schedule: dict, skip_id: Optional[str] = None) -> int:
+        """Most other schedules running at any one instant during ``schedule``."""
+        peak = 0
+        for start, end in self.week_intervals(schedule):
+            events = []
+            for other_start, other_end, other_id in self._overlapping(start, end):
+                if other_id != skip_id:
+                    events.append((max(other_start, start), 1))
+                    events.append((min(other_end, end), -1))
+            running = 0
+            for _, step in sorted(events):
+                running += step
+                peak = max(peak, running)
+        return peak
+
+    def component(self, schedule: dict, skip_id: Optional[str] = None) -> set[str]:
+        """Ids of schedules chained to ``schedule`` through overlapping occurrences."""
+        found: set[str] = set()
+        seen: set[tuple[int, int, str]] = set()
+        frontier = [(start, end) for start, end in self.week_intervals(schedule)]
+        while frontier:
+            start, end = frontier.pop()
+            for entry in self._overlapping(start, end):
+                if entry[2] == skip_id or entry in seen:
+                    continue
+                seen.add(entry)
+                found.add(entry[2])
+                frontier.append((entry[0], entry[1]))
+        return found
+
+
+schedule_index = WeeklyIntervalIndex()
+schedule_store = JsonStore(SCHEDULES_PATH, SAMPLE_SCHEDULES, on_load=schedule_index.rebuild)
+config_store = JsonStore(CONFIG_PATH, DEFAULT_CONFIG)
+
+
+def flush_stores() -> None:
+    schedule_store.flush()
+    config_store.flush()
+    encode_queue.journal.flush()
+
+
+atexit.register(flush_stores)
+
+
+def load_schedules() -> dict:
+    return schedule_store.read()
+
+
+def load_config() -> dict:
+    payload = config_store.read()
+    merged = DEFAULT_CONFIG.copy()
+    merged.update(payload)
+    return merged
+
+
+def get_duration_seconds(path: Path) -> Optional[int]:
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "default=noprint_wrappers=1:nokey=1",
+                str(path),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    try:
+        return int(float(result.stdout.strip()))
+    except ValueError:
+        return None
+
+
+def format_chapter_start(seconds: float) -> str:
+    whole = int(seconds)
+    return f"{whole // 3600:02d}:{whole % 3600 // 60:02d}:{whole % 60:02d}.{int(seconds * 1000) % 1000:03d}"
+
+
+def format_duration(seconds: int) -> str:
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    secs = seconds % 60
+    if hours:
+        return f"{hours:d}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:d}:{secs:02d}"
+
+
+def air_time(entry: dict) -> float:
+    """Timestamp a catalog entry started airing, or its mtime when the name carries no start."""
+    if entry.get("started_at"):
+        return datetime.fromisoformat(entry["started_at"]).timestamp()
+    return entry["mtime"]
+
+
+def parse_recording_name(filename: str) -> dict:
+    stem = Path(filename).stem
+    match = RECORDING_NAME_RE.match(stem)
+    if not match:
+        return {"program": stem, "frequency_mhz": None, "started_at": None}
+    try:
+        started_at = datetime.strptime(match.group("stamp"), "%Y-%m-%d_%H%M").isoformat(timespec="minutes")
+    except ValueError:
+        started_at = None
+    return {
+        "program": match.group("name"),
+        "frequency_mhz": float(match.group("freq")),
+        "started_at": started_at,
+    }
+
+
+class RecordingCatalog:
+    """Append-only JSON-lines index of recording metadata.
+
+    Each line is either a full entry or a deletion marker; the last line for a
+    name wins. Entries are validated against the file's size and mtime so a
+    recording is only probed with ffprobe once per change, and not at all when
+    its analysis sidecar already records the exact duration.
+
+    In memory, ``(mtime, name)`` keys are kept sorted for the whole archive and
+    per program and frequency, so listing a page costs a bisect rather than a
+    sort of every recording.
+    """
+
+    def __init__(self, path: Path, recordings_dir: Path) -> None:
+        self.path = path
+        self.recordings_dir = recordings_dir
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+        self.order: list[tuple[float, str]] = []
+        self.indexes: dict[tuple[str, Any], list[tuple[float, str]]] = {}
+        self.total_bytes = 0
+        self.max_air_lag = 0.0
+        self._loaded = False
+        self._stale_lines = 0
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self._stale_lines += 1
+                    continue
+                name = record.get("name")
+                if not name:
+                    continue
+                if name in self.entries:
+                    self._stale_lines += 1
+                if record.get("deleted"):
+                    self.entries.pop(name, None)
+                    self._stale_lines += 1
+                else:
+                    self.entries[name] = record
+        entries = list(self.entries.values())
+        self.entries = {}
+        for entry in sorted(entries, key=lambda entry: (entry["mtime"], entry["name"])):
+            self._put(entry)
+
+    def _index_keys(self, entry: dict) -> list[tuple[str, Any]]:
+        return [("program", entry.get("program")), ("frequency", entry.get("frequency_mhz"))]
+
+    def _put(self, entry: dict) -> None:
+        self._drop(entry["name"])
+        self.entries[entry["name"]] = entry
+        self.total_bytes += entry["size"]
+        self.max_air_lag = max(self.max_air_lag, entry["mtime"] - air_time(entry))
+        key = (entry["mtime"], entry["name"])
+        bisect.insort(self.order, key)
+        for index_key in self._index_keys(entry):
+            bisect.insort(self.indexes.setdefault(index_key, []), key)
+
+    def _drop(self, name: str) -> Optional[dict]:
+        entry = self.entries.pop(name, None)
+        if entry is None:
+            return None
+        self.total_bytes -= entry["size"]
+        key = (entry["mtime"], name)
+        for keys in [self.order] + [self.indexes.get(index_key, []) for index_key in self._index_keys(entry)]:
+            position = bisect.bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+        for index_key in self._index_keys(entry):
+            if not self.indexes.get(index_key, True):
+                del self.indexes[index_key]
+        return entry
+
+    def _append(self, records: list[dict]) -> None:
+        if not records:
+            return
+        if self._stale_lines > max(64, len(self.entries)):
+            self._compact()
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record, sort_keys=True) + "\n")
+
+    def _compact(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            for record in self.entries.values():
+                handle.write(json.dumps(record, sort_keys=True) + "\n")
+        tmp_path.replace(self.path)
+        self._stale_lines = 0
+
+    def _build_entry(self, name: str, size: int, mtime: float, path: Path) -> dict:
+        entry = {"name": name, "size": size, "mtime": mtime}
+        entry.update(parse_recording_name(name))
+        report = load_analysis(name, self.recordings_dir)
+        if report and report.get("duration_sec") is not None:
+            entry["duration_sec"] = int(report["duration_sec"])
+            entry["dead_air_pct"] = report.get("dead_air_pct")
+            entry["chapters"] = report.get("chapters", [])
+        else:
+            entry["duration_sec"] = get_duration_seconds(path)
+        if report and report.get("capture_restarts"):
+            entry["capture_restarts"] = report["capture_restarts"]
+            entry["lost_sec"] = report.get("lost_sec")
+        if report and report.get("truncated"):
+            entry["truncated"] = True
+            entry["lost_sec"] = report.get("lost_sec")
+        return entry
+
+    def add(self, path: Path) -> dict:
+        stat = path.stat()
+        with self.lock:
+            self._load()
+            entry = self.entries.get(path.name)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                return entry
+            if entry:
+                self._stale_lines += 1
+            entry = self._build_entry(path.name, stat.st_size, stat.st_mtime, path)
+            self._put(entry)
+            self._append([entry])
+            return entry
+
+    def remove(self, name: str) -> None:
+        with self.lock:
+            self._load()
+            if self._drop(name) is None:
+                return
+            self._stale_lines += 1
+            self._append([{"name": name, "deleted": True}])
+
+    def total_size(self) -> int:
+        with self.lock:
+            self._load()
+            return self.total_bytes
+
+    def sync(self) -> bool:
+        """Reconcile the index with the recordings directory in one scandir pass."""
+        with self.lock:
+            self._load()
+            changes = []
+            seen = set()
+            if self.recordings_dir.exists():
+                with os.scandir(self.recordings_dir) as listing:
+                    for dir_entry in listing:
+                        if not dir_entry.name.endswith(".mp3") or not dir_entry.is_file():
+                            continue
+                        seen.add(dir_entry.name)
+                        stat = dir_entry.stat()
+                        entry = self.entries.get(dir_entry.name)
+                        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                            continue
+                        if entry:
+                            self._stale_lines += 1
+                        entry = self._build_entry(
+                            dir_entry.name, stat.st_size, stat.st_mtime, Path(dir_entry.path)
+                        )
+                        self._put(entry)
+                        changes.append(entry)
+            for name in [name for name in self.entries if name not in seen]:
+                self._drop(name)
+                self._stale_lines += 1
+                changes.append({"name": name, "deleted": True})
+            self._append(changes)
+            return bool(changes)
+
+    def recordings(self) -> list[dict]:
+        with self.lock:
+            self._load()
+            return [self.entries[name] for _, name in reversed(self.order)]
+
+    def page(
+        self,
+        limit: int,
+        cursor: Optional[tuple[float, str]] = None,
+        program: Optional[str] = None,
+        frequency_mhz: Optional[float] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> tuple[list[dict], Optional[tuple[float, str]]]:
+        """Newest-first recordings older than ``cursor``, and the cursor of the next page.
+
+        ``since`` and ``until`` bound the air time from the file name, so a show
+        is listed under the day it started. Pages stay ordered by modification
+        time, which trails the air time by at most ``max_air_lag``, so the
+        mtime index still narrows the scan. With both a program and a
+        frequency, the program's index is scanned for the frequency.
+        """
+        with self.lock:
+            self._load()
+            if program is not None:
+                keys = self.indexes.get(("program", program), [])
+            elif frequency_mhz is not None:
+                keys = self.indexes.get(("frequency", frequency_mhz), [])
+            else:
+                keys = self.order
+            upper = len(keys)
+            if until is not None:
+                upper = bisect.bisect_right(keys, (until + self.max_air_lag, chr(sys.maxunicode)))
+            if cursor is not None:
+                upper = min(upper, bisect.bisect_left(keys, cursor))
+            lower = bisect.bisect_left(keys, (since, "")) if since is not None else 0
+            items = []
+            position = upper
+            while position > lower and len(items) < limit:
+                position -= 1
+                entry = self.entries[keys[position][1]]
+                if frequency_mhz is not None and entry.get("frequency_mhz") != frequency_mhz:
+                    continue
+                if since is not None or until is not None:
+                    aired = air_time(entry)
+                    if (since is not None and aired < since) or (until is not None and aired > until):
+                        continue
+                items.append(entry)
+            return items, (keys[position] if items and position > lower else None)
+
+    def programs(self) -> list[str]:
+        with self.lock:
+            self._load()
+            return sorted(key for kind, key in self.indexes if kind == "program" and key is not None)
+
+
+_catalogs: dict[tuple[Path, Path], RecordingCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog() -> RecordingCatalog:
+    key = (CATALOG_PATH, RECORDINGS_DIR)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = RecordingCatalog(CATALOG_PATH, RECORDINGS_DIR)
+            _catalogs[key] = catalog
+        return catalog
+
+
+class Retention:
+    """Deletes recordings to honour per-program rules and a global byte quota.
+
+    Sizes come from the recording catalog, which keeps a running total as files
+    are added and removed, so a pass never rescans the recordings directory.
+    A background thread runs a pass every RETENTION_INTERVAL_SEC or when
+    ``request`` is called; ``make_room`` runs one before a recording starts so
+    its projected size fits under the quota. The feed is rebuilt once per pass
+    that deleted anything; after ``make_room`` that happens on a detached
+    thread so the tuner is not kept waiting.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.config: dict = {}
+        self.quota_bytes = 0
+        self.rules: dict[str, dict] = {}
+        self.default_rule: dict = {}
+        self.last_evicted: list[str] = []
+
+    def configure(self, config: dict) -> None:
+        settings = config.get("retention") or {}
+        with self.lock:
+            self.config = dict(config)
+            self.quota_bytes = int(float(settings.get("quota_gb", 0)) * 1024**3)
+            self.rules = {
+                sanitize_name(program): dict(rule) for program, rule in (settings.get("programs") or {}).items()
+            }
+            self.default_rule = dict(settings.get("default") or {})
+        self.request()
+
+    def start(self) -> None:
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def request(self) -> None:
+        self.wake.set()
+
+    def status(self) -> dict:
+        with self.lock:
+            quota = self.quota_bytes
+            evicted = list(self.last_evicted)
+        return {"quota_bytes": quota or None, "used_bytes": get_catalog().total_size(), "last_evicted": evicted}
+
+    def _run(self) -> None:
+        while True:
+            self.wake.wait(RETENTION_INTERVAL_SEC)
+            self.wake.clear()
+            with contextlib.suppress(OSError):
+                self.enforce()
+
+    def make_room(self, duration_sec: int) -> list[str]:
+        return self.enforce(duration_sec * MP3_BYTES_PER_SEC, rebuild_in_background=True)
+
+    def _expired(self, entry: dict, rank: int, now: float) -> bool:
+        rule = self.rules.get(entry.get("program"), self.default_rule)
+        keep = rule.get("keep")
+        max_age_days = rule.get("max_age_days")
+        if keep and rank > int(keep):
+            return True
+        return bool(max_age_days) and now - entry["mtime"] > float(max_age_days) * 86400
+
+    def enforce(self, reserve_bytes: int = 0, rebuild_in_background: bool = False) -> list[str]:
+        """Delete whatever the rules expire, then the oldest recordings until ``reserve_bytes`` fit."""
+        catalog = get_catalog()
+        with self.lock:
+            if not (self.quota_bytes or self.rules or self.default_rule):
+                return []
+            now = time.time()
+            entries = catalog.recordings()
+            ranks: dict[str, int] = {}
+            evicted = []
+            for entry in entries:
+                program = entry.get("program")
+                ranks[program] = ranks.get(program, 0) + 1
+                if self._expired(entry, ranks[program], now):
+                    evicted.append(entry)
+            if self.quota_bytes:
+                chosen = {entry["name"] for entry in evicted}
+                projected = catalog.total_size() + reserve_bytes - sum(entry["size"] for entry in evicted)
+                for entry in reversed(entries):
+                    if projected <= self.quota_bytes:
+                        break
+                    if entry["name"] not in chosen:
+                        evicted.append(entry)
+                        projected -= entry["size"]
+            for entry in evicted:
+                (catalog.recordings_dir / entry["name"]).unlink(missing_ok=True)
+                analysis_path(entry["name"], catalog.recordings_dir).unlink(missing_ok=True)
+                catalog.remove(entry["name"])
+            names = [entry["name"] for entry in evicted]
+            if names:
+                self.last_evicted = names
+            config = self.config
+        if names and rebuild_in_background:
+            threading.Thread(target=generate_rss, args=(config,), daemon=True).start()
+        elif names:
+            generate_rss(config)
+        return names
+
+
+retention = Retention()
+
+
+def next_fire_time(schedule: dict, after: datetime) -> Optional[datetime]:
+    """Return the next local start of ``schedule`` that is still worth firing.
+
+    Starts up to MISSED_START_GRACE_SEC before ``after`` are still returned so
+    a short stall does not drop a show. Times are compared as absolute
+    timestamps, so DST transitions between now and the start are accounted for.
+    """
+    if not schedule.get("enabled", True):
+        return None
     try:
         hour, minute = parse_time(schedule["start_time"])
     except (KeyError, ValueError):
-        return False
-    scheduled = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-    delta = (now - scheduled).total_seconds()
-    if delta < 0 or delta > 60:
-        return False
-    last_run = schedule.get("last_run")
-    if last_run:
+        return None
+    day_indices = normalize_days(schedule.get("days", []))
+    if not day_indices:
+        return None
+    last_run = None
+    if schedule.get("last_run"):
         try:
-            last_time = datetime.fromisoformat(last_run)
-            if last_time.date() == scheduled.date():
-                return False
+            last_run = datetime.fromisoformat(schedule["last_run"])
         except ValueError:
             pass
-    return True
+    earliest = after.timestamp() - MISSED_START_GRACE_SEC
+    for offset in range(-1, 8):
+        day = after.date() + timedelta(days=offset)
+        if day.weekday() not in day_indices:
+            continue
+        candidate = datetime.combine(day, dt_time(hour, minute))
+        if last_run and (last_run.date() == day or last_run >= candidate):
+            continue
+        if candidate.timestamp() >= earliest:
+            return candidate
+    return None
 
 
 def normalize_days(days: list) -> list[int]:
@@ -279,57 +3097,542 @@ def schedule_intervals(schedule: dict) -> list[tuple[int, int, int]]:
     return intervals
 
 
-def schedules_overlap(candidate: dict, schedules: list, skip_id: Optional[str] = None) -> bool:
-    candidate_intervals = schedule_intervals(candidate)
-    if not candidate_intervals:
-        return False
-    for schedule in schedules:
-        if skip_id and schedule.get("id") == skip_id:
-            continue
-        for cand_day, cand_start, cand_end in candidate_intervals:
-            for day, start, end in schedule_intervals(schedule):
-                if cand_day != day:
-                    continue
-                if max(cand_start, start) < min(cand_end, end):
-                    return True
-    return False
+def build_schedule(payload: dict, schedule_id: str) -> dict:
+    return {
+        "id": schedule_id,
+        "name": payload.get("name", "Show"),
+        "frequency_mhz": float(payload.get("frequency_mhz", 0)),
+        "duration_sec": max(60, int(payload.get("duration_sec", 0))),
+        "days": payload.get("days", []),
+        "start_time": payload.get("start_time", "00:00"),
+        "enabled": bool(payload.get("enabled", True)),
+    }
+
+
+def schedule_conflicts(
+    candidate: dict,
+    config: dict,
+    skip_id: Optional[str] = None,
+    index: Optional[WeeklyIntervalIndex] = None,
+) -> list[str]:
+    """Ids of schedules that cannot be recorded alongside ``candidate``.
+
+    Overlaps are fine while no more shows run at once than there are tuners.
+    In wideband mode overlapping shows are fine as long as every show chained
+    to the candidate fits in one capture bandwidth.
+    """
+    index = index if index is not None else schedule_index
+    overlapping = index.conflicts(candidate, skip_id=skip_id)
+    if not overlapping:
+        return overlapping
+    if config.get("capture_mode") != "wideband":
+        if index.peak_overlap(candidate, skip_id=skip_id) < len(configured_devices(config)):
+            return []
+        return overlapping
+    frequencies = [float(candidate.get("frequency_mhz", 0))] + [
+        index.frequencies[schedule_id] for schedule_id in index.component(candidate, skip_id=skip_id)
+    ]
+    if capture_band_fits(frequencies, config):
+        return []
+    return overlapping
+
+
+def occurrence_end(schedule: dict, now: datetime) -> int:
+    """Week second at which the occurrence of ``schedule`` that started by ``now`` ends."""
+    hour, minute = parse_time(schedule["start_time"])
+    day = now.weekday()
+    if (now.hour, now.minute) < (hour, minute):
+        day = (day - 1) % 7
+    return day * 86400 + hour * 3600 + minute * 60 + int(schedule["duration_sec"])
 
 
-def run_recording(schedule: dict) -> None:
+def run_recording(schedule: dict, starts_at: Optional[datetime] = None) -> None:
     config = load_config()
     name = schedule["name"]
     frequency = float(schedule["frequency_mhz"])
     duration = int(schedule["duration_sec"])
+    starts_at = starts_at or datetime.now()
+    with schedule_store.lock:
+        follow_on = bool(
+            schedule_index.followers(
+                occurrence_end(schedule, starts_at), frequency, skip_id=schedule.get("id")
+            )
+        )
+    journal_id = f"{schedule.get('id', name)}@{int(starts_at.timestamp())}"
+    record_guarded(
+        schedule.get("id"), name, frequency, duration, config, journal_id,
+        scheduled_at=starts_at.timestamp(), follow_on=follow_on, starts_at=starts_at,
+    )
+
+
+def record_guarded(
+    schedule_id: Optional[str],
+    name: str,
+    frequency: float,
+    duration: int,
+    config: dict,
+    journal_id: str,
+    scheduled_at: Optional[float] = None,
+    **kwargs,
+) -> None:
+    """Run ``record_station`` for a scheduled or resumed recording.
+
+    Skips a recording that is already running, journals it as scheduled when
+    ``scheduled_at`` is given, and counts a missing tuner against the schedule.
+    """
     key = f"{name}:{frequency}:{duration}"
     with active_lock:
         if key in active_recordings:
             return
         active_recordings.add(key)
     try:
-        record_station(name, frequency, duration, config)
+        with recording_journal.tracking(journal_id):
+            if scheduled_at is not None:
+                recording_journal.scheduled(journal_id, name, frequency, scheduled_at, duration)
+            record_station(name, frequency, duration, config, journal_id=journal_id, **kwargs)
+    except NoFreeTuner as exc:
+        # Already journaled as failed; count it and show it on the schedule.
+        metrics.inc("shiftfm_recordings_missed_total", reason="no_free_tuner")
+        note_schedule_error(schedule_id, str(exc))
+        return
     finally:
         with active_lock:
             active_recordings.discard(key)
+    note_schedule_error(schedule_id, None)
 
 
-def scheduler_loop() -> None:
-    while True:
+def note_schedule_error(schedule_id: Optional[str], error: Optional[str]) -> None:
+    """Set (or with None, clear) the ``last_error`` that /api/schedules shows for a schedule."""
+    if schedule_id is None:
+        return
+
+    def mark(payload: dict) -> None:
+        for schedule in payload.get("schedules", []):
+            if schedule.get("id") == schedule_id:
+                if error:
+                    schedule["last_error"] = error
+                else:
+                    schedule.pop("last_error", None)
+
+    schedule_store.update(mark)
+
+
+def recover_recordings(config: dict) -> list[dict]:
+    """Replay the recording journal and resume what a restart cut short.
+
+    Recordings whose window has at least RESUME_MIN_SEC left restart at once
+    as a new file. Each interrupted entry is returned with ``lost_sec``, the
+    audio missed between the crash and the resume (or the scheduled end),
+    for ``repair_interrupted`` to record once the archive is reconciled.
+    """
+    interrupted = recording_journal.recover()
+    now = datetime.now()
+    for entry in interrupted:
+        window_end = float(entry["start_ts"]) + int(entry["duration_sec"])
+        remaining = int(window_end - now.timestamp())
+        crashed_at = float(entry["at"])
+        if "capture_path" in entry:
+            with contextlib.suppress(OSError):
+                crashed_at = max(crashed_at, Path(entry["capture_path"]).stat().st_mtime)
+        entry["resumed"] = remaining >= RESUME_MIN_SEC
+        stop = now.timestamp() if entry["resumed"] else window_end
+        entry["lost_sec"] = round(min(max(0.0, stop - crashed_at), int(entry["duration_sec"])), 1)
+        if not entry["resumed"]:
+            continue
+        restarted_name = generate_filename(entry["name"], entry["frequency_mhz"], now)
+        if restarted_name == Path(entry.get("output_path", "")).name:
+            # Restarted within the minute the show began: at most a minute is lost, re-record it whole.
+            discard_interrupted(entry)
+        threading.Thread(
+            target=record_guarded,
+            args=(
+                entry["id"].split("@")[0], entry["name"], float(entry["frequency_mhz"]), remaining, config,
+                f"{entry['id']}+resumed",
+            ),
+            kwargs={"starts_at": now},
+            daemon=True,
+        ).start()
+    return interrupted
+
+
+def discard_interrupted(entry: dict) -> None:
+    """Delete whatever an interrupted recording left on disk."""
+    entry["discarded"] = True
+    for key in ("capture_path", "output_path"):
+        if key in entry:
+            Path(entry[key]).unlink(missing_ok=True)
+    if "output_path" in entry:
+        shutil.rmtree(live_dir(Path(entry["output_path"]).name), ignore_errors=True)
+
+
+def repair_interrupted(entry: dict) -> None:
+    """Salvage an interrupted recording's audio and mark its sidecar ``truncated``.
+
+    Live segments are joined, an FLAC capture is queued for encoding (the
+    decoder stops cleanly at the cut) and an MP3 cut mid-frame is remuxed.
+    An MP3 that cannot be remuxed is kept as it is, marked all the same.
+    """
+    if entry.get("discarded") or "output_path" not in entry:
+        return
+    output_path = Path(entry["output_path"])
+    capture_path = Path(entry["capture_path"])
+    segments = live_dir(output_path.name)
+    if segments.is_dir():
+        if join_segments(segments, output_path) == 0:
+            shutil.rmtree(segments, ignore_errors=True)
+    elif capture_path != output_path:
+        if capture_path.exists():
+            encode_queue.submit(capture_path, output_path)
+    elif output_path.exists() and output_path.stat().st_size == 0:
+        output_path.unlink()
+    elif output_path.exists():
+        repair_recording(output_path)
+    if not output_path.exists() and not capture_path.exists():
+        return
+    report = load_analysis(output_path.name) or {}
+    report.update(truncated=True, lost_sec=round(report.get("lost_sec", 0) + entry["lost_sec"], 1))
+    with contextlib.suppress(OSError):
+        save_json(analysis_path(output_path.name), report)
+
+
+def repair_recording(path: Path) -> bool:
+    """Rewrite a truncated MP3 by stream copy, dropping the partial frame it ends on."""
+    modified = path.stat().st_mtime
+    partial = path.with_name(f".{path.name}.part")
+    command = ["ffmpeg", "-loglevel", "error", "-y", "-i", str(path)]
+    command += ["-map", "0:a", "-c", "copy", "-f", "mp3", str(partial)]
+    result = subprocess.run(command, stdin=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    note_process_exit("ffmpeg", result.returncode)
+    if result.returncode != 0 or not partial.exists() or partial.stat().st_size == 0:
+        partial.unlink(missing_ok=True)
+        return False
+    os.replace(partial, path)
+    os.utime(path, (modified, modified))
+    return True
+
+
+def reconcile_archive(interrupted: list[dict], config: dict) -> None:
+    """Repair interrupted recordings, then bring the catalog and feeds in line with the disk."""
+    for entry in interrupted:
+        repair_interrupted(entry)
+    generate_rss(config)
+
+
+class Scheduler:
+    """Min-heap of each schedule's next absolute fire time.
+
+    The loop sleeps until the head entry is due; API changes call
+    ``reschedule`` which pushes a fresh entry and invalidates the old one by
+    bumping the schedule's generation, so no full rescan is needed.
+    """
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.heap: list[tuple[float, int, str, int]] = []
+        self.generations: dict[str, int] = {}
+        self.pending: set[str] = set()
+        self.loaded = False
+        self.preroll_sec = PREROLL_SEC
+        self._seq = 0
+
+    def _push(self, schedule: dict, now: datetime) -> None:
+        schedule_id = schedule.get("id")
+        if not schedule_id:
+            return
+        generation = self.generations.get(schedule_id, 0) + 1
+        self.generations[schedule_id] = generation
+        fire_at = next_fire_time(schedule, now)
+        if fire_at is None:
+            return
+        self._seq += 1
+        heapq.heappush(self.heap, (fire_at.timestamp(), self._seq, schedule_id, generation))
+
+    def _refresh(self) -> None:
+        if self.loaded and not self.pending:
+            return
+        now = datetime.now()
+        schedules = {
+            schedule.get("id"): schedule for schedule in load_schedules().get("schedules", [])
+        }
+        if not self.loaded:
+            self.heap = []
+            for schedule in schedules.values():
+                self._push(schedule, now)
+            self.loaded = True
+        else:
+            for schedule_id in self.pending:
+                if schedule_id in schedules:
+                    self._push(schedules[schedule_id], now)
+                else:
+                    self.generations.pop(schedule_id, None)
+        self.pending.clear()
+
+    def reschedule(self, schedule_id: str) -> None:
+        with self.condition:
+            self.pending.add(schedule_id)
+            self.condition.notify()
+
+    def configure(self, config: dict) -> None:
+        with self.condition:
+            self.preroll_sec = max(0.0, float(config.get("preroll_sec", PREROLL_SEC)))
+            self.condition.notify()
+
+    def _next_due(self) -> tuple[str, float]:
+        """Id and scheduled timestamp of the next schedule, returned ``preroll_sec`` early."""
+        with self.condition:
+            while True:
+                self._refresh()
+                while self.heap:
+                    _, _, schedule_id, generation = self.heap[0]
+                    if self.generations.get(schedule_id) == generation:
+                        break
+                    heapq.heappop(self.heap)
+                if not self.heap:
+                    self.condition.wait(SCHEDULER_MAX_SLEEP_SEC)
+                    continue
+                delay = self.heap[0][0] - self.preroll_sec - time.time()
+                if delay > 0:
+                    self.condition.wait(min(delay, SCHEDULER_MAX_SLEEP_SEC))
+                    continue
+                fire_ts, _, schedule_id, _ = heapq.heappop(self.heap)
+                if time.time() - fire_ts > MISSED_START_GRACE_SEC:
+                    self.pending.add(schedule_id)
+                    continue
+                return schedule_id, fire_ts
+
+    def _fire(self, due: tuple[str, float]) -> None:
+        schedule_id, fire_ts = due
         now = datetime.now()
-        schedules_payload = load_schedules()
-        schedules = schedules_payload.get("schedules", [])
-        changed = False
-        for schedule in schedules:
-            if schedule_due(schedule, now):
-                schedule["last_run"] = now.isoformat(timespec="seconds")
-                changed = True
-                threading.Thread(target=run_recording, args=(schedule,), daemon=True).start()
-        if changed:
-            save_json(SCHEDULES_PATH, schedules_payload)
-        time.sleep(20)
+        released_at = fire_ts - self.preroll_sec
+        metrics.observe("shiftfm_scheduler_lag_seconds", max(0.0, now.timestamp() - released_at))
+        # Mark the scheduled instant, which pre-roll puts slightly after now.
+        starts_at = datetime.fromtimestamp(fire_ts)
+
+        def mark_run(payload: dict) -> Optional[dict]:
+            for schedule in payload.get("schedules", []):
+                if schedule.get("id") == schedule_id:
+                    schedule["last_run"] = starts_at.isoformat(timespec="seconds")
+                    return copy.deepcopy(schedule)
+            return None
+
+        schedule = schedule_store.update(mark_run)
+        if schedule is None:
+            return
+        threading.Thread(target=run_recording, args=(schedule, starts_at), daemon=True).start()
+        with self.condition:
+            self._push(schedule, now)
+
+    def run(self) -> None:
+        while True:
+            self._fire(self._next_due())
+
+
+scheduler = Scheduler()
+
+
+def scheduler_loop() -> None:
+    scheduler.run()
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    candidates = [value.strip() for value in header.split(",")]
+    if "*" in candidates:
+        return True
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def parse_http_date(value: str) -> Optional[float]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def accepts_encoding(header: str, encoding: str) -> bool:
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() not in (encoding, "*"):
+            continue
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def file_etag(stat: os.stat_result) -> str:
+    return f"\"{stat.st_size:x}-{stat.st_mtime_ns:x}\""
+
+
+def route_label(path: str) -> str:
+    """Collapse a request path to a bounded set of metric labels."""
+    for prefix in ("/static/", "/recordings/", "/renditions/", "/live/", "/rss/", "/api/schedules/"):
+        if path.startswith(prefix):
+            return prefix + "*"
+    if RENDITION_FEED_RE.fullmatch(path):
+        return "/rss-*.xml"
+    if path in KNOWN_ROUTES:
+        return path
+    return "other"
+
+
+def parse_byte_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """Return the inclusive (start, end) of a single byte range.
+
+    Returns None when the header should be ignored (malformed or multiple
+    ranges, which are answered with the full body) and raises ValueError when
+    the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.strip().partition("-"))
+    if not sep or not (first.isdigit() or not first) or not (last.isdigit() or not last):
+        return None
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+class StaticAsset:
+    """One web UI file as raw bytes plus gzip and (if available) brotli variants."""
+
+    def __init__(self, body: bytes, mime_type: str, mtime_ns: int, links: tuple = ()) -> None:
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        brotli = load_brotli()
+        self.br_body = brotli.compress(body) if brotli else None
+        digest = hashlib.sha1(body).hexdigest()
+        self.etag = f"\"{digest}\""
+        self.version = digest[:12]
+        self.mime_type = mime_type
+        self.mtime_ns = mtime_ns
+        self.links = links
+        self.checked_at = time.monotonic()
+
+
+class StaticAssets:
+    """Web UI files kept in memory, re-read only when their mtime changes.
+
+    The mtime is checked at most every STATIC_RECHECK_SEC. Links to other
+    static files in index.html are rewritten to ``?v=<content hash>`` so those
+    URLs change with the content and can be cached for a year.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.lock = threading.Lock()
+        self.assets: dict[str, StaticAsset] = {}
+
+    def get(self, name: str) -> Optional[StaticAsset]:
+        with self.lock:
+            asset = self.assets.get(name)
+        if asset is not None and time.monotonic() - asset.checked_at < STATIC_RECHECK_SEC:
+            return asset
+        path = self.root / name
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            with self.lock:
+                self.assets.pop(name, None)
+            return None
+        unchanged = asset is not None and asset.mtime_ns == mtime_ns
+        if unchanged and asset.links == self._link_versions(asset.links):
+            asset.checked_at = time.monotonic()
+            return asset
+        body = path.read_bytes()
+        links: tuple = ()
+        if path.suffix == ".html":
+            body, links = self._version_links(body)
+        asset = StaticAsset(body, STATIC_MIME_TYPES.get(path.suffix, "text/plain"), mtime_ns, links)
+        with self.lock:
+            self.assets[name] = asset
+        return asset
+
+    def _link_versions(self, links: tuple) -> tuple:
+        versions = []
+        for name, _ in links:
+            linked = self.get(name)
+            versions.append((name, linked.version if linked else None))
+        return tuple(versions)
+
+    def _version_links(self, body: bytes) -> tuple[bytes, tuple]:
+        links = {}
+
+        def versioned(match: re.Match) -> bytes:
+            name = match.group(1).decode("ascii")
+            linked = self.get(name)
+            links[name] = linked.version if linked else None
+            if linked is None:
+                return match.group(0)
+            return f'"/static/{name}?v={linked.version}"'.encode("ascii")
+
+        body = STATIC_LINK_RE.sub(versioned, body)
+        return body, tuple(sorted(links.items()))
+
+
+static_assets = StaticAssets(STATIC_DIR)
 
 
 class ShiftHandler(BaseHTTPRequestHandler):
     server_version = "shiftFM/0.1"
+    response_status: Optional[int] = None
+    response_bytes = 0
+
+    def handle_one_request(self) -> None:
+        started = time.perf_counter()
+        self.response_status = None
+        self.response_bytes = 0
+        super().handle_one_request()
+        if self.response_status is None:
+            return
+        # A malformed request line is rejected before path and command are parsed.
+        route = route_label(urlparse(getattr(self, "path", "")).path)
+        method = getattr(self, "command", None) or "other"
+        metrics.inc(
+            "shiftfm_http_requests_total", route=route, method=method, status=str(self.response_status)
+        )
+        metrics.observe("shiftfm_http_request_seconds", time.perf_counter() - started, route=route)
+        if self.response_bytes:
+            metrics.inc("shiftfm_http_response_bytes_total", self.response_bytes, route=route)
+
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        self.response_status = code
+        super().send_response(code, message)
+
+    def send_header(self, keyword: str, value: str) -> None:
+        if keyword.lower() == "content-length" and self.command != "HEAD" and self.response_status != 304:
+            self.response_bytes = int(value)
+        super().send_header(keyword, value)
+
+    def _send_metrics(self) -> None:
+        with active_lock:
+            metrics.set("shiftfm_active_recordings", len(active_recordings))
+        metrics.set("shiftfm_encode_queue_pending", encode_queue.pending())
+        metrics.set("shiftfm_archive_bytes", get_catalog().total_size())
+        data = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
 
     def _send_json(self, payload: dict, status: int = 200) -> None:
         data = json.dumps(payload).encode("utf-8")
@@ -339,13 +3642,201 @@ class ShiftHandler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(data)
 
-    def _send_text(self, payload: str, content_type: str = "text/plain", status: int = 200) -> None:
-        data = payload.encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(data)))
+    def _not_modified(self, etag: str, last_modified: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            since = parse_http_date(if_modified_since)
+            return since is not None and int(last_modified) <= since
+        return False
+
+    def _send_feed(
+        self, head: bool = False, cache: Optional[FeedCache] = None, path: Optional[Path] = None
+    ) -> None:
+        cache = cache or feed_cache
+        cache.load_file(path or RSS_PATH)
+        body, gzip_body, etag, last_modified = cache.snapshot()
+        encoding = None
+        if accepts_encoding(self.headers.get("Accept-Encoding", ""), "gzip"):
+            body = gzip_body
+            etag = etag[:-1] + "-gzip\""
+            encoding = "gzip"
+        not_modified = self._not_modified(etag, last_modified)
+        if not_modified:
+            self.send_response(304)
+        else:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(last_modified, usegmt=True))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
         self.end_headers()
-        self.wfile.write(data)
+        if not head and not not_modified:
+            self.wfile.write(body)
+
+    def _range_applies(self, etag: str, last_modified: float) -> bool:
+        if_range = self.headers.get("If-Range")
+        if not if_range:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith("\"") or if_range.startswith("W/"):
+            return if_range == etag
+        since = parse_http_date(if_range)
+        return since is not None and int(last_modified) <= since
+
+    def _send_rendition_feed(self, path: str, head: bool = False) -> bool:
+        match = RENDITION_FEED_RE.fullmatch(path)
+        if not match or match.group(1) not in rendition_feeds:
+            return False
+        rendition_id = match.group(1)
+        self._send_feed(head, rendition_feeds[rendition_id], rendition_feed_path(rendition_id))
+        return True
+
+    def _send_static(self, name: str, query: str = "", head: bool = False) -> None:
+        asset = static_assets.get(name)
+        if asset is None:
+            self.send_error(404)
+            return
+        body, etag, encoding = asset.body, asset.etag, None
+        accept = self.headers.get("Accept-Encoding", "")
+        if asset.br_body is not None and accepts_encoding(accept, "br"):
+            body, encoding = asset.br_body, "br"
+        elif accepts_encoding(accept, "gzip"):
+            body, encoding = asset.gzip_body, "gzip"
+        if encoding:
+            etag = f"{etag[:-1]}-{encoding}\""
+        last_modified = asset.mtime_ns / 1e9
+        not_modified = self._not_modified(etag, last_modified)
+        if not_modified:
+            self.send_response(304)
+        else:
+            self.send_response(200)
+            self.send_header("Content-Type", asset.mime_type)
+            self.send_header("Content-Length", str(len(body)))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+        versioned = parse_qs(query).get("v") == [asset.version]
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(last_modified, usegmt=True))
+        self.send_header("Cache-Control", IMMUTABLE_CACHE_CONTROL if versioned else "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        if not head and not not_modified:
+            self.wfile.write(body)
+
+    def _send_program_feed(self, path: str, head: bool = False) -> bool:
+        match = PROGRAM_FEED_RE.fullmatch(path)
+        if not match or match.group(1) not in program_feeds:
+            return False
+        program = match.group(1)
+        self._send_feed(head, program_feeds[program], program_feed_path(program))
+        return True
+
+    def _send_recordings_page(self, query: str) -> None:
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        try:
+            limit = min(int(params.get("limit", RECORDINGS_PAGE_LIMIT)), RECORDINGS_MAX_PAGE_LIMIT)
+            cursor = decode_cursor(params["cursor"]) if params.get("cursor") else None
+            frequency = float(params["frequency"]) if params.get("frequency") else None
+            since, until = (
+                datetime.fromisoformat(params[key]).timestamp() if params.get(key) else None
+                for key in ("since", "until")
+            )
+        except ValueError:
+            self._send_json({"error": "Invalid limit, cursor, frequency or date."}, status=400)
+            return
+        program = sanitize_name(params["program"]) if params.get("program") else None
+        items, next_key = get_catalog().page(max(limit, 1), cursor, program, frequency, since, until)
+        base_url = load_config().get("base_url", DEFAULT_CONFIG["base_url"]).rstrip("/")
+        self._send_json(
+            {
+                "recordings": [dict(entry, url=f"{base_url}/recordings/{entry['name']}") for entry in items],
+                "next_cursor": encode_cursor(next_key) if next_key else None,
+            }
+        )
+
+    def _send_rendition(self, path: str, head: bool = False) -> None:
+        parts = path.split("/")
+        suffixes = {suffix: mime for suffix, mime, _ in RENDITION_CODECS.values()}
+        target_name = Path(parts[-1]).name
+        suffix = Path(target_name).suffix
+        if len(parts) != 4 or not RENDITION_ID_RE.fullmatch(parts[2]) or suffix not in suffixes:
+            self.send_error(404)
+            return
+        self._send_recording(RENDITIONS_DIR / parts[2] / target_name, head, suffixes[suffix])
+
+    def _send_live(self, path: str, head: bool = False) -> None:
+        match = LIVE_FILE_RE.fullmatch(path)
+        if not match or not live_recordings.active(f"{match.group(1)}.mp3"):
+            self.send_error(404)
+            return
+        name = match.group(2)
+        suffix = Path(name).suffix
+        # The playlist grows every segment; segments never change once listed.
+        cache_control = "no-cache" if suffix == ".m3u8" else "public, max-age=3600"
+        self._send_recording(LIVE_DIR / match.group(1) / name, head, LIVE_MIME_TYPES[suffix], cache_control)
+
+    def _send_recording(
+        self,
+        target: Path,
+        head: bool = False,
+        content_type: str = "audio/mpeg",
+        cache_control: Optional[str] = None,
+    ) -> None:
+        try:
+            handle = target.open("rb")
+        except (FileNotFoundError, IsADirectoryError):
+            self.send_error(404)
+            return
+        with handle:
+            stat = os.fstat(handle.fileno())
+            size = stat.st_size
+            etag = file_etag(stat)
+            if self._not_modified(etag, stat.st_mtime):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+                self.end_headers()
+                return
+            start, end = 0, size - 1
+            status = 200
+            range_header = self.headers.get("Range")
+            if range_header and self._range_applies(etag, stat.st_mtime):
+                try:
+                    byte_range = parse_byte_range(range_header, size)
+                except ValueError:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if byte_range is not None:
+                    start, end = byte_range
+                    status = 206
+            length = end - start + 1
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+            if cache_control:
+                self.send_header("Cache-Control", cache_control)
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            if head or length <= 0:
+                return
+            try:
+                self.connection.sendfile(handle, offset=start, count=length)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
 
     def _read_body(self) -> dict:
         length = int(self.headers.get("Content-Length", 0))
@@ -359,23 +3850,26 @@ class ShiftHandler(BaseHTTPRequestHandler):
     def do_HEAD(self) -> None:
         parsed = urlparse(self.path)
         if parsed.path == "/rss.xml":
-            payload = RSS_PATH.read_text(encoding="utf-8") if RSS_PATH.exists() else ""
-            data = payload.encode("utf-8")
-            self.send_response(200)
-            self.send_header("Content-Type", "application/rss+xml")
-            self.send_header("Content-Length", str(len(data)))
-            self.end_headers()
+            self._send_feed(head=True)
             return
         if parsed.path.startswith("/recordings/"):
-            target = RECORDINGS_DIR / Path(parsed.path).name
-            if target.exists():
-                size = target.stat().st_size
-                self.send_response(200)
-                self.send_header("Content-Type", "audio/mpeg")
-                self.send_header("Content-Length", str(size))
-                self.end_headers()
-            else:
-                self.send_error(404)
+            self._send_recording(RECORDINGS_DIR / Path(parsed.path).name, head=True)
+            return
+        if parsed.path.startswith("/renditions/"):
+            self._send_rendition(parsed.path, head=True)
+            return
+        if parsed.path.startswith("/live/"):
+            self._send_live(parsed.path, head=True)
+            return
+        if self._send_rendition_feed(parsed.path, head=True):
+            return
+        if self._send_program_feed(parsed.path, head=True):
+            return
+        if parsed.path.startswith("/static/"):
+            self._send_static(Path(parsed.path).name, parsed.query, head=True)
+            return
+        if parsed.path in ("/", "/index.html"):
+            self._send_static("index.html", head=True)
             return
         self.send_error(404)
 
@@ -387,78 +3881,160 @@ class ShiftHandler(BaseHTTPRequestHandler):
         if parsed.path == "/api/config":
             self._send_json(load_config())
             return
+        if parsed.path == "/api/timeshift":
+            self._send_json(timeshift_buffer.status())
+            return
+        if parsed.path == "/api/capture-latency":
+            self._send_json({"recent": list(capture_latencies)})
+            return
+        if parsed.path == "/api/devices":
+            self._send_json({"devices": tuner_pool.status()})
+            return
+        if parsed.path == "/api/retention":
+            self._send_json(retention.status())
+            return
+        if parsed.path == "/api/encode-jobs":
+            self._send_json({"pending": encode_queue.pending(), "failed": encode_queue.failed()})
+            return
+        if parsed.path == "/api/recordings":
+            self._send_recordings_page(parsed.query)
+            return
+        if parsed.path == "/metrics":
+            self._send_metrics()
+            return
         if parsed.path == "/rss.xml":
-            if RSS_PATH.exists():
-                self._send_text(RSS_PATH.read_text(encoding="utf-8"), content_type="application/rss+xml")
-            else:
-                self._send_text("", content_type="application/rss+xml")
+            self._send_feed()
             return
         if parsed.path.startswith("/recordings/"):
-            target = RECORDINGS_DIR / Path(parsed.path).name
-            if target.exists():
-                data = target.read_bytes()
-                self.send_response(200)
-                self.send_header("Content-Type", "audio/mpeg")
-                self.send_header("Content-Length", str(len(data)))
-                self.end_headers()
-                self.wfile.write(data)
-            else:
-                self.send_error(404)
+            self._send_recording(RECORDINGS_DIR / Path(parsed.path).name)
+            return
+        if parsed.path.startswith("/renditions/"):
+            self._send_rendition(parsed.path)
+            return
+        if parsed.path.startswith("/live/"):
+            self._send_live(parsed.path)
+            return
+        if self._send_rendition_feed(parsed.path):
+            return
+        if self._send_program_feed(parsed.path):
             return
         if parsed.path.startswith("/static/"):
-            target = STATIC_DIR / Path(parsed.path).name
-            if target.exists():
-                mime = "text/plain"
-                if target.suffix == ".css":
-                    mime = "text/css"
-                elif target.suffix == ".js":
-                    mime = "application/javascript"
-                self._send_text(target.read_text(encoding="utf-8"), content_type=mime)
-            else:
-                self.send_error(404)
+            self._send_static(Path(parsed.path).name, parsed.query)
             return
         if parsed.path in ("/", "/index.html"):
-            self._send_text((STATIC_DIR / "index.html").read_text(encoding="utf-8"), content_type="text/html")
+            self._send_static("index.html")
             return
         self.send_error(404)
 
     def do_POST(self) -> None:
         if self.path == "/api/schedules":
             payload = self._read_body()
-            schedules_payload = load_schedules()
-            schedules = schedules_payload.get("schedules", [])
-            schedule = {
-                "id": f"sch_{int(time.time() * 1000)}",
-                "name": payload.get("name", "Show"),
-                "frequency_mhz": float(payload.get("frequency_mhz", 0)),
-                "duration_sec": max(60, int(payload.get("duration_sec", 0))),
-                "days": payload.get("days", []),
-                "start_time": payload.get("start_time", "00:00"),
-                "enabled": bool(payload.get("enabled", True)),
-            }
-            if schedules_overlap(schedule, schedules):
+            schedule = build_schedule(payload, f"sch_{int(time.time() * 1000)}")
+            config = load_config()
+
+            def add_schedule(schedules_payload: dict) -> bool:
+                if schedule_conflicts(schedule, config):
+                    return False
+                schedules_payload.setdefault("schedules", []).append(schedule)
+                schedule_index.add(schedule)
+                return True
+
+            if not schedule_store.update(add_schedule):
                 self._send_json({"error": "Schedule overlaps an existing recording."}, status=409)
                 return
-            schedules.append(schedule)
-            schedules_payload["schedules"] = schedules
-            save_json(SCHEDULES_PATH, schedules_payload)
+            scheduler.reschedule(schedule["id"])
             self._send_json(schedule, status=201)
             return
+        if self.path == "/api/schedules/bulk":
+            payload = self._read_body()
+            entries = payload.get("schedules") if isinstance(payload, dict) else None
+            if not isinstance(entries, list) or not entries:
+                self._send_json({"error": "Expected a non-empty schedules list."}, status=400)
+                return
+            stamp = int(time.time() * 1000)
+            try:
+                batch = [
+                    build_schedule(entry, f"sch_{stamp}_{position}")
+                    for position, entry in enumerate(entries)
+                ]
+            except (AttributeError, TypeError, ValueError):
+                self._send_json({"error": "Invalid schedule in batch."}, status=400)
+                return
+
+            config = load_config()
+
+            def import_schedules(schedules_payload: dict) -> list[dict]:
+                batch_index = schedule_index.copy()
+                positions = {schedule["id"]: position for position, schedule in enumerate(batch)}
+                conflicts = []
+                for position, schedule in enumerate(batch):
+                    found = schedule_conflicts(schedule, config, index=batch_index)
+                    existing = [other for other in found if other not in positions]
+                    within = [positions[other] for other in found if other in positions]
+                    if existing or within:
+                        conflicts.append(
+                            {
+                                "index": position,
+                                "name": schedule["name"],
+                                "schedule_ids": existing,
+                                "batch_indices": within,
+                            }
+                        )
+                    batch_index.add(schedule)
+                if conflicts:
+                    return conflicts
+                schedules_payload.setdefault("schedules", []).extend(batch)
+                for schedule in batch:
+                    schedule_index.add(schedule)
+                return []
+
+            conflicts = schedule_store.update(import_schedules)
+            if conflicts:
+                self._send_json(
+                    {"error": "Schedules overlap existing recordings.", "conflicts": conflicts},
+                    status=409,
+                )
+                return
+            for schedule in batch:
+                scheduler.reschedule(schedule["id"])
+            self._send_json({"schedules": batch}, status=201)
+            return
         if self.path == "/api/record-now":
             payload = self._read_body()
             config = load_config()
-            with active_lock:
-                if active_recordings:
-                    self._send_json({"error": "Recording already in progress."}, status=409)
-                    return
+            frequency = float(payload.get("frequency_mhz", 0))
+            if timeshift_buffer.covers(frequency):
+                busy = False
+            elif config.get("capture_mode") == "wideband":
+                busy = not wideband_captures.can_record(frequency)
+            else:
+                busy = not tuner_available()
+            if busy:
+                self._send_json({"error": "Recording already in progress."}, status=409)
+                return
             threading.Thread(
                 target=record_station,
                 args=(
                     payload.get("name", "Manual"),
-                    float(payload.get("frequency_mhz", 0)),
+                    frequency,
                     max(60, int(payload.get("duration_sec", 0))),
                     config,
                 ),
+                kwargs={"lookback_sec": max(0, int(payload.get("lookback_sec", 0)))},
+                daemon=True,
+            ).start()
+            self._send_json({"status": "started"})
+            return
+        if self.path == "/api/timeshift/save":
+            payload = self._read_body()
+            frequency = timeshift_buffer.frequency_mhz
+            if frequency is None:
+                self._send_json({"error": "Timeshift buffer is not running."}, status=409)
+                return
+            threading.Thread(
+                target=record_station,
+                args=(payload.get("name", "Timeshift"), frequency, 0, load_config()),
+                kwargs={"lookback_sec": max(1, int(float(payload.get("minutes", 5)) * 60))},
                 daemon=True,
             ).start()
             self._send_json({"status": "started"})
@@ -469,18 +4045,19 @@ class ShiftHandler(BaseHTTPRequestHandler):
         if self.path.startswith("/api/schedules/"):
             schedule_id = self.path.split("/")[-1]
             payload = self._read_body()
-            schedules_payload = load_schedules()
-            schedules = schedules_payload.get("schedules", [])
-            updated = None
-            for schedule in schedules:
-                if schedule.get("id") == schedule_id:
+            config = load_config()
+
+            def update_schedule(schedules_payload: dict) -> tuple[Optional[dict], bool]:
+                schedules = schedules_payload.get("schedules", [])
+                for schedule in schedules:
+                    if schedule.get("id") != schedule_id:
+                        continue
                     candidate = schedule.copy()
                     candidate.update(payload)
                     if "duration_sec" in candidate:
                         candidate["duration_sec"] = max(60, int(candidate.get("duration_sec", 0)))
-                    if schedules_overlap(candidate, schedules, skip_id=schedule_id):
-                        self._send_json({"error": "Schedule overlaps an existing recording."}, status=409)
-                        return
+                    if schedule_conflicts(candidate, config, skip_id=schedule_id):
+                        return None, True
                     reset_last_run = any(
                         key in payload and payload.get(key) != schedule.get(key)
                         for key in ("start_time", "days", "frequency_mhz", "duration_sec")
@@ -490,20 +4067,36 @@ class ShiftHandler(BaseHTTPRequestHandler):
                         schedule["duration_sec"] = max(60, int(schedule.get("duration_sec", 0)))
                     if reset_last_run:
                         schedule.pop("last_run", None)
-                    updated = schedule
-                    break
+                    schedule_index.add(schedule)
+                    return copy.deepcopy(schedule), False
+                return None, False
+
+            updated, conflict = schedule_store.update(update_schedule)
+            if conflict:
+                self._send_json({"error": "Schedule overlaps an existing recording."}, status=409)
+                return
             if updated is None:
                 self.send_error(404)
                 return
-            schedules_payload["schedules"] = schedules
-            save_json(SCHEDULES_PATH, schedules_payload)
+            scheduler.reschedule(schedule_id)
             self._send_json(updated)
             return
         if self.path == "/api/config":
             payload = self._read_body()
-            config = load_config()
-            config.update(payload)
-            save_json(CONFIG_PATH, config)
+
+            def update_config(stored: dict) -> dict:
+                merged = DEFAULT_CONFIG.copy()
+                merged.update(stored)
+                merged.update(payload)
+                stored.update(merged)
+                return merged
+
+            config = config_store.update(update_config)
+            tuner_pool.configure(config)
+            scheduler.configure(config)
+            timeshift_buffer.configure(config)
+            encode_queue.configure(config)
+            retention.configure(config)
             generate_rss(config)
             self._send_json(config)
             return
@@ -512,26 +4105,166 @@ class ShiftHandler(BaseHTTPRequestHandler):
     def do_DELETE(self) -> None:
         if self.path.startswith("/api/schedules/"):
             schedule_id = self.path.split("/")[-1]
-            schedules_payload = load_schedules()
-            schedules = schedules_payload.get("schedules", [])
-            schedules = [schedule for schedule in schedules if schedule.get("id") != schedule_id]
-            schedules_payload["schedules"] = schedules
-            save_json(SCHEDULES_PATH, schedules_payload)
+
+            def delete_schedule(schedules_payload: dict) -> None:
+                schedules = schedules_payload.get("schedules", [])
+                schedules_payload["schedules"] = [
+                    schedule for schedule in schedules if schedule.get("id") != schedule_id
+                ]
+                schedule_index.remove(schedule_id)
+
+            schedule_store.update(delete_schedule)
+            scheduler.reschedule(schedule_id)
             self._send_json({"status": "deleted"})
             return
         self.send_error(404)
 
 
+class DeferredSendfile:
+    """Stands in for the socket so a file body can be streamed by the event loop."""
+
+    def __init__(self) -> None:
+        self.body: Optional[tuple[Any, int, Optional[int]]] = None
+
+    def sendfile(self, file: Any, offset: int = 0, count: Optional[int] = None) -> None:
+        # The handler closes its file on return; keep a duplicate descriptor open.
+        self.body = (os.fdopen(os.dup(file.fileno()), "rb"), offset, count)
+
+
+class BufferedShiftHandler(ShiftHandler):
+    """ShiftHandler run once against a fully read request.
+
+    The response head and small bodies are collected in ``wfile``; recording
+    downloads are left in ``connection.body`` for the event loop to stream.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, request: bytes, client_address: tuple) -> None:
+        self.client_address = client_address
+        self.rfile = io.BytesIO(request)
+        self.wfile = io.BytesIO()
+        self.connection = DeferredSendfile()
+        self.close_connection = True
+        self.handle_one_request()
+
+
+class AsyncHttpServer:
+    """Asyncio front end serving ShiftHandler's routes.
+
+    Idle keep-alive connections and slow downloads cost a coroutine rather
+    than a thread: request handling runs on a small executor and recording
+    bodies are streamed with ``loop.sendfile``, which waits for the client to
+    drain. Connections beyond ``max_connections`` get a 503.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = ASYNC_MAX_CONNECTIONS,
+        handler_threads: int = ASYNC_HANDLER_THREADS,
+    ) -> None:
+        self.max_connections = max_connections
+        self.executor = ThreadPoolExecutor(max_workers=handler_threads)
+        self.connections = 0
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._handle_client, host, port, limit=ASYNC_MAX_HEADER_BYTES)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            if self.connections >= self.max_connections:
+                writer.write(
+                    b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n"
+                    b"Retry-After: 5\r\nConnection: close\r\n\r\n"
+                )
+                await writer.drain()
+                return
+            self.connections += 1
+            try:
+                await self._serve_connection(reader, writer)
+            finally:
+                self.connections -= 1
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            # A client may vanish mid-close, and at shutdown the loop may already be closed.
+            with contextlib.suppress(ConnectionError, RuntimeError):
+                writer.close()
+                await writer.wait_closed()
+
+    async def _reject(self, writer: asyncio.StreamWriter, status: str) -> None:
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        peer = writer.get_extra_info("peername") or ("", 0)
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), ASYNC_KEEPALIVE_SEC)
+            except asyncio.IncompleteReadError:
+                return
+            except asyncio.LimitOverrunError:
+                await self._reject(writer, "431 Request Header Fields Too Large")
+                return
+            headers = http.client.parse_headers(io.BytesIO(head.split(b"\r\n", 1)[1]))
+            try:
+                length = int(headers.get("Content-Length", 0))
+            except ValueError:
+                length = -1
+            if length < 0 or length > ASYNC_MAX_BODY_BYTES:
+                await self._reject(writer, "413 Content Too Large" if length > 0 else "400 Bad Request")
+                return
+            body = await reader.readexactly(length) if length else b""
+            handler = await loop.run_in_executor(self.executor, BufferedShiftHandler, head + body, peer)
+            file_body = handler.connection.body
+            try:
+                writer.write(handler.wfile.getvalue())
+                await writer.drain()
+                if file_body is not None:
+                    file, offset, count = file_body
+                    await loop.sendfile(writer.transport, file, offset, count)
+            finally:
+                if file_body is not None:
+                    file_body[0].close()
+            if handler.close_connection:
+                return
+
+
+def serve_async(host: str, port: int, config: dict) -> None:
+    front_end = AsyncHttpServer(
+        max_connections=int(config.get("http_max_connections", ASYNC_MAX_CONNECTIONS))
+    )
+
+    async def run() -> None:
+        server = await front_end.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
 def main() -> None:
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     load_config()
     load_schedules()
     RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
-    if not RSS_PATH.exists():
-        generate_rss(load_config())
-    scheduler = threading.Thread(target=scheduler_loop, daemon=True)
-    scheduler.start()
-    server = ThreadingHTTPServer(("0.0.0.0", 8000), ShiftHandler)
+    tuner_pool.configure(load_config())
+    scheduler.configure(load_config())
+    timeshift_buffer.configure(load_config())
+    encode_queue.resume(load_config())
+    retention.configure(load_config())
+    interrupted = recover_recordings(load_config())
+    threading.Thread(target=scheduler_loop, daemon=True).start()
+    # The feed is served from rss.xml as it stands until the archive is reconciled.
+    threading.Thread(target=reconcile_archive, args=(interrupted, load_config()), daemon=True).start()
+    retention.start()
     print("shiftFM web UI running on port 8000")
+    config = load_config()
+    if config.get("http_server") == "asyncio":
+        serve_async("0.0.0.0", 8000, config)
+        return
+    server = ThreadingHTTPServer(("0.0.0.0", 8000), ShiftHandler)
     server.serve_forever()
 
 
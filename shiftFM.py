@@ -1,8 +1,19 @@
 import argparse
+import json
+import os
 import re
 import subprocess
-from datetime import datetime
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
+
+IQ_SUFFIXES = {".iq", ".cu8", ".bin"}
+PCM_SUFFIXES = {".pcm", ".raw", ".s16"}
+BATCH_BLOCK_SEC = 0.5
+PCM_READ_CHUNK = 1024 * 1024
 
 
 def sanitize_name(value: str) -> str:
@@ -56,7 +67,215 @@ def record_station(frequency_mhz: float, duration_sec: int, name: str, output_di
     return output_path
 
 
+def load_manifest(path: Path) -> list[dict]:
+    """Entries of a JSON manifest, ``{"files": [...]}``, with paths made relative to it."""
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    entries = payload.get("files", []) if isinstance(payload, dict) else payload
+    return [dict(entry, path=str(path.parent / entry["path"])) for entry in entries]
+
+
+def scan_directory(directory: Path) -> list[dict]:
+    """One entry per IQ/PCM file; station and start time come from ``generate_filename``-style names."""
+    return [
+        {"path": str(path)}
+        for path in sorted(directory.iterdir())
+        if path.is_file() and path.suffix.lower() in IQ_SUFFIXES | PCM_SUFFIXES
+    ]
+
+
+def plan_job(entry: dict, defaults: argparse.Namespace) -> dict:
+    """Fill in an entry's format, rates, station and start time, and name its recording."""
+    import server
+
+    path = Path(entry["path"])
+    parsed = server.parse_recording_name(path.name)
+    job_format = entry.get("format") or ("iq" if path.suffix.lower() in IQ_SUFFIXES else "pcm")
+    if job_format not in ("iq", "pcm"):
+        raise ValueError(f"{path}: format must be iq or pcm")
+    frequency_mhz = entry.get("frequency_mhz", parsed["frequency_mhz"])
+    if frequency_mhz is None:
+        raise ValueError(f"{path}: no frequency_mhz in the manifest or the file name")
+    started_at = entry.get("started_at") or parsed["started_at"]
+    if started_at:
+        started = datetime.fromisoformat(started_at)
+    else:
+        started = datetime.fromtimestamp(path.stat().st_mtime)
+    offset_sec = float(entry.get("offset_sec", 0))
+    starts_at = started + timedelta(seconds=offset_sec)
+    job = {
+        "path": str(path),
+        "format": job_format,
+        "frequency_mhz": float(frequency_mhz),
+        "offset_sec": offset_sec,
+        "duration_sec": entry.get("duration_sec"),
+    }
+    if job_format == "iq":
+        job["sample_rate"] = int(entry.get("sample_rate", defaults.sample_rate))
+        job["center_mhz"] = float(
+            entry.get("center_mhz", job["frequency_mhz"] + defaults.tuning_offset_mhz)
+        )
+    else:
+        job["sample_rate"] = int(entry.get("sample_rate", defaults.pcm_rate))
+        job["channels"] = int(entry.get("channels", defaults.pcm_channels))
+    name = entry.get("name") or parsed["program"]
+    job["output"] = server.generate_filename(name, job["frequency_mhz"], starts_at)
+    job["started_ts"] = starts_at.timestamp()
+    return job
+
+
+def read_span(source, start: int, length: Optional[int], chunk_size: int):
+    """Yield ``length`` bytes (or everything) from ``start`` in chunks of at most ``chunk_size``."""
+    source.seek(start)
+    while length is None or length > 0:
+        data = source.read(chunk_size if length is None else min(chunk_size, length))
+        if not data:
+            return
+        if length is not None:
+            length -= len(data)
+        yield data
+
+
+def batch_job(job: dict, config: dict) -> dict:
+    """Demodulate (IQ) or pass through (PCM) one entry into its MP3 in RECORDINGS_DIR.
+
+    Runs in a worker process. The input is streamed in blocks of about
+    BATCH_BLOCK_SEC, so memory use does not depend on the file size.
+    """
+    import server
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    output_path = server.RECORDINGS_DIR / job["output"]
+    duration_sec = job["duration_sec"]
+    if job["format"] == "iq":
+        dsp = server.load_dsp()
+        tuning_offset_hz = (job["center_mhz"] - job["frequency_mhz"]) * 1e6
+        demodulator = dsp.WbfmDemodulator(
+            job["sample_rate"],
+            tuning_offset_hz,
+            deemphasis_tau=float(config.get("deemphasis_us", server.DEEMPHASIS_US)) * 1e-6,
+        )
+        if not demodulator.channelizer.fits(0.0):
+            raise ValueError(f"{job['path']}: {job['frequency_mhz']} MHz is outside the capture")
+        rate, channels, frame = demodulator.audio_rate, 1, 2 * demodulator.block_multiple
+        block = 2 * int(job["sample_rate"] * BATCH_BLOCK_SEC)
+        block -= block % frame
+        byte_rate = 2 * job["sample_rate"]
+    else:
+        rate, channels = job["sample_rate"], job["channels"]
+        frame = 2 * channels
+        block = PCM_READ_CHUNK - PCM_READ_CHUNK % frame
+        byte_rate = rate * frame
+    start = int(job["offset_sec"] * byte_rate)
+    length = None if duration_sec is None else int(float(duration_sec) * byte_rate)
+    input_bytes = 0
+    audio_bytes = 0
+    # Offline jobs bypass live playback, which would publish feed entries from every worker.
+    encoder = server.open_encoder(output_path, rate, channels, dict(config, live_playback=False))
+    try:
+        with open(job["path"], "rb") as source:
+            for data in read_span(source, start - start % frame, length, block):
+                data = data[: len(data) - len(data) % frame]
+                if not data:
+                    break
+                input_bytes += len(data)
+                pcm = demodulator.process(data).tobytes() if job["format"] == "iq" else data
+                encoder.write(pcm)
+                audio_bytes += len(pcm)
+    finally:
+        returncode = encoder.close()
+    if returncode != 0:
+        raise RuntimeError(f"{job['path']}: ffmpeg exited with status {returncode}")
+    audio_sec = audio_bytes / (rate * channels * 2)
+    os.utime(output_path, (time.time(), job["started_ts"] + audio_sec))
+    wall = time.perf_counter() - wall_start
+    return {
+        "path": job["path"],
+        "output": job["output"],
+        "input_bytes": input_bytes,
+        "audio_sec": round(audio_sec, 2),
+        "wall_sec": round(wall, 3),
+        "cpu_sec": round(time.process_time() - cpu_start, 3),
+        "realtime_factor": round(audio_sec / wall, 1) if wall else None,
+        "input_mb_per_sec": round(input_bytes / wall / 1e6, 2) if wall else None,
+    }
+
+
+def run_batch(jobs: list[dict], config: dict, workers: Optional[int] = None) -> tuple[list[dict], list[str]]:
+    """Run jobs across a process pool, then add their recordings to the catalog in one pass."""
+    import server
+
+    results, errors = [], []
+    server.RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = {pool.submit(batch_job, job, config): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:
+                errors.append(f"{futures[future]['path']}: {exc}")
+                continue
+            results.append(result)
+            print(
+                f"{result['output']}: {result['audio_sec']:.0f} s of audio in {result['wall_sec']:.1f} s "
+                f"({result['realtime_factor']}x realtime, {result['input_mb_per_sec']} MB/s in)"
+            )
+    if results:
+        server.get_catalog().sync()
+        server.generate_rss(config)
+    return results, errors
+
+
+def batch_main(argv: list[str]) -> None:
+    import server
+
+    parser = argparse.ArgumentParser(
+        prog="shiftFM.py batch", description="Demodulate and encode IQ/PCM captures into the archive."
+    )
+    parser.add_argument("source", type=Path, help="JSON manifest, or a directory of .iq/.pcm files")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU cores)")
+    parser.add_argument(
+        "--sample-rate", type=int, default=server.INPROCESS_SAMPLE_RATE, help="IQ sample rate"
+    )
+    parser.add_argument(
+        "--tuning-offset-mhz",
+        type=float,
+        default=server.INPROCESS_TUNING_OFFSET_MHZ,
+        help="How far above the station IQ files were tuned",
+    )
+    parser.add_argument("--pcm-rate", type=int, default=server.RTL_FM_PCM_RATE, help="PCM sample rate")
+    parser.add_argument("--pcm-channels", type=int, default=server.RTL_FM_PCM_CHANNELS)
+    args = parser.parse_args(argv)
+
+    entries = scan_directory(args.source) if args.source.is_dir() else load_manifest(args.source)
+    jobs, errors, outputs = [], [], set()
+    for entry in entries:
+        try:
+            job = plan_job(entry, args)
+        except (KeyError, ValueError, OSError) as exc:
+            errors.append(f"{entry.get('path')}: {exc}")
+            continue
+        if job["output"] in outputs or (server.RECORDINGS_DIR / job["output"]).exists():
+            errors.append(f"{job['path']}: {job['output']} already exists")
+            continue
+        outputs.add(job["output"])
+        jobs.append(job)
+    started = time.perf_counter()
+    results, failures = run_batch(jobs, server.load_config(), args.jobs)
+    errors += failures
+    elapsed = time.perf_counter() - started
+    audio_sec = sum(result["audio_sec"] for result in results)
+    print(f"{len(results)} recordings, {audio_sec / 3600:.1f} h of audio in {elapsed:.1f} s")
+    for error in errors:
+        print(f"error: {error}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+
 def main() -> None:
+    if sys.argv[1:2] == ["batch"]:
+        batch_main(sys.argv[2:])
+        return
     parser = argparse.ArgumentParser(description="Record and time-shift FM radio.")
     parser.add_argument("frequency_mhz", type=float, help="Frequency in MHz")
     parser.add_argument("duration_sec", type=int, help="Recording duration in seconds")
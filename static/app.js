@@ -180,26 +180,6 @@ const formatTime = (value) => {
   return `${hour12}:${minute} ${period}`;
 };
 
-const parseDuration = (value) => {
-  if (!value) {
-    return null;
-  }
-  const parts = value.split(":").map((part) => Number(part));
-  if (parts.some((part) => Number.isNaN(part))) {
-    return null;
-  }
-  if (parts.length === 3) {
-    return parts[0] * 3600 + parts[1] * 60 + parts[2];
-  }
-  if (parts.length === 2) {
-    return parts[0] * 60 + parts[1];
-  }
-  if (parts.length === 1) {
-    return parts[0];
-  }
-  return null;
-};
-
 const formatTimeRange = (timeRaw, durationSec) => {
   const start = formatTime(timeRaw);
   if (!durationSec) {
@@ -254,21 +234,30 @@ const renderRecordings = (items) => {
 };
 
 
-const loadRecordings = async () => {
-  const response = await fetch("/rss.xml");
-  if (!response.ok) {
+let loadedRecordings = [];
+
+const loadRecordings = async (cursor = null) => {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  let page;
+  try {
+    page = await request(`/api/recordings${query}`);
+  } catch (error) {
     renderRecordings([]);
     return;
   }
-  const text = await response.text();
-  const doc = new DOMParser().parseFromString(text, "text/xml");
-  const items = Array.from(doc.querySelectorAll("item")).map((item) => ({
-    title: item.querySelector("title")?.textContent || "",
-    pubDate: item.querySelector("pubDate")?.textContent || "",
-    url: item.querySelector("enclosure")?.getAttribute("url") || "",
-    duration: parseDuration(item.getElementsByTagName("itunes:duration")[0]?.textContent || ""),
+  const items = page.recordings.map((entry) => ({
+    url: entry.url,
+    duration: entry.duration_sec,
   }));
-  renderRecordings(items);
+  loadedRecordings = cursor ? loadedRecordings.concat(items) : items;
+  renderRecordings(loadedRecordings);
+  if (page.next_cursor) {
+    const more = document.createElement("button");
+    more.className = "ghost";
+    more.textContent = "Load more";
+    more.addEventListener("click", () => loadRecordings(page.next_cursor));
+    recordingsList.appendChild(more);
+  }
 };
 
 copyRss.addEventListener("click", async () => {
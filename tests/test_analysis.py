@@ -0,0 +1,115 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RATE = server.RTL_FM_PCM_RATE
+CHANNELS = server.RTL_FM_PCM_CHANNELS
+
+
+def tone(seconds: float, amplitude: float = 0.3) -> bytes:
+    t = np.arange(int(RATE * seconds)) / RATE
+    mono = (amplitude * 32767 * np.sin(2 * np.pi * 440 * t)).astype("<i2")
+    return np.repeat(mono, CHANNELS).tobytes()
+
+
+def silence(seconds: float) -> bytes:
+    return bytes(int(RATE * seconds) * 2 * CHANNELS)
+
+
+def static(seconds: float) -> bytes:
+    mono = np.random.default_rng(1).integers(-8000, 8000, int(RATE * seconds)).astype("<i2")
+    return np.repeat(mono, CHANNELS).tobytes()
+
+
+class ClosingSink:
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.closed = False
+
+    def write(self, data) -> None:
+        self.data += data
+
+    def close(self) -> int:
+        self.closed = True
+        return 0
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestPcmWindowLevels(unittest.TestCase):
+    def test_tone_silence_and_static(self) -> None:
+        import dsp
+
+        rms, peak, zcr = dsp.pcm_window_levels(tone(1) + silence(1) + static(1), CHANNELS, RATE)
+        self.assertEqual(len(rms), 3)
+        self.assertAlmostEqual(float(rms[0]), 0.3 / np.sqrt(2), places=2)
+        self.assertAlmostEqual(float(peak[0]), 0.3, places=2)
+        self.assertEqual(float(rms[1]), 0.0)
+        self.assertLess(float(zcr[0]), 0.1)
+        self.assertGreater(float(zcr[2]), server.STATIC_ZCR)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestAnalysisSink(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+
+    def test_report_has_duration_levels_and_chapters(self) -> None:
+        inner = ClosingSink()
+        report_path = self.root / "show.analysis.json"
+        sink = server.AnalysisSink(inner, RATE, CHANNELS, report_path, {})
+        stream = tone(3) + silence(3) + tone(2.5)
+        for offset in range(0, len(stream), 6000):
+            sink.write(memoryview(stream)[offset : offset + 6000])
+        sink.close()
+        self.assertTrue(inner.closed)
+        self.assertEqual(bytes(inner.data), stream)
+        report = json.loads(report_path.read_text())
+        self.assertEqual(report["duration_sec"], 8.5)
+        self.assertEqual(report["silences"], [[3.0, 6.0]])
+        self.assertEqual(report["chapters"], [0.0, 6.0])
+        self.assertAlmostEqual(report["dead_air_pct"], 100 * 3 / 9, places=1)
+        self.assertAlmostEqual(report["peak_dbfs"], -10.5, delta=0.2)
+        self.assertFalse(report["aborted_dead_air"])
+
+    def test_dead_air_aborts_trimmed_capture(self) -> None:
+        inner = ClosingSink()
+        sink = server.AnalysisSink(inner, RATE, CHANNELS, self.root / "x.analysis.json", {}, abort_sec=2)
+        with mock.patch.object(server, "capture_latencies", []):
+            trimmed = server.TrimmedSink(sink, RATE, CHANNELS, time.time() - 10, 60, "show")
+            trimmed.write(tone(1))
+            trimmed.write(static(1))
+            self.assertFalse(trimmed.done.is_set())
+            trimmed.write(silence(1))
+        self.assertTrue(sink.aborted)
+        self.assertTrue(trimmed.done.is_set())
+
+    def test_catalog_takes_duration_from_sidecar(self) -> None:
+        recording = self.root / "Show_96.1_2024-01-01_0800.mp3"
+        recording.write_bytes(b"mp3")
+        server.save_json(
+            server.analysis_path(recording.name, self.root),
+            {"duration_sec": 3599.7, "dead_air_pct": 1.5, "chapters": [0.0, 1200.0]},
+        )
+        catalog = server.RecordingCatalog(self.root / "catalog.jsonl", self.root)
+        with mock.patch.object(server, "get_duration_seconds", side_effect=AssertionError("probed")):
+            entry = catalog.add(recording)
+        self.assertEqual(entry["duration_sec"], 3599)
+        self.assertEqual(entry["chapters"], [0.0, 1200.0])
+        item = server.render_rss_item(entry, "http://radio")
+        self.assertIn('<psc:chapter start="00:20:00.000" title="Part 2" />', item)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import http.client
+import json
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class TestAsyncHttpServer(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        recordings_dir = Path(self._tmp.name)
+        self.payload = bytes(range(256)) * 512
+        (recordings_dir / "show_96.1_2024-01-01_1200.mp3").write_bytes(self.payload)
+        for patcher in (
+            mock.patch.object(server, "RECORDINGS_DIR", recordings_dir),
+            mock.patch.object(server, "load_config", return_value={"capture_mode": "single"}),
+            mock.patch.object(server.ShiftHandler, "log_message"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.front_end = server.AsyncHttpServer(max_connections=2)
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(self.loop)
+            self.httpd = self.loop.run_until_complete(self.front_end.start("127.0.0.1", 0))
+            started.set()
+            self.loop.run_forever()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        started.wait(5)
+        self.port = self.httpd.sockets[0].getsockname()[1]
+
+        def stop() -> None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            thread.join(5)
+            self.httpd.close()
+            self.loop.close()
+
+        self.addCleanup(stop)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        self.addCleanup(conn.close)
+        return conn
+
+    def test_keep_alive_serves_several_requests(self) -> None:
+        conn = self._connect()
+        conn.request("GET", "/api/config")
+        response = conn.getresponse()
+        self.assertEqual(json.loads(response.read()), {"capture_mode": "single"})
+        conn.request("GET", "/recordings/show_96.1_2024-01-01_1200.mp3", headers={"Range": "bytes=10-19"})
+        response = conn.getresponse()
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.read(), self.payload[10:20])
+        conn.request("GET", "/recordings/show_96.1_2024-01-01_1200.mp3")
+        response = conn.getresponse()
+        self.assertEqual(response.read(), self.payload)
+        conn.request("GET", "/missing")
+        self.assertEqual(conn.getresponse().status, 404)
+
+    def test_connection_limit(self) -> None:
+        idle = [socket.create_connection(("127.0.0.1", self.port)) for _ in range(2)]
+        for sock in idle:
+            self.addCleanup(sock.close)
+        conn = self._connect()
+        conn.request("GET", "/api/config")
+        self.assertEqual(conn.getresponse().status, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
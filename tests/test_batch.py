@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+import shiftFM
+
+try:
+    import numpy as np
+
+    import dsp
+except ImportError:  # numpy is optional outside wideband mode
+    np = None
+
+STUBS_DIR = Path(__file__).resolve().parent.parent / "scripts" / "stubs"
+DEFAULTS = argparse.Namespace(sample_rate=1_200_000, tuning_offset_mhz=0.25, pcm_rate=16_000, pcm_channels=2)
+
+
+def tone_pcm(seconds: float) -> bytes:
+    return struct.pack("<h", 4000) * 2 * int(16_000 * seconds)
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.captures = self.root / "captures"
+        self.captures.mkdir()
+        patches = {
+            "RECORDINGS_DIR": self.root / "recordings",
+            "CATALOG_PATH": self.root / "recordings.jsonl",
+            "RSS_PATH": self.root / "rss.xml",
+            "LIVE_DIR": self.root / "live",
+            "feed_cache": server.FeedCache(),
+            "program_feeds": {},
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        path = mock.patch.dict(os.environ, {"PATH": os.pathsep.join([str(STUBS_DIR), os.environ["PATH"]])})
+        path.start()
+        self.addCleanup(path.stop)
+        self.config = {"base_url": "http://radio.test"}
+
+    def test_manifest_entries_are_split_named_and_catalogued(self) -> None:
+        (self.captures / "field.pcm").write_bytes(tone_pcm(4))
+        manifest = self.root / "manifest.json"
+        station = {"path": "captures/field.pcm", "frequency_mhz": 96.1, "started_at": "2024-03-01T08:00"}
+        files = [
+            dict(station, name="News", duration_sec=1.5),
+            dict(station, name="Jazz", offset_sec=120, duration_sec=60),
+        ]
+        manifest.write_text(json.dumps({"files": files}))
+        jobs = [shiftFM.plan_job(entry, DEFAULTS) for entry in shiftFM.load_manifest(manifest)]
+        expected = ["News_96.1_2024-03-01_0800.mp3", "Jazz_96.1_2024-03-01_0802.mp3"]
+        self.assertEqual([job["output"] for job in jobs], expected)
+        jobs[1]["offset_sec"] = 2
+        results, errors = shiftFM.run_batch(jobs, self.config, workers=2)
+        self.assertEqual(errors, [])
+        by_name = {result["output"]: result for result in results}
+        self.assertEqual(by_name["News_96.1_2024-03-01_0800.mp3"]["audio_sec"], 1.5)
+        self.assertEqual(by_name["Jazz_96.1_2024-03-01_0802.mp3"]["audio_sec"], 2.0)
+        names = [entry["name"] for entry in server.get_catalog().recordings()]
+        self.assertEqual(names, ["Jazz_96.1_2024-03-01_0802.mp3", "News_96.1_2024-03-01_0800.mp3"])
+        self.assertIn("Jazz_96.1_2024-03-01_0802.mp3", server.RSS_PATH.read_text())
+
+    def test_directory_names_give_station_and_start(self) -> None:
+        (self.captures / "Drive_101.5_2024-03-01_1700.pcm").write_bytes(b"")
+        (self.captures / "notes.txt").write_text("ignored")
+        jobs = [shiftFM.plan_job(entry, DEFAULTS) for entry in shiftFM.scan_directory(self.captures)]
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0]["output"], "Drive_101.5_2024-03-01_1700.mp3")
+        self.assertEqual((jobs[0]["sample_rate"], jobs[0]["channels"]), (16_000, 2))
+
+    def test_live_playback_is_ignored_offline(self) -> None:
+        (self.captures / "Drive_101.5_2024-03-01_1700.pcm").write_bytes(tone_pcm(1))
+        jobs = [shiftFM.plan_job(entry, DEFAULTS) for entry in shiftFM.scan_directory(self.captures)]
+        results, errors = shiftFM.run_batch(jobs, dict(self.config, live_playback=True), workers=1)
+        self.assertEqual(errors, [])
+        self.assertTrue((server.RECORDINGS_DIR / "Drive_101.5_2024-03-01_1700.mp3").exists())
+        self.assertFalse(server.LIVE_DIR.exists())
+        self.assertNotIn("(live)", server.RSS_PATH.read_text())
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_iq_file_is_demodulated(self) -> None:
+        sample_rate = 1_200_000
+        iq = dsp.synthetic_iq(sample_rate, 1.0, [-250_000])
+        (self.captures / "Talk_96.1_2024-03-01_0900.iq").write_bytes(iq)
+        jobs = [shiftFM.plan_job(entry, DEFAULTS) for entry in shiftFM.scan_directory(self.captures)]
+        results, errors = shiftFM.run_batch(jobs, self.config, workers=1)
+        self.assertEqual(errors, [])
+        self.assertAlmostEqual(results[0]["audio_sec"], 1.0, delta=0.01)
+        self.assertTrue((server.RECORDINGS_DIR / "Talk_96.1_2024-03-01_0900.mp3").exists())
+        report = server.load_analysis("Talk_96.1_2024-03-01_0900.mp3")
+        self.assertAlmostEqual(report["duration_sec"], 1.0, delta=0.01)
+        self.assertLess(report["dead_air_pct"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
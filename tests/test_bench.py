@@ -0,0 +1,50 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import bench
+import server
+
+
+class TestBench(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+
+    def test_sandbox_restores_server_state(self) -> None:
+        recordings_dir, store = server.RECORDINGS_DIR, server.schedule_store
+        with bench.sandbox(self.root / "run"):
+            self.assertEqual(server.RECORDINGS_DIR, self.root / "run" / "recordings")
+        self.assertIs(server.RECORDINGS_DIR, recordings_dir)
+        self.assertIs(server.schedule_store, store)
+
+    def test_feeds_and_http_on_a_small_archive(self) -> None:
+        root = self.root / "archive"
+        names = bench.make_archive(root / "recordings", 30)
+        feeds = bench.bench_feeds(root, names)
+        self.assertEqual(feeds["recordings"], 30)
+        self.assertEqual((root / "rss.xml").read_text().count("<item>"), 30)
+        result = bench.bench_http(root, names, clients=2, seconds=0.3, http_server="threaded")
+        self.assertEqual(result["errors"], 0)
+        self.assertGreater(result["routes"]["/rss.xml"]["requests"], 0)
+        self.assertLessEqual(result["routes"]["/api/recordings"]["p50_ms"], result["p99_ms"])
+
+    def test_stub_capture_records_the_requested_length(self) -> None:
+        result = bench.bench_capture(self.root / "capture", captures=2, duration_sec=4, speed=40)
+        self.assertEqual(result["recordings"], 2)
+        mp3 = sorted((self.root / "capture" / "recordings").glob("Bench-*.mp3"))
+        self.assertEqual([path.stat().st_size for path in mp3], [4 * bench.ENCODED_BYTES_PER_SEC] * 2)
+
+    def test_compare_flags_regressions_in_the_right_direction(self) -> None:
+        before = {"http": [{"recordings": 10, "p99_ms": 10.0, "throughput_rps": 100.0}]}
+        after = {"http": [{"recordings": 10, "p99_ms": 10.5, "throughput_rps": 80.0}]}
+        rows = {row[0]: row for row in bench.compare(before, after)}
+        self.assertFalse(rows["http[recordings=10].p99_ms"][4])
+        self.assertTrue(rows["http[recordings=10].throughput_rps"][4])
+        json.dumps(rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import contextlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+
+RATE = 500
+CHANNELS = 2
+BYTE_RATE = RATE * CHANNELS * 2
+
+
+class FakeRtlFm:
+    """Writes ``seconds`` of non-zero PCM in real time, then stalls (``hang``) or exits."""
+
+    def __init__(self, seconds: float, hang: bool) -> None:
+        read_fd, self.write_fd = os.pipe()
+        self.stdout = os.fdopen(read_fd, "rb", buffering=0)
+        self.returncode = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(seconds, hang), daemon=True)
+        self.thread.start()
+
+    def _run(self, seconds: float, hang: bool) -> None:
+        chunk = b"\x01\x00" * (BYTE_RATE // 20 // 2)
+        started = time.monotonic()
+        sent = 0
+        with contextlib.suppress(OSError):
+            while sent < seconds * 20 and not self.stopped.is_set():
+                os.write(self.write_fd, chunk)
+                sent += 1
+                time.sleep(max(0.0, started + sent / 20 - time.monotonic()))
+            if hang:
+                self.stopped.wait()
+        os.close(self.write_fd)
+
+    def terminate(self) -> None:
+        self.stopped.set()
+
+    def kill(self) -> None:
+        self.stopped.set()
+
+    def wait(self, timeout=None) -> int:
+        self.thread.join(timeout)
+        self.returncode = -15
+        return self.returncode
+
+
+class CollectingSink:
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def write(self, data) -> None:
+        self.data += data
+
+
+class TestSupervisedCapture(unittest.TestCase):
+    def setUp(self) -> None:
+        for name, value in {"CAPTURE_START_GRACE_SEC": 0.2, "CAPTURE_RESTART_DELAY_SEC": 0.05}.items():
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(server, "capture_latencies", [])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _capture(self, processes: list, duration_sec: int) -> tuple[CollectingSink, int, float]:
+        inner = CollectingSink()
+        sink = server.TrimmedSink(inner, RATE, CHANNELS, time.time(), duration_sec, "show")
+        queue = iter(processes)
+        with mock.patch.object(server, "start_rtl_fm", lambda frequency, device: next(queue)()):
+            restarts, lost_sec = server.supervise_rtl_fm(96.1, None, sink, {"capture_stall_sec": 0.3})
+        return inner, restarts, lost_sec
+
+    def test_stall_is_bridged_with_silence_and_capture_resumes(self) -> None:
+        inner, restarts, lost_sec = self._capture(
+            [lambda: FakeRtlFm(0.5, hang=True), lambda: FakeRtlFm(5, hang=True)], 2
+        )
+        self.assertEqual(restarts, 1)
+        self.assertEqual(len(inner.data), 2 * BYTE_RATE)
+        self.assertGreater(lost_sec, 0.2)
+        self.assertLess(lost_sec, 1.0)
+        gap_start = inner.data.index(bytes(8))
+        self.assertAlmostEqual(gap_start / BYTE_RATE, 0.5, delta=0.15)
+        self.assertTrue(inner.data.endswith(b"\x01\x00" * 8))
+
+    def test_dead_tuner_is_filled_to_the_scheduled_end(self) -> None:
+        dead = [lambda: FakeRtlFm(0, hang=False)] * 100
+        started = time.monotonic()
+        inner, restarts, lost_sec = self._capture(dead, 1)
+        self.assertLess(time.monotonic() - started, 3)
+        # Backing off from 0.05 s, a second allows about five attempts rather than twenty.
+        self.assertGreater(restarts, 1)
+        self.assertLessEqual(restarts, 6)
+        self.assertEqual(bytes(inner.data), bytes(BYTE_RATE))
+        self.assertAlmostEqual(lost_sec, 1.0)
+
+    def test_faults_are_recorded_in_the_sidecar_and_catalog(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            recording = root / "Show_96.1_2024-01-01_0800.mp3"
+            recording.write_bytes(b"mp3")
+            server.save_json(server.analysis_path(recording.name, root), {"duration_sec": 60.0})
+            with mock.patch.object(server, "RECORDINGS_DIR", root):
+                server.note_capture_faults(recording, 2, 4.25)
+            entry = server.RecordingCatalog(root / "catalog.jsonl", root).add(recording)
+        self.assertEqual((entry["duration_sec"], entry["capture_restarts"], entry["lost_sec"]), (60, 2, 4.2))
+
+
+if __name__ == "__main__":
+    unittest.main()
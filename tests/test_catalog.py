@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class TestRecordingCatalog(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self._tmp.name)
+        self.recordings_dir = self.base_dir / "recordings"
+        self.recordings_dir.mkdir()
+        self.catalog_path = self.base_dir / "recordings.jsonl"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_probes_each_file_once(self) -> None:
+        (self.recordings_dir / "news_99.5_2024-01-02_1200.mp3").write_bytes(b"fake mp3 data")
+        catalog = server.RecordingCatalog(self.catalog_path, self.recordings_dir)
+        with mock.patch.object(server, "get_duration_seconds", return_value=1800) as probe:
+            self.assertTrue(catalog.sync())
+            self.assertFalse(catalog.sync())
+            reloaded = server.RecordingCatalog(self.catalog_path, self.recordings_dir)
+            self.assertFalse(reloaded.sync())
+        self.assertEqual(probe.call_count, 1)
+        entry = reloaded.recordings()[0]
+        self.assertEqual(entry["program"], "news")
+        self.assertEqual(entry["frequency_mhz"], 99.5)
+        self.assertEqual(entry["started_at"], "2024-01-02T12:00")
+        self.assertEqual(entry["duration_sec"], 1800)
+
+    def test_reprobes_changed_and_drops_deleted_files(self) -> None:
+        path = self.recordings_dir / "show_101.1_2024-01-01_1200.mp3"
+        path.write_bytes(b"short")
+        catalog = server.RecordingCatalog(self.catalog_path, self.recordings_dir)
+        with mock.patch.object(server, "get_duration_seconds", return_value=60) as probe:
+            catalog.sync()
+            path.write_bytes(b"a much longer recording")
+            catalog.sync()
+            self.assertEqual(probe.call_count, 2)
+            self.assertEqual(catalog.recordings()[0]["size"], len(b"a much longer recording"))
+            path.unlink()
+            self.assertTrue(catalog.sync())
+        self.assertEqual(catalog.recordings(), [])
+        reloaded = server.RecordingCatalog(self.catalog_path, self.recordings_dir)
+        self.assertEqual(reloaded.recordings(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
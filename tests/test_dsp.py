@@ -0,0 +1,60 @@
+import unittest
+
+try:
+    import numpy as np
+
+    import dsp
+except ImportError:  # numpy is optional outside wideband mode
+    np = None
+
+
+def dominant_frequency(pcm: np.ndarray, sample_rate: int) -> float:
+    spectrum = np.abs(np.fft.rfft(pcm.astype(np.float64)))
+    return float(np.fft.rfftfreq(len(pcm), 1 / sample_rate)[spectrum.argmax()])
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestChannelizer(unittest.TestCase):
+    def test_separates_two_stations_in_blocks(self) -> None:
+        sample_rate = 2_400_000
+        raw = dsp.synthetic_iq(sample_rate, 0.5, [300_000, -500_000])
+        channelizer = dsp.Channelizer(sample_rate, 100e6)
+        first = channelizer.add_channel(100.3e6)
+        second = channelizer.add_channel(99.5e6)
+        outputs = {first: [], second: []}
+        block_bytes = 2 * 120_000
+        for offset in range(0, len(raw), block_bytes):
+            for channel_id, pcm in channelizer.process(dsp.iq_from_u8(raw[offset : offset + block_bytes])).items():
+                outputs[channel_id].append(pcm.copy())
+        first_pcm = np.concatenate(outputs[first])
+        second_pcm = np.concatenate(outputs[second])
+        self.assertEqual(len(first_pcm), channelizer.audio_rate // 2)
+        self.assertAlmostEqual(dominant_frequency(first_pcm[2400:], channelizer.audio_rate), 1000, delta=5)
+        self.assertAlmostEqual(dominant_frequency(second_pcm[2400:], channelizer.audio_rate), 2000, delta=5)
+
+    def test_streaming_demodulator_matches_block_size_independently(self) -> None:
+        demodulator = dsp.WbfmDemodulator(1_200_000)
+        raw = dsp.synthetic_iq(1_200_000, 0.5, [-demodulator.tuning_offset_hz])
+        chunks = []
+        for offset in range(0, len(raw), 2 * 60_000):
+            chunks.append(demodulator.process(raw[offset : offset + 2 * 60_000]).copy())
+        pcm = np.concatenate(chunks)
+        self.assertEqual(len(pcm), demodulator.audio_rate // 2)
+        self.assertAlmostEqual(dominant_frequency(pcm[2400:], demodulator.audio_rate), 1000, delta=5)
+
+        whole = dsp.WbfmDemodulator(1_200_000).process(raw)
+        np.testing.assert_allclose(whole, pcm, atol=2)
+
+    def test_benchmark_reports_realtime_factor(self) -> None:
+        result = dsp.benchmark(1_200_000, 0.2, 1)
+        self.assertGreater(result["realtime_factor_per_core"], 0)
+
+    def test_rejects_frequencies_outside_bandwidth(self) -> None:
+        channelizer = dsp.Channelizer(2_400_000, 100e6)
+        self.assertTrue(channelizer.fits(100.8e6))
+        with self.assertRaises(ValueError):
+            channelizer.add_channel(101.2e6)
+
+
+if __name__ == "__main__":
+    unittest.main()
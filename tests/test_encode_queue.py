@@ -0,0 +1,103 @@
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+
+COPY = "import shutil, sys; shutil.copy(sys.argv[1], sys.argv[2])"
+
+
+def fake_priority_command(command: list, niceness: int) -> list:
+    return [sys.executable, "-c", COPY, command[command.index("-i") + 1], command[-1]]
+
+
+class TestEncodeQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.journal_path = self.root / "encode_jobs.json"
+        self.queue = server.EncodeQueue(server.JsonStore(self.journal_path, {"jobs": []}))
+        self.addCleanup(self.queue.journal.flush)
+        for name, value in (
+            ("low_priority_command", fake_priority_command),
+            ("generate_rss", mock.Mock()),
+            ("get_catalog", mock.Mock()),
+            ("load_config", mock.Mock(return_value={})),
+        ):
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def wait_for_encode(self) -> None:
+        deadline = time.time() + 5
+        while not server.generate_rss.called and time.time() < deadline:
+            time.sleep(0.02)
+
+    def test_job_is_encoded_and_removed_from_journal(self) -> None:
+        source = self.root / "show.flac"
+        source.write_bytes(b"audio")
+        output = self.root / "show.mp3"
+        self.queue.submit(source, output)
+        self.wait_for_encode()
+        self.queue.journal.flush()
+        self.assertEqual(output.read_bytes(), b"audio")
+        self.assertFalse(source.exists())
+        self.assertEqual(json.loads(self.journal_path.read_text())["jobs"], [])
+        server.get_catalog().add.assert_called_once_with(output)
+        server.generate_rss.assert_called_once()
+
+    def test_workers_wait_for_live_capture(self) -> None:
+        source = self.root / "show.flac"
+        source.write_bytes(b"audio")
+        output = self.root / "show.mp3"
+        with self.queue.live_capture():
+            self.queue.submit(source, output)
+            time.sleep(0.2)
+            self.assertFalse(output.exists())
+            self.assertEqual(self.queue.pending(), 1)
+        self.wait_for_encode()
+        self.assertTrue(output.exists())
+
+    def test_resume_requeues_surviving_jobs(self) -> None:
+        source = self.root / "kept.flac"
+        source.write_bytes(b"audio")
+        kept = {"source": str(source), "output": str(self.root / "kept.mp3")}
+        lost = {"source": str(self.root / "gone.flac"), "output": str(self.root / "gone.mp3")}
+        self.journal_path.write_text(json.dumps({"jobs": [kept, lost]}))
+        self.queue.resume({})
+        self.wait_for_encode()
+        self.queue.journal.flush()
+        self.assertTrue((self.root / "kept.mp3").exists())
+        self.assertEqual(json.loads(self.journal_path.read_text())["jobs"], [])
+
+    def test_failed_encode_is_retried_then_parked(self) -> None:
+        source = self.root / "show.flac"
+        source.write_bytes(b"audio")
+        runs = []
+
+        def failing_command(command: list, niceness: int) -> list:
+            runs.append(command)
+            return [sys.executable, "-c", "raise SystemExit(1)"]
+
+        with mock.patch.object(server, "low_priority_command", failing_command), \
+                mock.patch.object(server, "ENCODE_RETRIES", 1), \
+                mock.patch.object(server, "ENCODE_RETRY_DELAY_SEC", 0.05):
+            self.queue.submit(source, self.root / "show.mp3")
+            deadline = time.time() + 5
+            while not self.queue.failed() and time.time() < deadline:
+                time.sleep(0.02)
+        self.assertEqual(len(runs), 2)
+        (failed,) = self.queue.failed()
+        self.assertEqual((failed["source"], failed["returncode"]), (str(source), 1))
+        self.assertEqual(self.queue.journal.read()["jobs"], [])
+        self.assertTrue(source.exists())
+        server.generate_rss.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
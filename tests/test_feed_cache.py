@@ -0,0 +1,105 @@
+import gzip
+import http.client
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class FeedTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        base_dir = Path(self._tmp.name)
+        self.recordings_dir = base_dir / "recordings"
+        self.recordings_dir.mkdir()
+        patches = {
+            "RECORDINGS_DIR": self.recordings_dir,
+            "RSS_PATH": base_dir / "rss.xml",
+            "CATALOG_PATH": base_dir / "recordings.jsonl",
+            "feed_cache": server.FeedCache(),
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        probe = mock.patch.object(server, "get_duration_seconds", return_value=60)
+        probe.start()
+        self.addCleanup(probe.stop)
+        self.config = {"base_url": "http://example.test"}
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+
+class TestIncrementalFeed(FeedTestCase):
+    def test_only_new_items_are_rendered(self) -> None:
+        (self.recordings_dir / "news_99.5_2024-01-02_1200.mp3").write_bytes(b"one")
+        server.generate_rss(self.config)
+        first_etag = server.feed_cache.snapshot()[2]
+        (self.recordings_dir / "news_99.5_2024-01-03_1200.mp3").write_bytes(b"two")
+        with mock.patch.object(server, "render_rss_item", wraps=server.render_rss_item) as render:
+            server.generate_rss(self.config)
+        self.assertEqual(render.call_count, 1)
+        body, gzip_body, etag, _ = server.feed_cache.snapshot()
+        self.assertNotEqual(etag, first_etag)
+        self.assertEqual(gzip.decompress(gzip_body), body)
+        self.assertIn(b"news_99.5_2024-01-03_1200.mp3", body)
+        self.assertEqual(server.RSS_PATH.read_bytes(), body)
+
+        (self.recordings_dir / "news_99.5_2024-01-02_1200.mp3").unlink()
+        server.generate_rss(self.config)
+        self.assertNotIn(b"news_99.5_2024-01-02_1200.mp3", server.feed_cache.snapshot()[0])
+
+
+class TestFeedHttp(FeedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        (self.recordings_dir / "news_99.5_2024-01-02_1200.mp3").write_bytes(b"one")
+        server.generate_rss(self.config)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.ShiftHandler)
+        quiet = mock.patch.object(server.ShiftHandler, "log_message")
+        quiet.start()
+        self.addCleanup(quiet.stop)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.addCleanup(self.httpd.server_close)
+        self.addCleanup(self.httpd.shutdown)
+
+    def _get(self, headers: dict) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1])
+        self.addCleanup(conn.close)
+        conn.request("GET", "/rss.xml", headers=headers)
+        return conn.getresponse()
+
+    def test_conditional_and_gzip_responses(self) -> None:
+        response = self._get({"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(response.read()), server.feed_cache.snapshot()[0])
+        etag = response.getheader("ETag")
+
+        response = self._get({"Accept-Encoding": "gzip", "If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(response.read(), b"")
+
+        response = self._get({"If-Modified-Since": response.getheader("Last-Modified")})
+        self.assertEqual(response.status, 304)
+
+        response = self._get({"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(response.read(), server.feed_cache.snapshot()[0])
+
+    def test_feed_on_disk_is_served_from_the_current_rss_path(self) -> None:
+        body = server.RSS_PATH.read_bytes()
+        with mock.patch.object(server, "feed_cache", server.FeedCache()):
+            response = self._get({})
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.read(), body)
+
+
+if __name__ == "__main__":
+    unittest.main()
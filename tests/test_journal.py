@@ -0,0 +1,185 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.recordings_dir = self.root / "recordings"
+        self.recordings_dir.mkdir()
+        self.journal = server.RecordingJournal(self.root / "recording_journal.jsonl")
+        patches = {
+            "RECORDINGS_DIR": self.recordings_dir,
+            "CATALOG_PATH": self.root / "recordings.jsonl",
+            "LIVE_DIR": self.root / "live",
+            "recording_journal": self.journal,
+            "_catalogs": {},
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def events(self) -> list[dict]:
+        return [json.loads(line) for line in self.journal.path.read_text().splitlines()]
+
+
+class TestRecordingJournal(JournalTestCase):
+    def test_open_recordings_are_replayed_and_a_torn_line_is_ignored(self) -> None:
+        output_path = self.recordings_dir / "News_96.1_2024-01-01_0800.mp3"
+        self.journal.scheduled("news@1", "News", 96.1, 1000.0, 3600)
+        self.journal.started("news@1", "News", 96.1, 1000.0, 3600, output_path, output_path)
+        self.journal.started("jazz@1", "Jazz", 101.5, 1000.0, 60, output_path, output_path)
+        self.journal.finished("jazz@1")
+        with self.journal.path.open("a") as handle:
+            handle.write('{"event": "progress", "id": "news@1", "at": 1500.0, "bytes": 8000}\n{"event": "fin')
+        restarted = server.RecordingJournal(self.journal.path)
+        (entry,) = restarted.recover()
+        self.assertEqual(entry["id"], "news@1")
+        self.assertEqual((entry["name"], entry["duration_sec"], entry["at"]), ("News", 3600, 1500.0))
+        self.assertEqual(entry["output_path"], str(output_path))
+        self.assertEqual(self.journal.path.read_bytes(), b"")
+
+    def test_journal_is_emptied_once_nothing_is_open(self) -> None:
+        path = self.recordings_dir / "a.mp3"
+        self.journal.started("a", "A", 96.1, 1000.0, 60, path, path)
+        self.journal.started("b", "B", 96.1, 1000.0, 60, path, path)
+        self.journal.finished("a")
+        self.assertEqual([event["event"] for event in self.events()], ["started", "started", "finished"])
+        self.journal.failed("b", "boom")
+        self.assertEqual(self.journal.path.read_bytes(), b"")
+
+    def test_record_station_journals_a_failed_capture(self) -> None:
+        with mock.patch.object(server, "capture_station", side_effect=RuntimeError("no tuner")):
+            with self.assertRaises(RuntimeError):
+                server.record_station("News", 96.1, 60, {}, journal_id="news@1")
+        self.assertEqual(self.journal.replay(), [])
+        self.assertEqual(self.journal.open, {})
+
+    def test_scheduled_recording_that_fails_to_start_is_closed(self) -> None:
+        schedule = {
+            "id": "s1", "name": "News", "frequency_mhz": 96.1, "start_time": "08:00", "duration_sec": 60
+        }
+        with mock.patch.object(server, "load_config", return_value={}), \
+                mock.patch.object(server, "record_station", side_effect=RuntimeError("no tuner")):
+            with self.assertRaises(RuntimeError):
+                server.run_recording(schedule, datetime(2024, 1, 1, 8, 0))
+        self.assertEqual(self.journal.open, {})
+        self.assertEqual(self.journal.path.read_bytes(), b"")
+
+
+class TestRecovery(JournalTestCase):
+    def journal_crash(self, name: str, start_ts: float, duration_sec: int, crashed_at: float) -> Path:
+        output_path = self.recordings_dir / server.generate_filename(
+            name, 96.1, datetime.fromtimestamp(start_ts)
+        )
+        output_path.write_bytes(b"mp3" * 100)
+        os.utime(output_path, (crashed_at, crashed_at))
+        lines = [
+            {"event": "started", "id": f"{name}@1", "at": start_ts, "name": name, "frequency_mhz": 96.1,
+             "start_ts": start_ts, "duration_sec": duration_sec, "output_path": str(output_path),
+             "capture_path": str(output_path)},
+            {"event": "progress", "id": f"{name}@1", "at": crashed_at, "bytes": 300},
+        ]
+        with self.journal.path.open("a") as handle:
+            handle.writelines(json.dumps(line) + "\n" for line in lines)
+        return output_path
+
+    def test_open_window_is_resumed_and_the_cut_file_marked(self) -> None:
+        now = time.time()
+        output_path = self.journal_crash("News", now - 7200, 3600 * 3, now - 10)
+        with mock.patch.object(server.threading, "Thread") as thread, \
+                mock.patch.object(server, "repair_recording", return_value=True) as repair:
+            (entry,) = server.recover_recordings({})
+            server.repair_interrupted(entry)
+        self.assertTrue(entry["resumed"])
+        kwargs = thread.call_args.kwargs
+        self.assertIs(kwargs["target"], server.record_guarded)
+        self.assertEqual(kwargs["args"][:3], ("News", "News", 96.1))
+        self.assertAlmostEqual(kwargs["args"][3], 3600, delta=5)
+        self.assertEqual(kwargs["args"][5], "News@1+resumed")
+        repair.assert_called_once_with(output_path)
+        report = server.load_analysis(output_path.name)
+        self.assertTrue(report["truncated"])
+        self.assertAlmostEqual(report["lost_sec"], 10, delta=2)
+        catalog_entry = server.get_catalog().add(output_path)
+        self.assertTrue(catalog_entry["truncated"])
+
+    def test_resume_without_a_free_tuner_is_reported(self) -> None:
+        now = time.time()
+        self.journal_crash("News", now - 600, 3600, now - 10)
+        schedule = {
+            "id": "News", "name": "News", "frequency_mhz": 96.1, "start_time": "08:00", "duration_sec": 3600
+        }
+        registry = server.Metrics()
+        registry.described = dict(server.metrics.described)
+        patches = {
+            "schedule_store": server.JsonStore(self.root / "schedules.json", {"schedules": [schedule]}),
+            "metrics": registry,
+            "record_station": mock.Mock(side_effect=server.NoFreeTuner("No free tuner for News")),
+        }
+        with mock.patch.multiple(server, **patches):
+            with mock.patch.object(server.threading, "Thread") as thread:
+                server.recover_recordings({})
+            kwargs = thread.call_args.kwargs
+            kwargs["target"](*kwargs["args"], **kwargs["kwargs"])
+            stored = server.load_schedules()["schedules"][0]
+            server.schedule_store.flush()
+        self.assertEqual(stored["last_error"], "No free tuner for News")
+        self.assertEqual(server.active_recordings, set())
+        self.assertIn('shiftfm_recordings_missed_total{reason="no_free_tuner"} 1', registry.render())
+
+    def test_closed_window_is_only_repaired(self) -> None:
+        now = time.time()
+        output_path = self.journal_crash("Jazz", now - 3600, 1800, now - 3000)
+        with mock.patch.object(server.threading, "Thread") as thread, \
+                mock.patch.object(server, "repair_recording", return_value=True):
+            (entry,) = server.recover_recordings({})
+            server.repair_interrupted(entry)
+        thread.assert_not_called()
+        self.assertFalse(entry["resumed"])
+        self.assertAlmostEqual(server.load_analysis(output_path.name)["lost_sec"], 1200, delta=2)
+
+    def test_restart_in_the_first_minute_records_the_show_afresh(self) -> None:
+        started = datetime(2024, 1, 1, 8, 0)
+
+        class Clock(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return started + timedelta(seconds=20)
+
+        output_path = self.journal_crash("Talk", started.timestamp(), 3600, started.timestamp() + 15)
+        with mock.patch.object(server.threading, "Thread") as thread, \
+                mock.patch.object(server, "repair_recording") as repair, \
+                mock.patch.object(server, "datetime", Clock):
+            (entry,) = server.recover_recordings({})
+            server.repair_interrupted(entry)
+        self.assertFalse(output_path.exists())
+        thread.assert_called_once()
+        repair.assert_not_called()
+
+    def test_live_segments_are_joined(self) -> None:
+        now = time.time()
+        output_path = self.journal_crash("Live", now - 3600, 1800, now - 1900)
+        output_path.unlink()
+        segments = server.live_dir(output_path.name)
+        segments.mkdir(parents=True)
+        with mock.patch.object(server, "join_segments", return_value=0) as join:
+            (entry,) = server.recover_recordings({})
+            server.repair_interrupted(entry)
+        join.assert_called_once_with(segments, output_path)
+        self.assertFalse(segments.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
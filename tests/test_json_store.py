@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class TestJsonStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "schedules.json"
+
+    def test_concurrent_updates_are_not_lost(self) -> None:
+        store = server.JsonStore(self.path, {"schedules": []})
+
+        def append_many(prefix: str) -> None:
+            for index in range(50):
+                store.update(lambda payload: payload["schedules"].append(f"{prefix}{index}"))
+
+        threads = [threading.Thread(target=append_many, args=(prefix,)) for prefix in "abcd"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.flush()
+        self.assertEqual(len(json.loads(self.path.read_text())["schedules"]), 200)
+        self.assertEqual([p.name for p in self.path.parent.iterdir()], ["schedules.json"])
+
+    def test_rapid_writes_are_coalesced(self) -> None:
+        store = server.JsonStore(self.path, {"schedules": []})
+        store.read()
+        with mock.patch.object(server, "save_json", wraps=server.save_json) as save:
+            for index in range(10):
+                store.update(lambda payload: payload["schedules"].append(index))
+            store.flush()
+        self.assertEqual(save.call_count, 1)
+
+    def test_reads_are_cached_until_file_changes_externally(self) -> None:
+        store = server.JsonStore(self.path, {"schedules": []})
+        store.read()
+        with mock.patch.object(server, "load_json", wraps=server.load_json) as load:
+            store.read()
+            self.assertEqual(load.call_count, 0)
+            self.path.write_text(json.dumps({"schedules": ["external"]}))
+            stat = self.path.stat()
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.assertEqual(store.read(), {"schedules": ["external"]})
+            self.assertEqual(load.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import http.client
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import server
+
+NAME = "News_96.1_2024-01-01_0800.mp3"
+PLAYLIST = """#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-TARGETDURATION:10
+#EXT-X-PLAYLIST-TYPE:EVENT
+#EXTINF:10.000000,
+seg00000.ts
+#EXTINF:10.000000,
+seg00001.ts
+"""
+
+
+class LiveTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        base_dir = Path(self._tmp.name)
+        self.recordings_dir = base_dir / "recordings"
+        self.recordings_dir.mkdir()
+        patches = {
+            "LIVE_DIR": base_dir / "live",
+            "RECORDINGS_DIR": self.recordings_dir,
+            "RSS_PATH": base_dir / "rss.xml",
+            "CATALOG_PATH": base_dir / "recordings.jsonl",
+            "feed_cache": server.FeedCache(),
+            "program_feeds": {},
+            "live_recordings": server.LiveRecordings(),
+            "load_config": lambda: {"base_url": "http://radio.test"},
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.live_dir = server.live_dir(NAME)
+        self.live_dir.mkdir(parents=True)
+        (self.live_dir / server.LIVE_PLAYLIST_NAME).write_text(PLAYLIST)
+        for index in range(2):
+            (self.live_dir / f"seg{index:05d}.ts").write_bytes(b"ts" * 100)
+
+
+class TestJoinSegments(LiveTestCase):
+    def test_segments_are_stream_copied_in_playlist_order(self) -> None:
+        output_path = self.recordings_dir / NAME
+        commands = []
+
+        def fake_run(command, **kwargs):
+            commands.append(command)
+            Path(command[-1]).write_bytes(b"mp3")
+            return mock.Mock(returncode=0)
+
+        with mock.patch.object(server.subprocess, "run", side_effect=fake_run):
+            self.assertEqual(server.join_segments(self.live_dir, output_path), 0)
+        self.assertEqual(output_path.read_bytes(), b"mp3")
+        self.assertIn("copy", commands[0])
+        self.assertEqual(
+            (self.live_dir / "segments.txt").read_text(), "file 'seg00000.ts'\nfile 'seg00001.ts'\n"
+        )
+
+    def test_failed_join_leaves_no_output(self) -> None:
+        output_path = self.recordings_dir / NAME
+        with mock.patch.object(server.subprocess, "run", return_value=mock.Mock(returncode=1)):
+            self.assertEqual(server.join_segments(self.live_dir, output_path), 1)
+        self.assertFalse(output_path.exists())
+
+    def test_encoder_writes_an_event_playlist(self) -> None:
+        command = server.live_encoder_command(self.live_dir, 16000, 2, 6)
+        self.assertEqual(command[command.index("-hls_playlist_type") + 1], "event")
+        self.assertEqual(command[command.index("-hls_time") + 1], "6")
+        self.assertEqual(command[-1], str(self.live_dir / "index.m3u8"))
+
+
+class TestLiveFeedAndPlaylist(LiveTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        with mock.patch.object(server, "generate_rss"):
+            server.live_recordings.start(NAME, {})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.ShiftHandler)
+        quiet = mock.patch.object(server.ShiftHandler, "log_message")
+        quiet.start()
+        self.addCleanup(quiet.stop)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.addCleanup(self.httpd.server_close)
+        self.addCleanup(self.httpd.shutdown)
+
+    def _get(self, path: str) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1])
+        self.addCleanup(conn.close)
+        conn.request("GET", path)
+        return conn.getresponse()
+
+    def test_feeds_list_the_live_episode_until_it_finishes(self) -> None:
+        server.generate_rss({"base_url": "http://radio.test"})
+        url = "http://radio.test/live/News_96.1_2024-01-01_0800/index.m3u8"
+        body = server.RSS_PATH.read_text()
+        self.assertIn(f'<enclosure url="{url}" length="0" type="application/vnd.apple.mpegurl" />', body)
+        self.assertIn("<title>News 96.1 2024-01-01 0800 (live)</title>", body)
+        self.assertIn(url, server.program_feed_path("News").read_text())
+
+        server.live_recordings.finish(NAME)
+        server.generate_rss({"base_url": "http://radio.test"})
+        self.assertNotIn("<item>", server.RSS_PATH.read_text())
+
+    def test_playlist_and_segments_are_served_while_live(self) -> None:
+        response = self._get("/live/News_96.1_2024-01-01_0800/index.m3u8")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "application/vnd.apple.mpegurl")
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        self.assertEqual(response.read().decode(), PLAYLIST)
+        response = self._get("/live/News_96.1_2024-01-01_0800/seg00001.ts")
+        self.assertEqual(response.getheader("Content-Type"), "video/mp2t")
+        self.assertEqual(len(response.read()), 200)
+        self.assertEqual(self._get("/live/News_96.1_2024-01-01_0800/segments.txt").status, 404)
+
+        server.live_recordings.finish(NAME)
+        self.assertEqual(self._get("/live/News_96.1_2024-01-01_0800/index.m3u8").status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
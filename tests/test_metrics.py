@@ -0,0 +1,127 @@
+import http.client
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+def fresh_metrics() -> server.Metrics:
+    registry = server.Metrics()
+    registry.described = dict(server.metrics.described)
+    return registry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_counters_and_histograms_render(self) -> None:
+        registry = server.Metrics()
+        registry.describe("jobs_total", "counter", "Jobs.")
+        registry.describe("wait_seconds", "histogram", "Wait.", (0.1, 1.0))
+        registry.inc("jobs_total", kind='a"b')
+        registry.inc("jobs_total", 2, kind='a"b')
+        for value in (0.05, 0.1, 0.5, 3.0):
+            registry.observe("wait_seconds", value)
+        text = registry.render()
+        self.assertIn('jobs_total{kind="a\\"b"} 3\n', text)
+        self.assertIn('wait_seconds_bucket{le="0.1"} 2\n', text)
+        self.assertIn('wait_seconds_bucket{le="1"} 3\n', text)
+        self.assertIn('wait_seconds_bucket{le="+Inf"} 4\n', text)
+        self.assertIn("wait_seconds_sum 3.65\n", text)
+        self.assertIn("wait_seconds_count 4\n", text)
+        self.assertIn("# TYPE wait_seconds histogram\n", text)
+
+    def test_route_labels_are_bounded(self) -> None:
+        self.assertEqual(server.route_label("/recordings/a.mp3"), "/recordings/*")
+        self.assertEqual(server.route_label("/rss-low.xml"), "/rss-*.xml")
+        self.assertEqual(server.route_label("/api/devices"), "/api/devices")
+        self.assertEqual(server.route_label("/wp-login.php"), "other")
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        base_dir = Path(self._tmp.name)
+        patches = {
+            "metrics": fresh_metrics(),
+            "RECORDINGS_DIR": base_dir / "recordings",
+            "CATALOG_PATH": base_dir / "recordings.jsonl",
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.ShiftHandler)
+        quiet = mock.patch.object(server.ShiftHandler, "log_message")
+        quiet.start()
+        self.addCleanup(quiet.stop)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.addCleanup(self.httpd.server_close)
+        self.addCleanup(self.httpd.shutdown)
+
+    def _get(self, path: str) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1])
+        self.addCleanup(conn.close)
+        conn.request("GET", path)
+        return conn.getresponse()
+
+    def test_requests_are_counted_per_route(self) -> None:
+        body = self._get("/api/devices").read()
+        self.assertEqual(self._get("/nope").status, 404)
+        # Requests are counted just after their response is sent, so wait for both to land.
+        deadline = time.monotonic() + 5
+        while True:
+            response = self._get("/metrics")
+            self.assertEqual(response.status, 200)
+            text = response.read().decode("utf-8")
+            landed = text.count('route="/api/devices",status="200"') + text.count('status="404"')
+            if landed == 2 or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+        self.assertIn('shiftfm_http_requests_total{method="GET",route="/api/devices",status="200"} 1', text)
+        self.assertIn('shiftfm_http_requests_total{method="GET",route="other",status="404"} 1', text)
+        self.assertIn(f'shiftfm_http_response_bytes_total{{route="/api/devices"}} {len(body)}', text)
+        self.assertIn('shiftfm_http_request_seconds_count{route="/api/devices"} 1', text)
+        self.assertIn("shiftfm_archive_bytes 0", text)
+
+    def test_malformed_request_lines_are_counted_as_other(self) -> None:
+        for request_line in (b"GET / HTTP/9x", b"GET /" + b"a" * 70000 + b" HTTP/1.1"):
+            with socket.create_connection(self.httpd.server_address) as sock:
+                sock.sendall(request_line + b"\r\n\r\n")
+                self.assertTrue(sock.recv(1024))
+        deadline = time.monotonic() + 5
+        while True:
+            text = self._get("/metrics").read().decode("utf-8")
+            if text.count('route="other"') >= 2 or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+        self.assertIn('shiftfm_http_requests_total{method="other",route="other",status="400"} 1', text)
+        self.assertIn('shiftfm_http_requests_total{method="other",route="other",status="414"} 1', text)
+
+
+class TestCaptureMetrics(unittest.TestCase):
+    def test_trimmed_sink_reports_rate_and_lateness(self) -> None:
+        registry = fresh_metrics()
+
+        class Sink:
+            def write(self, data) -> None:
+                pass
+
+        with mock.patch.object(server, "metrics", registry), mock.patch.object(server, "capture_latencies", []):
+            trimmed = server.TrimmedSink(Sink(), 1000, 1, server.time.time() + 0.5, 1, "show")
+            for _ in range(3):
+                trimmed.write(bytes(2000))
+            self.assertTrue(trimmed.done.is_set())
+        text = registry.render()
+        self.assertIn("shiftfm_capture_bytes_total 6000", text)
+        self.assertIn('shiftfm_capture_start_late_seconds_bucket{le="0"} 1', text)
+        self.assertIn("shiftfm_capture_bytes_per_second_count 1", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+import server
+
+
+class CollectingSink:
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def write(self, data) -> None:
+        self.data += data
+
+
+class TestTrimmedSink(unittest.TestCase):
+    def test_leading_skip(self) -> None:
+        # 1000 bytes/s; a 100-byte chunk arriving at t=10.0 started at t=9.9.
+        self.assertEqual(server.leading_skip(10.5, 10.0, 100, 1000, 4), 600)
+        self.assertEqual(server.leading_skip(9.0, 10.0, 100, 1000, 4), 0)
+        self.assertEqual(server.leading_skip(10.0, 10.0, 100, 1000, 4) % 4, 0)
+
+    def test_pre_roll_is_dropped_and_duration_trimmed(self) -> None:
+        sink = CollectingSink()
+        byte_rate = server.RTL_FM_PCM_RATE * 4
+        with mock.patch.object(server, "capture_latencies", []):
+            trimmed = server.TrimmedSink(sink, server.RTL_FM_PCM_RATE, 2, time.time() + 2, 1, "show")
+            stream = os.urandom(byte_rate * 5)
+            trimmed.write(stream[:byte_rate])
+            self.assertEqual(len(sink.data), 0)
+            position = byte_rate
+            while not trimmed.done.is_set():
+                trimmed.write(stream[position : position + 4096])
+                position += 4096
+            self.assertEqual(len(server.capture_latencies), 1)
+        self.assertEqual(len(sink.data), byte_rate)
+        skipped = stream.find(bytes(sink.data[:64]))
+        self.assertGreaterEqual(skipped, int(byte_rate * 2.9))
+        self.assertLessEqual(skipped, int(byte_rate * 3.1))
+        self.assertEqual(skipped % 4, 0)
+        trimmed.write(b"late")
+        self.assertEqual(len(sink.data), byte_rate)
+
+
+class TestSchedulerPreroll(unittest.TestCase):
+    def test_schedule_is_due_preroll_early_with_its_scheduled_time(self) -> None:
+        instance = server.Scheduler()
+        instance.configure({"preroll_sec": 5})
+        instance.loaded = True
+        fire_ts = time.time() + 3
+        instance.generations["sch_1"] = 1
+        instance.heap = [(fire_ts, 1, "sch_1", 1)]
+        started = time.time()
+        self.assertEqual(instance._next_due(), ("sch_1", fire_ts))
+        self.assertLess(time.time() - started, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import http.client
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class TestRecordingDownload(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        recordings_dir = Path(self._tmp.name)
+        self.payload = bytes(range(256)) * 64
+        (recordings_dir / "show_96.1_2024-01-01_1200.mp3").write_bytes(self.payload)
+        for patcher in (
+            mock.patch.object(server, "RECORDINGS_DIR", recordings_dir),
+            mock.patch.object(server.ShiftHandler, "log_message"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.ShiftHandler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.addCleanup(self.httpd.server_close)
+        self.addCleanup(self.httpd.shutdown)
+
+    def _get(self, headers: dict) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1])
+        self.addCleanup(conn.close)
+        conn.request("GET", "/recordings/show_96.1_2024-01-01_1200.mp3", headers=headers)
+        return conn.getresponse()
+
+    def test_full_download(self) -> None:
+        response = self._get({})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Accept-Ranges"), "bytes")
+        self.assertEqual(response.read(), self.payload)
+
+    def test_range_requests(self) -> None:
+        response = self._get({"Range": "bytes=100-199"})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 100-199/{len(self.payload)}")
+        self.assertEqual(response.read(), self.payload[100:200])
+        etag = response.getheader("ETag")
+
+        response = self._get({"Range": "bytes=-10", "If-Range": etag})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.read(), self.payload[-10:])
+
+        response = self._get({"Range": "bytes=0-9", "If-Range": '"stale"'})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.read(), self.payload)
+
+        response = self._get({"Range": f"bytes={len(self.payload)}-"})
+        self.assertEqual(response.status, 416)
+        response.read()
+
+        response = self._get({"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+
+    def test_parse_byte_range(self) -> None:
+        self.assertEqual(server.parse_byte_range("bytes=0-", 10), (0, 9))
+        self.assertEqual(server.parse_byte_range("bytes=5-100", 10), (5, 9))
+        self.assertEqual(server.parse_byte_range("bytes=-3", 10), (7, 9))
+        self.assertIsNone(server.parse_byte_range("bytes=0-1,4-5", 10))
+        self.assertIsNone(server.parse_byte_range("items=0-1", 10))
+        with self.assertRaises(ValueError):
+            server.parse_byte_range("bytes=10-", 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
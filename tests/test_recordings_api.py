@@ -0,0 +1,129 @@
+import http.client
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class RecordingsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        base_dir = Path(self._tmp.name)
+        self.recordings_dir = base_dir / "recordings"
+        self.recordings_dir.mkdir()
+        patches = {
+            "RECORDINGS_DIR": self.recordings_dir,
+            "RSS_PATH": base_dir / "rss.xml",
+            "CATALOG_PATH": base_dir / "recordings.jsonl",
+            "feed_cache": server.FeedCache(),
+            "program_feeds": {},
+            "get_duration_seconds": lambda path: 60,
+            "load_config": lambda: {"base_url": "http://radio.test"},
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Twelve recordings of two programs, one per day, alternating frequency.
+        self.names = []
+        for day in range(1, 13):
+            program = "News" if day % 2 else "Jazz"
+            name = f"{program}_{96.1 if day % 3 else 101.5}_2024-01-{day:02d}_0800.mp3"
+            path = self.recordings_dir / name
+            path.write_bytes(b"x" * day)
+            mtime = datetime(2024, 1, day, 9).timestamp()
+            os.utime(path, (mtime, mtime))
+            self.names.append(name)
+        self.catalog = server.get_catalog()
+        self.catalog.sync()
+
+
+class TestCatalogPages(RecordingsTestCase):
+    def test_cursor_walks_the_archive_newest_first(self) -> None:
+        seen = []
+        cursor = None
+        while True:
+            items, cursor = self.catalog.page(5, cursor)
+            seen += [entry["name"] for entry in items]
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.names[::-1])
+
+    def test_filters(self) -> None:
+        items, _ = self.catalog.page(50, program="Jazz", frequency_mhz=101.5)
+        self.assertEqual([entry["name"] for entry in items], [self.names[11], self.names[5]])
+        since = datetime(2024, 1, 3).timestamp()
+        until = datetime(2024, 1, 6).timestamp()
+        items, _ = self.catalog.page(50, since=since, until=until)
+        self.assertEqual([entry["name"] for entry in items], self.names[4:1:-1])
+
+    def test_date_filters_use_the_air_time(self) -> None:
+        name = "Late_96.1_2024-01-05_2300.mp3"
+        path = self.recordings_dir / name
+        path.write_bytes(b"x")
+        mtime = datetime(2024, 1, 6, 1, 5).timestamp()
+        os.utime(path, (mtime, mtime))
+        self.catalog.sync()
+        day = (datetime(2024, 1, 5).timestamp(), datetime(2024, 1, 5, 23, 59).timestamp())
+        items, _ = self.catalog.page(50, since=day[0], until=day[1])
+        self.assertEqual([entry["name"] for entry in items], [name, self.names[4]])
+        items, _ = self.catalog.page(50, since=datetime(2024, 1, 6).timestamp())
+        self.assertNotIn(name, [entry["name"] for entry in items])
+
+    def test_index_follows_removals(self) -> None:
+        self.catalog.remove(self.names[10])
+        items, _ = self.catalog.page(2, program="News")
+        self.assertEqual([entry["name"] for entry in items], [self.names[8], self.names[6]])
+        self.assertEqual(self.catalog.programs(), ["Jazz", "News"])
+
+
+class TestRecordingsHttp(RecordingsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        server.generate_rss({"base_url": "http://radio.test", "program_feed_items": 3})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.ShiftHandler)
+        quiet = mock.patch.object(server.ShiftHandler, "log_message")
+        quiet.start()
+        self.addCleanup(quiet.stop)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.addCleanup(self.httpd.server_close)
+        self.addCleanup(self.httpd.shutdown)
+
+    def _get(self, path: str) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1])
+        self.addCleanup(conn.close)
+        conn.request("GET", path)
+        return conn.getresponse()
+
+    def test_paginated_listing(self) -> None:
+        response = self._get("/api/recordings?limit=4&program=News")
+        self.assertEqual(response.status, 200)
+        page = json.loads(response.read())
+        self.assertEqual(len(page["recordings"]), 4)
+        self.assertEqual(page["recordings"][0]["url"], f"http://radio.test/recordings/{self.names[10]}")
+        response = self._get(f"/api/recordings?limit=4&program=News&cursor={page['next_cursor']}")
+        page = json.loads(response.read())
+        self.assertEqual([entry["name"] for entry in page["recordings"]], [self.names[2], self.names[0]])
+        self.assertIsNone(page["next_cursor"])
+        self.assertEqual(self._get("/api/recordings?cursor=%21%21").status, 400)
+
+    def test_program_feed_holds_latest_items(self) -> None:
+        response = self._get("/rss/Jazz.xml")
+        self.assertEqual(response.status, 200)
+        body = response.read().decode("utf-8")
+        self.assertEqual(body.count("<item>"), 3)
+        self.assertIn(self.names[11], body)
+        self.assertNotIn(self.names[5], body)
+        self.assertEqual(self._get("/rss/Missing.xml").status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+
+COPY = "import shutil, sys; shutil.copy(sys.argv[1], sys.argv[2])"
+
+
+def fake_priority_command(command: list, niceness: int) -> list:
+    return [sys.executable, "-c", COPY, command[command.index("-i") + 1], command[-1]]
+
+
+class TestRenditions(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        root = Path(self._tmp.name)
+        self.recordings_dir = root / "recordings"
+        self.recordings_dir.mkdir()
+        (self.recordings_dir / "news_99.5_2024-01-02_1200.mp3").write_bytes(b"master")
+        self.entries = [{"name": "news_99.5_2024-01-02_1200.mp3", "size": 6, "mtime": 1.0}]
+        self.renditions = server.Renditions(root / "renditions")
+        self.rss = mock.Mock()
+        for name, value in (
+            ("low_priority_command", fake_priority_command),
+            ("RECORDINGS_DIR", self.recordings_dir),
+            ("generate_rss", self.rss),
+            ("load_config", mock.Mock(return_value={})),
+        ):
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def wait_for_transcodes(self) -> None:
+        deadline = time.time() + 5
+        while self.renditions.in_flight and time.time() < deadline:
+            time.sleep(0.02)
+
+    def test_each_recording_is_transcoded_once(self) -> None:
+        low = {"id": "low", "codec": "opus", "bitrate": "24k"}
+        self.assertEqual(self.renditions.sync([low], self.entries), {"low": []})
+        self.wait_for_transcodes()
+        self.rss.assert_called_once()
+
+        ready = self.renditions.sync([low], self.entries)
+        self.assertEqual(ready["low"][0]["name"], "news_99.5_2024-01-02_1200.opus")
+        self.assertEqual(ready["low"][0]["mtime"], 1.0)
+        self.assertFalse(self.renditions.in_flight)
+
+    def test_changed_settings_rebuild_the_rendition(self) -> None:
+        self.renditions.sync([{"id": "low", "codec": "opus", "bitrate": "24k"}], self.entries)
+        self.wait_for_transcodes()
+        self.renditions.prepared.clear()
+        ready = self.renditions.sync([{"id": "low", "codec": "opus", "bitrate": "32k"}], self.entries)
+        self.assertEqual(ready["low"], [])
+        self.wait_for_transcodes()
+        self.assertEqual(self.rss.call_count, 2)
+
+    def test_removed_rendition_is_deleted(self) -> None:
+        self.renditions.sync([{"id": "aac", "codec": "aac", "bitrate": "48k"}], self.entries)
+        self.wait_for_transcodes()
+        self.renditions.sync([], self.entries)
+        self.assertFalse((self.renditions.root / "aac").exists())
+
+
+class TestRenditionFeeds(unittest.TestCase):
+    def test_feed_lists_only_finished_renditions(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            recordings_dir = root / "recordings"
+            recordings_dir.mkdir()
+            (recordings_dir / "news_99.5_2024-01-02_1200.mp3").write_bytes(b"master")
+            renditions = server.Renditions(root / "renditions")
+            low_dir = renditions.root / "low"
+            low_dir.mkdir(parents=True)
+            server.save_json(low_dir / ".settings.json", {"codec": "opus", "bitrate": "24k"})
+            (low_dir / "news_99.5_2024-01-02_1200.opus").write_bytes(b"low")
+            with mock.patch.multiple(
+                server,
+                RECORDINGS_DIR=recordings_dir,
+                RSS_PATH=root / "rss.xml",
+                CATALOG_PATH=root / "recordings.jsonl",
+                renditions=renditions,
+                rendition_feeds={},
+                get_duration_seconds=mock.Mock(return_value=None),
+            ):
+                server.generate_rss(
+                    {
+                        "base_url": "http://example.test",
+                        "renditions": [{"id": "low", "codec": "opus", "bitrate": "24k"}],
+                    }
+                )
+            payload = (root / "rss-low.xml").read_text(encoding="utf-8")
+            self.assertIn(
+                "http://example.test/renditions/low/news_99.5_2024-01-02_1200.opus", payload
+            )
+            self.assertIn('length="3" type="audio/ogg"', payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
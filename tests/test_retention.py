@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class TestRetention(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        root = Path(self._tmp.name)
+        self.recordings = root / "recordings"
+        self.recordings.mkdir()
+        for name, value in (
+            ("RECORDINGS_DIR", self.recordings),
+            ("CATALOG_PATH", root / "recordings.jsonl"),
+            ("get_duration_seconds", lambda path: 60),
+        ):
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.generate_rss = mock.Mock()
+        patcher = mock.patch.object(server, "generate_rss", self.generate_rss)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = time.time()
+
+    def add(self, program: str, days_old: float, size: int) -> str:
+        started = time.localtime(self.now - days_old * 86400)
+        name = f"{program}_96.1_{time.strftime('%Y-%m-%d_%H%M', started)}.mp3"
+        path = self.recordings / name
+        path.write_bytes(bytes(size))
+        mtime = self.now - days_old * 86400
+        os.utime(path, (mtime, mtime))
+        server.get_catalog().add(path)
+        return name
+
+    def test_per_program_rules(self) -> None:
+        news = [self.add("News", days, 10) for days in (1, 2, 3)]
+        jazz = [self.add("Jazz", days, 10) for days in (1, 40)]
+        other = self.add("Talk", 400, 10)
+        instance = server.Retention()
+        instance.configure(
+            {"retention": {"programs": {"News": {"keep": 2}, "Jazz": {"max_age_days": 30}}}}
+        )
+        evicted = instance.enforce()
+        self.assertEqual(sorted(evicted), sorted([news[2], jazz[1]]))
+        self.assertFalse((self.recordings / news[2]).exists())
+        self.assertTrue((self.recordings / other).exists())
+        self.assertEqual(server.get_catalog().total_size(), 40)
+        self.generate_rss.assert_called_once()
+
+    def test_quota_evicts_oldest_to_fit_projected_recording(self) -> None:
+        names = [self.add("News", days, 1000) for days in (1, 2, 3, 4)]
+        instance = server.Retention()
+        instance.quota_bytes = 3500
+        self.assertEqual(instance.enforce(), [names[3]])
+        self.assertEqual(instance.enforce(reserve_bytes=1500), [names[2]])
+        self.assertEqual(server.get_catalog().total_size(), 2000)
+        self.assertEqual(instance.enforce(), [])
+        self.assertEqual(self.generate_rss.call_count, 2)
+        self.assertEqual(instance.status()["used_bytes"], 2000)
+
+    def test_make_room_rebuilds_the_feed_off_the_capture_path(self) -> None:
+        names = [self.add("News", days, 1000) for days in (1, 2)]
+        instance = server.Retention()
+        instance.quota_bytes = 1500
+        with mock.patch.object(server.threading, "Thread") as thread:
+            self.assertEqual(instance.make_room(0), [names[1]])
+        self.assertFalse((self.recordings / names[1]).exists())
+        self.assertEqual(server.get_catalog().total_size(), 1000)
+        self.generate_rss.assert_not_called()
+        self.assertIs(thread.call_args.kwargs["target"], self.generate_rss)
+        thread.return_value.start.assert_called_once_with()
+
+    def test_catalog_total_tracks_sync(self) -> None:
+        self.add("News", 1, 100)
+        catalog = server.get_catalog()
+        (self.recordings / "Extra_96.1_2024-01-01_0800.mp3").write_bytes(bytes(50))
+        catalog.sync()
+        self.assertEqual(catalog.total_size(), 150)
+        catalog.remove("Extra_96.1_2024-01-01_0800.mp3")
+        self.assertEqual(catalog.total_size(), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,9 +22,11 @@ class TestRssGeneration(unittest.TestCase):
 
             original_recordings = server.RECORDINGS_DIR
             original_rss = server.RSS_PATH
+            original_catalog = server.CATALOG_PATH
             try:
                 server.RECORDINGS_DIR = recordings_dir
                 server.RSS_PATH = rss_path
+                server.CATALOG_PATH = base_dir / "recordings.jsonl"
                 server.generate_rss(
                     {
                         "base_url": "http://example.test",
@@ -35,6 +37,7 @@ class TestRssGeneration(unittest.TestCase):
             finally:
                 server.RECORDINGS_DIR = original_recordings
                 server.RSS_PATH = original_rss
+                server.CATALOG_PATH = original_catalog
 
             self.assertTrue(rss_path.exists())
             payload = rss_path.read_text(encoding="utf-8")
@@ -0,0 +1,175 @@
+import http.client
+import json
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+def slot(schedule_id: str, start_time: str, duration_sec: int, days: list) -> dict:
+    return {
+        "id": schedule_id,
+        "name": schedule_id,
+        "frequency_mhz": 96.1,
+        "start_time": start_time,
+        "duration_sec": duration_sec,
+        "days": days,
+    }
+
+
+class TestWeeklyIntervalIndex(unittest.TestCase):
+    def test_conflicts(self) -> None:
+        index = server.WeeklyIntervalIndex()
+        index.add(slot("morning", "08:00", 3600, ["mon", "tue"]))
+        index.add(slot("late", "23:00", 7200, ["sun"]))
+        self.assertEqual(index.conflicts(slot("x", "08:30", 600, ["tue"])), ["morning"])
+        self.assertEqual(index.conflicts(slot("x", "09:00", 600, ["mon"])), [])
+        self.assertEqual(index.conflicts(slot("x", "07:00", 3600, ["mon"])), [])
+        # Sunday 23:00 + 2h wraps into Monday 00:00-01:00.
+        self.assertEqual(index.conflicts(slot("x", "00:30", 600, ["mon"])), ["late"])
+        self.assertEqual(index.conflicts(slot("x", "08:30", 600, ["mon"]), skip_id="morning"), [])
+
+    def test_update_and_remove(self) -> None:
+        index = server.WeeklyIntervalIndex()
+        index.add(slot("a", "08:00", 3600, ["mon"]))
+        index.add(slot("a", "10:00", 3600, ["mon"]))
+        self.assertEqual(index.conflicts(slot("x", "08:30", 60, ["mon"])), [])
+        self.assertEqual(index.conflicts(slot("x", "10:30", 60, ["mon"])), ["a"])
+        index.remove("a")
+        self.assertEqual(index.intervals, [])
+
+
+class TestScheduleConflicts(unittest.TestCase):
+    def test_wideband_allows_overlaps_within_capture_bandwidth(self) -> None:
+        index = server.WeeklyIntervalIndex()
+        index.add(dict(slot("a", "08:00", 3600, ["mon"]), frequency_mhz=96.1))
+        index.add(dict(slot("b", "08:30", 3600, ["mon"]), frequency_mhz=97.1))
+        single = {"capture_mode": "single"}
+        wideband = {"capture_mode": "wideband", "wideband_sample_rate": 2_400_000}
+        near = dict(slot("x", "08:45", 600, ["mon"]), frequency_mhz=96.5)
+        far = dict(slot("x", "09:15", 600, ["mon"]), frequency_mhz=98.0)
+        self.assertEqual(server.schedule_conflicts(near, single, index=index), ["a", "b"])
+        self.assertEqual(server.schedule_conflicts(near, wideband, index=index), [])
+        # 98.0 only overlaps "b", but "b" is chained to "a" at 96.1 in the same capture.
+        self.assertEqual(server.schedule_conflicts(far, wideband, index=index), ["b"])
+
+
+class TestWidebandCenter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = server.WeeklyIntervalIndex()
+        self.index.add(dict(slot("a", "08:00", 3600, ["mon"]), frequency_mhz=96.1))
+        self.index.add(dict(slot("b", "08:30", 3600, ["mon"]), frequency_mhz=97.5))
+        patcher = mock.patch.object(server, "schedule_index", self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = {"capture_mode": "wideband", "wideband_sample_rate": 2_400_000}
+        # Monday 08:00, the scheduled start; pre-roll opens the capture a few seconds earlier.
+        self.starts_at = datetime(2024, 1, 1, 8, 0).timestamp()
+
+    def test_new_session_is_centred_on_the_chained_schedules(self) -> None:
+        sessions = []
+
+        def fake_session(center, sample_rate, config, device, on_close):
+            sessions.append(center)
+            return mock.Mock(closed=False)
+
+        with mock.patch.object(server, "IqCaptureSession", side_effect=fake_session), \
+                mock.patch.object(server, "claim_tuner", return_value=mock.MagicMock()):
+            server.WidebandCaptures().open(96.1, 3600, lambda rate: None, self.config, self.starts_at)
+        self.assertAlmostEqual(sessions[0], 96.8)
+
+    def test_record_passes_the_show_to_open(self) -> None:
+        captures = server.WidebandCaptures()
+        channel = mock.Mock()
+        with mock.patch.object(captures, "open", return_value=(mock.Mock(), channel)) as opened, \
+                mock.patch.object(server, "wait_trimmed"):
+            captures.record(97.5, 3600, Path("b.mp3"), self.config, self.starts_at + 1800)
+        self.assertEqual(opened.call_args.args[1], 3600)
+        self.assertEqual(opened.call_args.args[4], self.starts_at + 1800)
+
+    def test_wideband_recordings_do_not_abort_on_dead_air(self) -> None:
+        captures = server.WidebandCaptures()
+
+        def fake_open(frequency_mhz, duration_sec, open_sink, config, starts_at):
+            return mock.Mock(), mock.Mock(sink=open_sink(48_000))
+
+        with mock.patch.object(captures, "open", side_effect=fake_open), \
+                mock.patch.object(server, "open_encoder") as open_encoder, \
+                mock.patch.object(server, "wait_trimmed"):
+            captures.record(97.5, 3600, Path("b.mp3"), self.config, self.starts_at)
+        self.assertFalse(open_encoder.call_args.kwargs.get("abortable", False))
+
+class TestBulkImport(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.index = server.WeeklyIntervalIndex()
+        self.store = server.JsonStore(
+            Path(self._tmp.name) / "schedules.json",
+            {"schedules": [slot("existing", "08:00", 3600, ["mon"])]},
+            on_load=self.index.rebuild,
+        )
+        self.store.read()
+        for patcher in (
+            mock.patch.object(server, "schedule_store", self.store),
+            mock.patch.object(server, "schedule_index", self.index),
+            mock.patch.object(server, "scheduler", server.Scheduler()),
+            mock.patch.object(server, "load_config", return_value=dict(server.DEFAULT_CONFIG)),
+            mock.patch.object(server.ShiftHandler, "log_message"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.ShiftHandler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.addCleanup(self.httpd.server_close)
+        self.addCleanup(self.httpd.shutdown)
+
+    def _post(self, payload: dict) -> tuple[int, dict]:
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1])
+        self.addCleanup(conn.close)
+        conn.request(
+            "POST",
+            "/api/schedules/bulk",
+            body=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_reports_every_conflict_without_writing(self) -> None:
+        status, body = self._post(
+            {
+                "schedules": [
+                    slot("a", "08:30", 600, ["mon"]),
+                    slot("b", "12:00", 3600, ["tue"]),
+                    slot("c", "12:30", 600, ["tue"]),
+                ]
+            }
+        )
+        self.assertEqual(status, 409)
+        self.assertEqual(
+            [(c["index"], c["schedule_ids"], c["batch_indices"]) for c in body["conflicts"]],
+            [(0, ["existing"], []), (2, [], [1])],
+        )
+        self.assertEqual(len(self.store.read()["schedules"]), 1)
+
+    def test_imports_batch_in_one_write(self) -> None:
+        with mock.patch.object(server, "save_json", wraps=server.save_json) as save:
+            status, body = self._post(
+                {"schedules": [slot("a", "10:00", 600, ["mon"]), slot("b", "12:00", 600, ["mon"])]}
+            )
+            self.store.flush()
+        self.assertEqual(status, 201)
+        self.assertEqual(len(body["schedules"]), 2)
+        self.assertEqual(len(self.store.read()["schedules"]), 3)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(self.index.conflicts(slot("x", "10:05", 60, ["mon"]))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
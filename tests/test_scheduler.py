@@ -0,0 +1,71 @@
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import server
+
+
+def make_schedule(**overrides) -> dict:
+    schedule = {
+        "id": "sch_1",
+        "name": "Show",
+        "frequency_mhz": 96.1,
+        "duration_sec": 3600,
+        "days": ["mon", "wed"],
+        "start_time": "23:30",
+        "enabled": True,
+    }
+    schedule.update(overrides)
+    return schedule
+
+
+class TestNextFireTime(unittest.TestCase):
+    def test_next_matching_day(self) -> None:
+        # 2024-01-02 is a Tuesday.
+        after = datetime(2024, 1, 2, 12, 0)
+        self.assertEqual(server.next_fire_time(make_schedule(), after), datetime(2024, 1, 3, 23, 30))
+
+    def test_recent_start_within_grace_still_fires(self) -> None:
+        after = datetime(2024, 1, 1, 23, 30, 40)
+        self.assertEqual(server.next_fire_time(make_schedule(), after), datetime(2024, 1, 1, 23, 30))
+
+    def test_last_run_across_midnight_is_not_refired(self) -> None:
+        schedule = make_schedule(start_time="23:59", last_run="2024-01-02T00:00:10")
+        after = datetime(2024, 1, 2, 0, 0, 20)
+        self.assertEqual(server.next_fire_time(schedule, after), datetime(2024, 1, 3, 23, 59))
+
+    def test_disabled_or_dayless_schedules_never_fire(self) -> None:
+        after = datetime(2024, 1, 1, 12, 0)
+        self.assertIsNone(server.next_fire_time(make_schedule(enabled=False), after))
+        self.assertIsNone(server.next_fire_time(make_schedule(days=[]), after))
+
+
+class TestScheduler(unittest.TestCase):
+    def test_reschedule_wakes_loop_and_fires_due_schedule(self) -> None:
+        now = datetime.now()
+        today = server.DAYS[now.weekday()]
+        schedules = {"schedules": []}
+        fired = threading.Event()
+        instance = server.Scheduler()
+
+        def fake_fire(schedule_id: str) -> None:
+            fired.set()
+
+        with mock.patch.object(server, "load_schedules", return_value=schedules), mock.patch.object(
+            instance, "_fire", side_effect=fake_fire
+        ):
+            thread = threading.Thread(target=lambda: instance._fire(instance._next_due()), daemon=True)
+            thread.start()
+            time.sleep(0.05)
+            self.assertFalse(fired.is_set())
+            schedules["schedules"].append(
+                make_schedule(days=[today], start_time=now.strftime("%H:%M"))
+            )
+            instance.reschedule("sch_1")
+            self.assertTrue(fired.wait(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
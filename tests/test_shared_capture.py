@@ -0,0 +1,103 @@
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class FakeSink:
+    def __init__(self, output_path, sample_rate, channels) -> None:
+        self.output_path = output_path
+        self.data = bytearray()
+        self.closed = False
+
+    def write(self, data) -> None:
+        self.data += data
+
+    def close(self) -> int:
+        self.closed = True
+        return 0
+
+
+class FakeCapture:
+    def __init__(self, frequency_mhz, config, sink) -> None:
+        self.ended = threading.Event()
+        self.stopped = False
+
+    def stop(self) -> None:
+        self.stopped = True
+
+
+def encoded(segment) -> FakeSink:
+    """The encoder behind a segment's analysis stage."""
+    return getattr(segment.sink, "sink", segment.sink)
+
+
+class TestChainedCapture(unittest.TestCase):
+    def setUp(self) -> None:
+        for name, value in (("EncoderSink", FakeSink), ("PcmCapture", FakeCapture)):
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(server, "shared_captures", server.SharedCaptures())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(server, "RECORDINGS_DIR", Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_back_to_back_segments_split_exactly(self) -> None:
+        capture = server.ChainedCapture(96.1, {"capture_mode": "single"}, starts_at=0)
+        first = capture.attach(server.RECORDINGS_DIR / "a.mp3", 1, expect_more=True)
+        stream = bytes(range(256)) * 500
+        capture.write(stream[:100_000])
+        self.assertTrue(first.done.is_set())
+        self.assertEqual(bytes(encoded(first).data), stream[:64_000])
+
+        second = capture.attach(server.RECORDINGS_DIR / "b.mp3", 1, expect_more=False)
+        capture.write(stream[100_000:])
+        self.assertTrue(second.done.is_set())
+        self.assertEqual(bytes(encoded(second).data), stream[64_000:128_000])
+
+        capture.wait(first)
+        capture.wait(second)
+        self.assertTrue(capture.closed)
+        self.assertTrue(capture.capture.stopped)
+        self.assertTrue(encoded(first).closed and encoded(second).closed)
+
+    def test_capture_waits_for_the_next_show(self) -> None:
+        capture = server.ChainedCapture(96.1, {"capture_mode": "single"}, starts_at=0)
+        first = capture.attach(server.RECORDINGS_DIR / "a.mp3", 1, expect_more=True)
+        capture.write(bytes(70_000))
+        capture.wait(first)
+        self.addCleanup(capture.timer.cancel)
+        self.assertFalse(capture.closed)
+        self.assertEqual(len(capture.backlog), 6_000)
+
+    def test_closed_capture_rejects_new_segments(self) -> None:
+        capture = server.ChainedCapture(96.1, {"capture_mode": "single"}, starts_at=0)
+        capture.close()
+        self.assertIsNone(capture.attach(server.RECORDINGS_DIR / "a.mp3", 1, expect_more=False))
+
+    def test_follow_on_lookup(self) -> None:
+        index = server.WeeklyIntervalIndex()
+        index.add({"id": "a", "frequency_mhz": 96.1, "start_time": "08:00", "duration_sec": 3600, "days": ["mon"]})
+        index.add({"id": "b", "frequency_mhz": 96.1, "start_time": "09:00", "duration_sec": 3600, "days": ["mon"]})
+        index.add({"id": "c", "frequency_mhz": 101.5, "start_time": "09:00", "duration_sec": 600, "days": ["mon"]})
+        index.add({"id": "d", "frequency_mhz": 96.1, "start_time": "00:00", "duration_sec": 600, "days": ["mon"]})
+        schedule = {"start_time": "08:00", "duration_sec": 3600}
+        end = server.occurrence_end(schedule, datetime(2024, 1, 1, 8, 0, 5))
+        self.assertEqual(index.followers(end, 96.1, skip_id="a"), ["b"])
+        self.assertEqual(index.followers(end + 60, 96.1), [])
+        # Sunday 23:00 + 1h wraps onto Monday 00:00.
+        late = server.occurrence_end({"start_time": "23:00", "duration_sec": 3600}, datetime(2024, 1, 7, 23, 0))
+        self.assertEqual(index.followers(late, 96.1), ["d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import contextlib
+import io
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import bench
+import server
+
+
+class TestStartup(unittest.TestCase):
+    def test_main_sets_up_and_serves(self) -> None:
+        reconciled = threading.Event()
+        reconcile_archive = server.reconcile_archive
+
+        def reconcile(interrupted, config):
+            reconcile_archive(interrupted, config)
+            reconciled.set()
+
+        with tempfile.TemporaryDirectory() as tmp, bench.sandbox(Path(tmp)) as root:
+            patches = {
+                "timeshift_buffer": server.TimeshiftBuffer(),
+                "reconcile_archive": reconcile,
+                "ThreadingHTTPServer": mock.Mock(),
+            }
+            with contextlib.ExitStack() as stack:
+                for name, value in patches.items():
+                    stack.enter_context(mock.patch.object(server, name, value))
+                stack.enter_context(mock.patch.object(server.signal, "signal"))
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                server.main()
+                self.assertTrue(reconciled.wait(5))
+                server.ThreadingHTTPServer.assert_called_once_with(("0.0.0.0", 8000), server.ShiftHandler)
+                server.ThreadingHTTPServer.return_value.serve_forever.assert_called_once_with()
+            self.assertTrue((root / "rss.xml").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
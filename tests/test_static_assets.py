@@ -0,0 +1,72 @@
+import gzip
+import http.client
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        (self.root / "index.html").write_text('<script src="/static/app.js"></script>\n')
+        (self.root / "app.js").write_text("console.log('one');\n" * 50)
+        patches = {"static_assets": server.StaticAssets(self.root), "STATIC_RECHECK_SEC": 0}
+        for name, value in patches.items():
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), server.ShiftHandler)
+        quiet = mock.patch.object(server.ShiftHandler, "log_message")
+        quiet.start()
+        self.addCleanup(quiet.stop)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.addCleanup(self.httpd.server_close)
+        self.addCleanup(self.httpd.shutdown)
+
+    def _get(self, path: str, headers: dict = None) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1])
+        self.addCleanup(conn.close)
+        conn.request("GET", path, headers=headers or {})
+        return conn.getresponse()
+
+    def _script_url(self) -> str:
+        response = self._get("/")
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        return re.search(r'src="([^"]+)"', response.read().decode()).group(1)
+
+    def test_versioned_asset_is_immutable_and_compressed(self) -> None:
+        url = self._script_url()
+        self.assertRegex(url, r"^/static/app\.js\?v=[0-9a-f]{12}$")
+        response = self._get(url, {"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Cache-Control"), server.IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(response.read()), (self.root / "app.js").read_bytes())
+
+        response = self._get("/static/app.js", {"If-None-Match": response.getheader("ETag").replace("-gzip", "")})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        self.assertEqual(self._get("/static/missing.js").status, 404)
+
+    def test_changed_file_is_reloaded_with_new_version(self) -> None:
+        first = self._script_url()
+        path = self.root / "app.js"
+        path.write_text("console.log('two');\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = self._script_url()
+        self.assertNotEqual(first, second)
+        self.assertEqual(self._get(second).read(), b"console.log('two');\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
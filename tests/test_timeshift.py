@@ -0,0 +1,49 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import server
+
+
+class TestPcmRing(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.ring = server.PcmRing(Path(self._tmp.name) / "ring.pcm", 16, 4)
+        self.addCleanup(self.ring.close)
+
+    def test_wraparound_keeps_newest_bytes(self) -> None:
+        self.ring.write(bytes(range(12)))
+        self.ring.write(bytes(range(12, 24)))
+        self.assertEqual(self.ring.span(), (8, 24))
+        position, data = self.ring.read(8, 16, timeout=0)
+        self.assertEqual(position, 8)
+        self.assertEqual(data, bytes(range(8, 24)))
+
+    def test_overwritten_position_skips_to_oldest_frame(self) -> None:
+        self.ring.write(bytes(range(30)))
+        position, data = self.ring.read(2, 8, timeout=0)
+        self.assertEqual(position, 14)
+        self.assertEqual(data, bytes(range(14, 22)))
+
+    def test_reader_waits_for_live_edge(self) -> None:
+        self.ring.write(b"abcd")
+        threading.Timer(0.05, self.ring.write, args=(b"efgh",)).start()
+        position, data = self.ring.read(4, 4, timeout=2)
+        self.assertEqual((position, data), (4, b"efgh"))
+
+    def test_pad_silence_completes_partial_frame(self) -> None:
+        self.ring.write(b"abcdef")
+        self.ring.pad_silence(4)
+        self.assertEqual(self.ring.span()[1], 12)
+        self.assertEqual(self.ring.read(4, 8, timeout=0)[1], b"ef" + bytes(6))
+
+    def test_closed_ring_returns_no_data(self) -> None:
+        self.ring.write(b"abcd")
+        self.ring.close()
+        self.assertEqual(self.ring.read(0, 4, timeout=0), (0, b""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import contextlib
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import server
+
+
+def slot(schedule_id: str, start_time: str, duration_sec: int, frequency_mhz: float = 96.1) -> dict:
+    return {
+        "id": schedule_id,
+        "name": schedule_id,
+        "frequency_mhz": frequency_mhz,
+        "start_time": start_time,
+        "duration_sec": duration_sec,
+        "days": ["mon"],
+    }
+
+
+TWO_DONGLES = {
+    "devices": [
+        {"index": 0, "ppm": 42, "gain": 30},
+        {"serial": "00000002"},
+    ]
+}
+
+
+class TestTunerPool(unittest.TestCase):
+    def test_device_args(self) -> None:
+        first, second = server.configured_devices(TWO_DONGLES)
+        self.assertEqual(server.device_args(first), ["-d", "0", "-p", "42", "-g", "30"])
+        self.assertEqual(server.device_args(second), ["-d", "00000002"])
+        self.assertEqual(server.configured_devices({})[0]["selector"], "0")
+
+    def test_acquire_and_release(self) -> None:
+        pool = server.TunerPool()
+        pool.configure(TWO_DONGLES)
+        first = pool.acquire("news")
+        second = pool.acquire("music")
+        self.assertEqual([first["id"], second["id"]], ["0", "00000002"])
+        self.assertIsNone(pool.acquire("third"))
+        self.assertEqual([device["holder"] for device in pool.status()], ["news", "music"])
+        pool.release(first)
+        self.assertEqual(pool.free_count(), 1)
+        self.assertEqual(pool.acquire("third")["id"], "0")
+
+    def test_claim_without_free_tuner_fails(self) -> None:
+        pool = server.TunerPool()
+        pool.acquire("busy")
+        with mock.patch.object(server, "tuner_pool", pool):
+            with self.assertRaises(server.NoFreeTuner):
+                with server.claim_tuner("news"):
+                    pass
+            pool.release({"id": "0"})
+            with server.claim_tuner("news") as device:
+                self.assertEqual(pool.status()[0]["holder"], "news")
+                self.assertEqual(device["id"], "0")
+            self.assertEqual(pool.free_count(), 1)
+
+    def test_scheduled_show_without_a_tuner_is_reported(self) -> None:
+        schedule = slot("news", "08:00", 3600)
+        registry = server.Metrics()
+        registry.described = dict(server.metrics.described)
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            patches = {
+                "schedule_store": server.JsonStore(root / "schedules.json", {"schedules": [schedule]}),
+                "recording_journal": server.RecordingJournal(root / "recording_journal.jsonl"),
+                "metrics": registry,
+                "load_config": lambda: {},
+                "record_station": mock.Mock(side_effect=server.NoFreeTuner("No free tuner for news")),
+            }
+            with contextlib.ExitStack() as stack:
+                for name, value in patches.items():
+                    stack.enter_context(mock.patch.object(server, name, value))
+                server.run_recording(schedule, datetime(2024, 1, 1, 8, 0))
+                stored = server.load_schedules()["schedules"][0]
+                server.schedule_store.flush()
+                journal = server.recording_journal.path.read_bytes()
+        self.assertEqual(stored["last_error"], "No free tuner for news")
+        self.assertEqual(journal, b"")
+        self.assertIn('shiftfm_recordings_missed_total{reason="no_free_tuner"} 1', registry.render())
+
+
+class TestCapacityConflicts(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = server.WeeklyIntervalIndex()
+        self.index.add(slot("a", "08:00", 3600))
+        self.index.add(slot("b", "08:30", 3600, 101.5))
+
+    def test_peak_overlap(self) -> None:
+        self.assertEqual(self.index.peak_overlap(slot("x", "08:45", 600)), 2)
+        self.assertEqual(self.index.peak_overlap(slot("x", "07:30", 3600)), 1)
+        self.assertEqual(self.index.peak_overlap(slot("x", "09:00", 600)), 1)
+        self.assertEqual(self.index.peak_overlap(slot("x", "07:00", 3600)), 0)
+
+    def test_conflicts_scale_with_tuners(self) -> None:
+        config = {"capture_mode": "single"}
+        candidate = slot("x", "09:00", 600, 99.5)
+        self.assertEqual(server.schedule_conflicts(candidate, config, index=self.index), ["b"])
+        self.assertEqual(server.schedule_conflicts(candidate, {**config, **TWO_DONGLES}, index=self.index), [])
+        busy = slot("y", "08:40", 600, 99.5)
+        self.assertEqual(
+            server.schedule_conflicts(busy, {**config, **TWO_DONGLES}, index=self.index), ["a", "b"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()